@@ -3,25 +3,55 @@ AegisNet Flask API
 A production-ready REST API for network intrusion detection.
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, has_request_context, request, jsonify
 from flask_cors import CORS
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import io
+import json
 import logging
-
-try:
-    from tensorflow.keras.models import load_model
-except Exception:
-    try:
-        from keras.models import load_model
-    except Exception:
-        raise ImportError(
-            "Could not import 'load_model' from 'tensorflow.keras' or 'keras'. Please install 'tensorflow' or 'keras' in your environment."
-        )
 import numpy as np
-import pandas as pd
-import joblib
 import sys
-
-from src.config import TOP_FEATURES, SCALER_SAVE_PATH, CLASSIFICATION_THRESHOLD
+import threading
+import time
+
+from src.config import (
+    TOP_FEATURES,
+    CLASSIFICATION_THRESHOLD,
+    PREDICT_CHUNK_SIZE,
+    DEDUP_ENABLED,
+    INFERENCE_BACKEND,
+    MICROBATCH_ENABLED,
+    MICROBATCH_TIMEOUT_S,
+    RESULT_PAGE_SIZE,
+    RESULT_MAX_PAGE_SIZE,
+    RESULT_CACHE_ENABLED,
+    SERVE_WARMUP_ROWS,
+    MODEL_WATCH_INTERVAL_S,
+    ADMIN_TOKEN,
+)
+from src.inference_engine import deduplicate_rows, load_scorer
+from src.feature_transform import NonNumericFeatureError, record_to_block, transform
+from src.input_formats import read_feature_chunks
+from src.cascade import CascadeScorer
+from src.micro_batcher import MicroBatcher, QueueFullError
+from src.result_store import PAGE_ORDERS, ResultStore
+from src.job_queue import JobQueue, is_job_id
+from src.result_cache import ResultCache, hash_upload
+from src.model_registry import current_version, list_versions, resolve_version
+from src.metrics import (
+    REGISTRY,
+    Gauge,
+    MODEL_ACTIVE,
+    MODEL_LOAD_SECONDS,
+    REQUEST_SECONDS,
+    REQUESTS_IN_FLIGHT,
+    REQUESTS_TOTAL,
+    RESULT_CACHE_LOOKUPS,
+    STAGE_SECONDS,
+    UNIQUE_ROWS_SCORED,
+    record_rows,
+    timed_iter,
+)
 
 # ============================================================================
 # Flask App Initialization
@@ -34,8 +64,21 @@ CORS(app, resources={r"/*": {"origins": "*"}}, supports_credentials=True)
 # ============================================================================
 # Global Variables for Model Artifacts
 # ============================================================================
-model = None
-scaler = None
+# Model version currently serving (a ServingModel, swapped whole on reload)
+active_model = None
+# Background reload status, reported by GET /admin/model
+reload_status = {"state": "idle", "version": None, "error": None, "finished": None}
+reload_lock = threading.Lock()
+# Polls the registry's CURRENT pointer (started lazily in each process)
+registry_watcher = None
+# Recent paged /predict results, served by /results/<result_id>
+results = ResultStore()
+# Background scoring of large uploads (POST /jobs)
+# (lambda defers the lookup: score_job is defined further down)
+jobs = JobQueue(lambda upload_path, progress: score_job(upload_path, progress))
+
+# /predict response formats: the original full JSON payload, or paged results
+RESPONSE_FORMATS = ("legacy", "columnar", "npz")
 
 # ============================================================================
 # Load Model and Scaler on Startup
@@ -53,99 +96,515 @@ logging.basicConfig(
 )
 logger = logging.getLogger("aegisnet")
 
-try:
-    # Load the trained Keras model
-    model_path = "models/aegisnet.keras"
-    # Use placeholder formatting (avoid mixing f-string with %s)
-    logger.info("Loading model from: %s", model_path)
-    model = load_model(model_path)
-    logger.info("Model loaded successfully")
 
-    # Load the saved scaler
-    logger.info("Loading scaler from: %s", SCALER_SAVE_PATH)
-    scaler = joblib.load(SCALER_SAVE_PATH)
-    logger.info("Scaler loaded successfully")
+class ServingModel:
+    """
+    One loaded model version plus the services bound to it.
+    Requests take a reference to the active ServingModel when they start and
+    use it throughout, so a hot swap never mixes versions within a request:
+    in-flight requests finish on the old version.
+    """
+
+    def __init__(self, version, fingerprint, scorer):
+        self.version = version
+        self.scorer = scorer
+        self.loaded_at = time.time()
+        # Batching scheduler shared by concurrent /predict_single requests
+        self.batcher = None
+        if MICROBATCH_ENABLED:
+            self.batcher = MicroBatcher(
+                scorer.predict
+            )
+        # Scored uploads keyed by content + this version's artifacts (None when disabled)
+        self.result_cache = None
+        if RESULT_CACHE_ENABLED:
+            self.result_cache = ResultCache(fingerprint, CLASSIFICATION_THRESHOLD)
+
+    def warm_up(self, rows=SERVE_WARMUP_ROWS):
+        """
+        Run throwaway predictions so the first real request doesn't pay for
+        graph tracing (Keras) or lazy BLAS initialization.
+
+        Args:
+            rows: Rows in the batch-shaped warm-up call (a single-row call is also made)
+        """
+        warmup_start = time.perf_counter()
+        scorers = [self.scorer]
+        if isinstance(self.scorer, CascadeScorer):
+            # The pre-filter may clear every warm-up row, so warm the DNN directly too
+            scorers.append(self.scorer.scorer)
+        for scorer in scorers:
+            for n_rows in (1, rows):
+                scorer.predict(np.zeros((n_rows, len(TOP_FEATURES)), dtype=np.float32))
+        logger.info(
+            "Warm-up predictions for %s done in %.2fs",
+            self.version,
+            time.perf_counter() - warmup_start,
+        )
+
+    def retire(self):
+        """Stop this version's batching thread once its queued rows are scored."""
+        if self.batcher is not None:
+            self.batcher.close()
+
+
+def load_serving_model(version=None):
+    """
+    Load and warm up a model version from the registry.
+
+    Args:
+        version (str): Registry version; None for the registry's CURRENT
+            version (or the configured model paths if nothing is published)
+
+    Returns:
+        ServingModel
+    """
+    version, fingerprint, paths = resolve_version(version, INFERENCE_BACKEND)
+    if INFERENCE_BACKEND == "numpy":
+        logger.info("Loading fused NumPy engine from: %s", paths["fused_path"])
+    elif INFERENCE_BACKEND == "tflite":
+        logger.info("Loading quantized TFLite model from: %s", paths["tflite_path"])
+        logger.info("Loading scaler from: %s", paths["scaler_path"])
+    else:
+        logger.info("Loading model from: %s", paths["model_path"])
+        logger.info("Loading scaler from: %s", paths["scaler_path"])
+    load_start = time.perf_counter()
+    scorer = load_scorer(INFERENCE_BACKEND, **paths)
+    load_seconds = time.perf_counter() - load_start
+    MODEL_LOAD_SECONDS.set(load_seconds, backend=scorer.backend)
+    logger.info(
+        "Model %s loaded successfully (backend=%s) in %.2fs",
+        version,
+        scorer.backend,
+        load_seconds,
+    )
+    if isinstance(scorer, CascadeScorer):
+        logger.info(
+            "Cascade pre-filter enabled (%d features, cutoff %.6f)",
+            len(scorer.prefilter.columns),
+            scorer.prefilter.cutoff,
+        )
+    model = ServingModel(version, fingerprint, scorer)
+    if SERVE_WARMUP_ROWS:
+        model.warm_up()
+    return model
+
+
+def activate_model(model):
+    """Swap a loaded ServingModel in; requests already running keep the old one."""
+    global active_model
+    previous, active_model = active_model, model
+    MODEL_ACTIVE.set(1, version=model.version)
+    if previous is not None:
+        MODEL_ACTIVE.set(0, version=previous.version)
+        previous.retire()
+        logger.info("Model swapped: %s -> %s", previous.version, model.version)
+
+
+def current_model():
+    """
+    The ServingModel a request should use from start to finish.
+    Also remembers it for the X-AegisNet-Model-Version response header.
+    """
+    model = active_model
+    if has_request_context():
+        g.model_version = model.version
+    return model
+
+
+def reload_model(version=None):
+    """
+    Load a model version in the background and swap it in once warmed up.
+
+    Args:
+        version (str): Registry version; None for the registry's CURRENT version
+
+    Returns:
+        bool: False if a reload is already in progress
 
-    print("=" * 60)
-    print("🚀 AegisNet API is ready to accept requests!")
-    print("=" * 60)
+    Raises:
+        ValueError: If the version does not exist in the registry
+    """
+    resolve_version(version, INFERENCE_BACKEND)
+    with reload_lock:
+        if reload_status["state"] == "loading":
+            return False
+        reload_status.update(state="loading", version=version, error=None, finished=None)
+
+    def run():
+        try:
+            activate_model(load_serving_model(version))
+            reload_status.update(state="idle", version=active_model.version)
+        except Exception as e:
+            logger.exception("Model reload failed")
+            reload_status.update(state="failed", error=str(e))
+        finally:
+            reload_status["finished"] = time.time()
+
+    threading.Thread(target=run, name="aegisnet-model-reload", daemon=True).start()
+    return True
+
+
+def watch_registry(interval_s=MODEL_WATCH_INTERVAL_S):
+    """Reload whenever the registry's CURRENT version changes (e.g. main.py published)."""
+    attempted = None
+    while True:
+        time.sleep(interval_s)
+        target = current_version()
+        if target is None or target == active_model.version or target == attempted:
+            continue
+        # One attempt per CURRENT value, so a broken version isn't retried forever
+        attempted = target
+        logger.info("Registry CURRENT changed to %s; reloading", target)
+        try:
+            if not reload_model(target):
+                attempted = None  # Another reload is running; retry on the next poll
+        except ValueError as e:
+            logger.warning("Cannot reload: %s", e)
+
+
+def ensure_registry_watcher():
+    """Start the registry watcher in this process (threads don't survive a fork)."""
+    global registry_watcher
+    if MODEL_WATCH_INTERVAL_S is None:
+        return
+    if registry_watcher is None or not registry_watcher.is_alive():
+        with reload_lock:
+            if registry_watcher is None or not registry_watcher.is_alive():
+                registry_watcher = threading.Thread(
+                    target=watch_registry, name="aegisnet-registry-watch", daemon=True
+                )
+                registry_watcher.start()
+
+
+def load_artifacts():
+    """
+    Load the inference backend and set up the services that depend on it.
+    Called once at import time, i.e. once per process: in the gunicorn
+    master when serve.py preloads the app, otherwise in each worker.
+    """
+    try:
+        activate_model(load_serving_model())
+
+        if MICROBATCH_ENABLED:
+            logger.info(
+                "Micro-batching enabled (max_batch=%d, max_wait=%.1fms)",
+                active_model.batcher.max_batch_size,
+                active_model.batcher.max_wait * 1000.0,
+            )
+            Gauge(
+                "aegisnet_microbatch_queue_depth",
+                "Single-row requests waiting for a micro-batch.",
+            ).set_function(lambda: active_model.batcher.stats()["queue_depth"])
+            Gauge(
+                "aegisnet_microbatch_mean_batch_size",
+                "Mean rows per micro-batched forward pass since the active model loaded.",
+            ).set_function(lambda: active_model.batcher.stats()["mean_batch_size"])
+
+        if RESULT_CACHE_ENABLED:
+            # Keyed by the artifacts actually loaded, so cached results always
+            # match the model that is serving
+            logger.info(
+                "Result cache enabled (model fingerprint %s)",
+                active_model.result_cache.model_version[:12],
+            )
+
+        print("=" * 60)
+        print(f"🚀 AegisNet API is ready to accept requests! (model {active_model.version})")
+        print("=" * 60)
+
+    except Exception as e:
+        print(f"❌ Error loading artifacts: {e}")
+        logger.exception("Initialization failure")
+        sys.exit(1)
 
-except Exception as e:
-    print(f"❌ Error loading artifacts: {e}")
-    logger.exception("Initialization failure")
-    sys.exit(1)
+
+load_artifacts()
 
 # ============================================================================
 # Helper Functions
 # ============================================================================
 
 
-def clean_column_names(df):
+def preprocess_data(df):
     """
-    Clean DataFrame column names by stripping whitespace.
+    Preprocess a raw chunk for prediction.
+    Uses the shared feature kernel (src.feature_transform), like the
+    predictor script and the streamer. Scaling is applied by the scorer (or
+    folded into the fused engine's first layer).
 
     Args:
-        df (pd.DataFrame): Input DataFrame
+        df (pd.DataFrame or np.ndarray): Raw CSV chunk (a Label column is
+            ignored) or binary block with TOP_FEATURES columns in order
 
     Returns:
-        pd.DataFrame: DataFrame with cleaned column names
+        np.ndarray: Cleaned TOP_FEATURES rows (float32) ready for the scorer
     """
-    df.columns = df.columns.str.strip()
-    return df
+    return transform(df)
 
 
-def preprocess_data(df):
+def stream_predict(file, chunk_size=PREDICT_CHUNK_SIZE, endpoint="predict", progress=None, model=None):
     """
-    Preprocess raw DataFrame for prediction.
-    Performs the exact same steps as the predictor script.
+    Score an upload chunk by chunk, folding results into running totals.
+    CSV (plain, gzip or zstd) is parsed incrementally, only the TOP_FEATURES
+    columns; binary uploads (.npy, columnar .npz, Arrow IPC) skip text
+    parsing entirely (see src.input_formats).
 
     Args:
-        df (pd.DataFrame): Raw input DataFrame
+        file: File-like object or path containing CSV or binary feature data
+        chunk_size (int): Number of rows per chunk
+        endpoint (str): Endpoint label for stage metrics
+        progress (callable): Optional callback receiving the rows scored so far
+        model (ServingModel): Version to score with (default: the active one)
 
     Returns:
-        np.ndarray: Scaled and preprocessed data ready for prediction
+        tuple: (total_flows, threat_rows, threat_scores) where threat_rows are
+        1-based row numbers and threat_scores their probabilities
+    """
+    scorer = (model or current_model()).scorer
+    total_flows = 0
+    unique_flows = 0
+    chunk_count = 0
+    threat_rows = []
+    threat_scores = []
+
+    chunks = timed_iter(
+        read_feature_chunks(file, chunk_size),
+        STAGE_SECONDS,
+        endpoint=endpoint,
+        stage="parse",
+    )
+    for chunk in chunks:
+        with STAGE_SECONDS.time(endpoint=endpoint, stage="preprocess"):
+            X_clean = preprocess_data(chunk)
+        if DEDUP_ENABLED:
+            # Score each distinct row once (floods repeat identical flows)
+            with STAGE_SECONDS.time(endpoint=endpoint, stage="dedup"):
+                first, inverse = deduplicate_rows(X_clean)
+            with STAGE_SECONDS.time(endpoint=endpoint, stage="predict"):
+                probabilities = scorer.predict(X_clean[first]).flatten()[inverse]
+            unique_flows += len(first)
+        else:
+            with STAGE_SECONDS.time(endpoint=endpoint, stage="predict"):
+                probabilities = scorer.predict(X_clean).flatten()
+            unique_flows += len(probabilities)
+
+        # Keep only flagged rows; offsets make row numbers global to the file
+        with STAGE_SECONDS.time(endpoint=endpoint, stage="threshold"):
+            flagged = np.flatnonzero(probabilities >= CLASSIFICATION_THRESHOLD)
+            threat_rows.append(flagged + total_flows + 1)
+            threat_scores.append(probabilities[flagged])
+
+        total_flows += len(probabilities)
+        chunk_count += 1
+        if progress is not None:
+            progress(total_flows)
+
+    if total_flows == 0:
+        raise ValueError("Upload contains no data rows")
+
+    record_rows(endpoint, total_flows)
+    UNIQUE_ROWS_SCORED.inc(unique_flows, endpoint=endpoint)
+    logger.info(
+        "Streamed %d rows in %d chunk(s); %d unique (dedup ratio %.2fx)",
+        total_flows,
+        chunk_count,
+        unique_flows,
+        total_flows / max(unique_flows, 1),
+    )
+    return total_flows, np.concatenate(threat_rows), np.concatenate(threat_scores)
+
+
+def parse_page_args(args):
     """
-    # Drop the Label column if it exists
-    if "Label" in df.columns:
-        df = df.drop(columns=["Label"])
+    Read and validate paging parameters from the query string.
+
+    Args:
+        args: Request query arguments
+
+    Returns:
+        tuple: (offset, limit, order)
+
+    Raises:
+        ValueError: If a parameter is malformed or out of range
+    """
+    offset = int(args.get("offset", 0))
+    limit = int(args.get("limit", RESULT_PAGE_SIZE))
+    order = args.get("order", "row")
+    if offset < 0:
+        raise ValueError("offset must be >= 0")
+    if not 1 <= limit <= RESULT_MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {RESULT_MAX_PAGE_SIZE}")
+    if order not in PAGE_ORDERS:
+        raise ValueError(f"order must be one of {', '.join(PAGE_ORDERS)}")
+    return offset, limit, order
+
+
+def page_response(result_id, result, response_format, offset, limit, order, endpoint):
+    """
+    Build one page of a stored result as columnar JSON or a binary .npz body.
+
+    Threats are parallel arrays (row_number, confidence_score) sliced with
+    NumPy, so no per-row Python objects are built.
+
+    Args:
+        result_id (str): Id for follow-up /results/<result_id> requests
+        result (StoredResult): Stored threats and summary
+        response_format (str): "columnar" or "npz"
+        offset (int): First threat in the requested order
+        limit (int): Page size
+        order (str): "row" or "confidence" (top-N)
+        endpoint (str): Endpoint label for stage metrics
 
-    # Filter to include only TOP_FEATURES in the correct order
-    df_filtered = df[TOP_FEATURES].copy()
+    Returns:
+        flask.Response
+    """
+    with STAGE_SECONDS.time(endpoint=endpoint, stage="details"):
+        rows, scores = result.page(offset, limit, order)
+    end = offset + len(rows)
+    page = {
+        "offset": offset,
+        "limit": limit,
+        "order": order,
+        "returned": int(len(rows)),
+        "next_offset": end if end < len(result) else None,
+    }
+
+    with STAGE_SECONDS.time(endpoint=endpoint, stage="serialize"):
+        if response_format == "npz":
+            # Summary travels inside the archive as a JSON string (no pickle needed)
+            summary = json.dumps({"result_id": result_id, **result.summary, "page": page})
+            buffer = io.BytesIO()
+            np.savez(
+                buffer,
+                row_number=rows,
+                confidence_score=scores,
+                summary=np.array(summary),
+            )
+            response = Response(buffer.getvalue(), mimetype="application/octet-stream")
+            response.headers["X-AegisNet-Result-Id"] = result_id
+            return response
 
-    # Clean the data: replace infinities with NaN, then fill with 0
-    df_filtered.replace([np.inf, -np.inf], np.nan, inplace=True)
-    df_filtered.fillna(0, inplace=True)
+        return jsonify(
+            {
+                "status": "success",
+                "format": "columnar",
+                "result_id": result_id,
+                **result.summary,
+                "page": page,
+                "threats": {
+                    "row_number": rows.tolist(),
+                    "confidence_score": scores.tolist(),
+                },
+            }
+        )
 
-    # Apply the scaler transformation
-    X_scaled = scaler.transform(df_filtered)
 
-    return X_scaled
+def score_upload(file, endpoint, model, progress=None):
+    """
+    Score an upload, reusing a cached result for identical content.
 
+    Args:
+        file: File-like object or path containing CSV or binary feature data
+        endpoint (str): Endpoint label for stage metrics
+        model (ServingModel): Version to score with
+        progress (callable): Optional callback receiving the rows scored so far
 
-def try_get_feature_importances(top_k=5):
+    Returns:
+        tuple: (total_flows, threat_rows, threat_scores, cache_hit)
     """
-    Attempt to compute a proxy for feature importance from the Keras model.
+    result_cache = model.result_cache
+    if result_cache is None:
+        return (*stream_predict(file, endpoint=endpoint, progress=progress, model=model), False)
+
+    with STAGE_SECONDS.time(endpoint=endpoint, stage="hash"):
+        key = result_cache.key(hash_upload(file))
+    cached = result_cache.get(key)
+    if cached is not None:
+        RESULT_CACHE_LOOKUPS.inc(outcome="hit")
+        summary, threat_rows, threat_scores = cached
+        if progress is not None:
+            progress(summary["total_flows"])
+        return summary["total_flows"], threat_rows, threat_scores, True
+
+    RESULT_CACHE_LOOKUPS.inc(outcome="miss")
+    total_flows, threat_rows, threat_scores = stream_predict(
+        file, endpoint=endpoint, progress=progress, model=model
+    )
+    with STAGE_SECONDS.time(endpoint=endpoint, stage="cache_store"):
+        result_cache.put(
+            key,
+            threat_rows,
+            threat_scores,
+            {"total_flows": int(total_flows), "attack_count": len(threat_rows)},
+        )
+    return total_flows, threat_rows, threat_scores, False
+
+
+def build_summary(total_flows, attack_count, endpoint, model):
+    """
+    Counts and feature importances shared by the paged result formats.
+
+    Returns:
+        dict: model_version, total_flows, attack_count, benign_count and,
+        when available, feature_importances
+    """
+    with STAGE_SECONDS.time(endpoint=endpoint, stage="importances"):
+        feature_importances = try_get_feature_importances(model, top_k=5)
+    summary = {
+        "model_version": model.version,
+        "total_flows": int(total_flows),
+        "attack_count": int(attack_count),
+        "benign_count": int(total_flows - attack_count),
+    }
+    if feature_importances:
+        summary["feature_importances"] = feature_importances
+    return summary
+
+
+def score_job(upload_path, progress):
+    """
+    Score one queued upload (runs on a job worker thread).
+
+    Args:
+        upload_path (str): Path of the saved upload
+        progress (callable): Receives the rows scored so far
+
+    Returns:
+        tuple: (threat_rows, threat_scores, summary)
+    """
+    model = current_model()
+    total_flows, threat_rows, threat_scores, cache_hit = score_upload(
+        upload_path, endpoint="jobs", model=model, progress=progress
+    )
+    summary = build_summary(total_flows, len(threat_rows), endpoint="jobs", model=model)
+    logger.info(
+        "Job scored | total=%d attack=%d cache_hit=%s",
+        total_flows,
+        summary["attack_count"],
+        cache_hit,
+    )
+    return threat_rows, threat_scores, summary
+
+
+def try_get_feature_importances(model, top_k=5):
+    """
+    Attempt to compute a proxy for feature importance from the loaded model.
     Uses absolute weights of the first Dense layer as a heuristic.
 
+    Args:
+        model (ServingModel): Version whose weights are inspected
+        top_k (int): Number of features to return
+
     Returns:
         dict[str, float] | None: Mapping of feature name -> importance (normalized), or None if unavailable
     """
     try:
-        # Find first Dense-like layer with weights
-        first_layer = None
-        for layer in getattr(model, "layers", []):
-            weights = layer.get_weights()
-            if weights and len(weights) >= 1:
-                first_layer = layer
-                break
-        if first_layer is None:
+        # Aggregate absolute first-layer weights over units
+        importances = model.scorer.input_importances()
+        if importances is None or importances.size == 0:
             return None
 
-        W = first_layer.get_weights()[0]  # shape: (n_features, units)
-        if W is None or W.size == 0:
-            return None
-
-        importances = np.sum(np.abs(W), axis=1)  # aggregate over units
         # Normalize
         total = float(np.sum(importances))
         if total <= 0:
@@ -168,6 +627,36 @@ def try_get_feature_importances(top_k=5):
         return None
 
 
+# ============================================================================
+# Request Instrumentation
+# ============================================================================
+
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    g.metrics_endpoint = request.endpoint or "unmatched"
+    REQUESTS_IN_FLIGHT.inc(endpoint=g.metrics_endpoint)
+    ensure_registry_watcher()
+
+
+@app.after_request
+def record_request_metrics(response):
+    REQUEST_SECONDS.observe(
+        time.perf_counter() - g.request_start, endpoint=g.metrics_endpoint
+    )
+    REQUESTS_TOTAL.inc(endpoint=g.metrics_endpoint, status=response.status_code)
+    # The version that handled this request (the active one if it used no model)
+    response.headers["X-AegisNet-Model-Version"] = g.get("model_version", active_model.version)
+    return response
+
+
+@app.teardown_request
+def finish_request(exc):
+    if "metrics_endpoint" in g:
+        REQUESTS_IN_FLIGHT.dec(endpoint=g.metrics_endpoint)
+
+
 # ============================================================================
 # API Endpoints
 # ============================================================================
@@ -188,7 +677,15 @@ def root():
 def predict():
     """
     Main prediction endpoint.
-    Accepts a CSV file and returns attack/benign classification counts.
+    Accepts a CSV file (plain, gzip or zstd) or a binary feature file (.npy,
+    columnar .npz, Arrow IPC) and returns attack/benign classification counts.
+
+    Query parameters:
+        format: "legacy" (default) returns every threat in one JSON body.
+            "columnar" and "npz" return one page of threats as parallel
+            arrays, plus a result_id for paging via /results/<result_id>.
+        offset, limit, order: Paging for the columnar/npz formats
+            (order="confidence" gives the top-N threats first).
 
     Returns:
         JSON response with prediction results or error message
@@ -202,51 +699,64 @@ def predict():
 
         file = request.files["file"]
 
-        # Read the CSV file into a DataFrame
-        df = pd.read_csv(file)
-        logger.info("CSV loaded with shape %s", df.shape)
-
-        # Clean column names
-        df = clean_column_names(df)
-
-        # Preprocess the data
-        X_scaled = preprocess_data(df)
-        logger.info("Data preprocessed: shape after scaling %s", X_scaled.shape)
-
-        # Make predictions
-        probabilities = model.predict(X_scaled)
-
-        # Apply classification threshold
-        predictions = (probabilities >= CLASSIFICATION_THRESHOLD).astype(int).flatten()
-
-        # Calculate statistics
-        total_flows = len(predictions)
-        attack_count = np.sum(predictions == 1)
-        benign_count = np.sum(predictions == 0)
-
-        # Get threat indices (1-based row numbers for user-friendly display)
-        threat_indices = [int(i + 1) for i, pred in enumerate(predictions) if pred == 1]
-
-        # Build threat details including confidence scores
-        probs_flat = probabilities.flatten().tolist()
-        threat_details = [
-            {
-                "row_number": int(i + 1),
-                "predicted_label": "ATTACK",
-                "confidence_score": float(probs_flat[i]),
-            }
-            for i, pred in enumerate(predictions)
-            if pred == 1
-        ]
+        response_format = request.args.get("format", "legacy")
+        try:
+            if response_format not in RESPONSE_FORMATS:
+                raise ValueError(f"format must be one of {', '.join(RESPONSE_FORMATS)}")
+            page_args = parse_page_args(request.args)
+        except ValueError as e:
+            return jsonify({"status": "error", "error": str(e)}), 400
+
+        # Stream the upload through the model in bounded-size chunks
+        # (or reuse the result of an identical earlier upload)
+        model = current_model()
+        total_flows, threat_rows, threat_scores, cache_hit = score_upload(
+            file, endpoint="predict", model=model
+        )
+        cache_header = {"X-AegisNet-Cache": "hit" if cache_hit else "miss"}
+        attack_count = len(threat_rows)
+        benign_count = total_flows - attack_count
+
+        if response_format != "legacy":
+            summary = build_summary(total_flows, attack_count, endpoint="predict", model=model)
+            result_id = results.put(threat_rows, threat_scores, summary)
+            logger.info(
+                "Predictions generated | total=%d benign=%d attack=%d result_id=%s",
+                total_flows,
+                benign_count,
+                attack_count,
+                result_id,
+            )
+            return page_response(
+                result_id, results.get(result_id), response_format, *page_args, endpoint="predict"
+            ), 200, cache_header
+
+        with STAGE_SECONDS.time(endpoint="predict", stage="details"):
+            # Get threat indices (1-based row numbers for user-friendly display)
+            threat_indices = threat_rows.tolist()
+
+            # Build threat details including confidence scores
+            threat_details = [
+                {
+                    "row_number": row_number,
+                    "predicted_label": "ATTACK",
+                    "confidence_score": confidence_score,
+                }
+                for row_number, confidence_score in zip(
+                    threat_indices, threat_scores.tolist()
+                )
+            ]
 
         # Try to compute feature importances (optional)
-        feature_importances = try_get_feature_importances(top_k=5)
+        with STAGE_SECONDS.time(endpoint="predict", stage="importances"):
+            feature_importances = try_get_feature_importances(model, top_k=5)
         if feature_importances is not None:
             logger.info("Feature importances computed: %s", feature_importances)
 
         # Return success response
         payload = {
             "status": "success",
+            "model_version": model.version,
             "total_flows": int(total_flows),
             "attack_count": int(attack_count),
             "benign_count": int(benign_count),
@@ -262,13 +772,121 @@ def predict():
             benign_count,
             attack_count,
         )
-        return jsonify(payload), 200
+        with STAGE_SECONDS.time(endpoint="predict", stage="serialize"):
+            response = jsonify(payload)
+        return response, 200, cache_header
 
+    except NonNumericFeatureError as e:
+        logger.warning("Rejected upload: %s", e)
+        return jsonify({"status": "error", "error": str(e)}), 400
     except Exception as e:
         logger.exception("Error in /predict endpoint")
         return jsonify({"status": "error", "error": str(e)}), 500
 
 
+@app.route("/results/<result_id>", methods=["GET"])
+def get_results(result_id):
+    """
+    Page through the threats of an earlier /predict call.
+
+    Query parameters:
+        format: "columnar" (default) or "npz"
+        offset, limit, order: As for /predict
+
+    Returns:
+        One page of threats, 404 if the result is unknown or expired
+    """
+    result = results.get(result_id)
+    if result is None:
+        return jsonify({"status": "error", "error": "Unknown or expired result_id"}), 404
+
+    response_format = request.args.get("format", "columnar")
+    try:
+        if response_format not in ("columnar", "npz"):
+            raise ValueError("format must be one of columnar, npz")
+        page_args = parse_page_args(request.args)
+    except ValueError as e:
+        return jsonify({"status": "error", "error": str(e)}), 400
+    return page_response(
+        result_id, result, response_format, *page_args, endpoint="results"
+    ), 200
+
+
+@app.route("/jobs", methods=["POST"])
+def submit_job():
+    """
+    Queue an upload (any format /predict accepts) for background scoring.
+    The upload is saved to disk and a job id is returned immediately.
+
+    Returns:
+        202 with the job id, 503 if the job queue is full
+    """
+    if "file" not in request.files:
+        return jsonify({"status": "error", "error": "No file part"}), 400
+    file = request.files["file"]
+    try:
+        job_id = jobs.submit(file, filename=file.filename or "upload.csv")
+    except QueueFullError:
+        logger.warning("Job queue full; rejecting upload")
+        return jsonify({"status": "error", "error": "Server busy"}), 503
+    except Exception as e:
+        logger.exception("Error in /jobs endpoint")
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+    logger.info("Job %s queued (%s)", job_id, file.filename)
+    response = jsonify({"status": "success", "job_id": job_id, "state": "queued"})
+    response.headers["Location"] = f"/jobs/{job_id}"
+    return response, 202
+
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    """
+    Job state and progress.
+
+    Returns:
+        JSON with state (queued/running/done/failed), rows processed,
+        total rows, progress, rows/s, ETA and, once done, the summary
+    """
+    if not is_job_id(job_id):
+        return jsonify({"status": "error", "error": "Unknown or expired job_id"}), 404
+    status = jobs.get(job_id)
+    if status is None:
+        return jsonify({"status": "error", "error": "Unknown or expired job_id"}), 404
+    return jsonify({"status": "success", "job": status}), 200
+
+
+@app.route("/jobs/<job_id>/results", methods=["GET"])
+def job_results(job_id):
+    """
+    Page through a finished job's threats (same parameters as /results/<id>).
+
+    Returns:
+        One page of threats, 404 if unknown or expired, 409 if not finished
+    """
+    if not is_job_id(job_id):
+        return jsonify({"status": "error", "error": "Unknown or expired job_id"}), 404
+    result = jobs.load_result(job_id)
+    if result is None:
+        status = jobs.get(job_id)
+        if status is None:
+            return jsonify({"status": "error", "error": "Unknown or expired job_id"}), 404
+        return jsonify(
+            {"status": "error", "error": f"Job is {status['state']}", "job": status}
+        ), 409
+
+    response_format = request.args.get("format", "columnar")
+    try:
+        if response_format not in ("columnar", "npz"):
+            raise ValueError("format must be one of columnar, npz")
+        page_args = parse_page_args(request.args)
+    except ValueError as e:
+        return jsonify({"status": "error", "error": str(e)}), 400
+    return page_response(
+        job_id, result, response_format, *page_args, endpoint="jobs"
+    ), 200
+
+
 @app.route("/predict_single", methods=["POST"])
 def predict_single():
     """
@@ -281,24 +899,46 @@ def predict_single():
     try:
         logger.info("/predict_single called")
         # Get JSON data from request
-        json_data = request.get_json()
+        with STAGE_SECONDS.time(endpoint="predict_single", stage="parse"):
+            json_data = request.get_json()
 
         if not json_data:
             logger.warning("No JSON data provided")
             return jsonify({"status": "error", "error": "No JSON data provided"}), 400
 
-        # Convert the single JSON record into a one-row pandas DataFrame
-        # The columns must match TOP_FEATURES
-        df_single = pd.DataFrame([json_data])
-
-        # Preprocess the single-row DataFrame
-        X_scaled = preprocess_data(df_single)
-
-        # Make prediction
-        y_pred_probs = model.predict(X_scaled, verbose=0)
-
-        # Extract the single probability score
-        confidence_score = float(y_pred_probs[0][0])
+        # Clean the single JSON record straight into a one-row feature block
+        # The keys must include TOP_FEATURES
+        with STAGE_SECONDS.time(endpoint="predict_single", stage="preprocess"):
+            try:
+                X_clean = record_to_block(json_data)
+            except (KeyError, NonNumericFeatureError) as e:
+                logger.warning("Rejected record: %s", e.args[0])
+                return jsonify({"status": "error", "error": e.args[0]}), 400
+
+        # Make prediction (merged with concurrent requests when batching)
+        model = current_model()
+        predict_start = time.perf_counter()
+        if model.batcher is not None:
+            try:
+                confidence_score = model.batcher.predict(
+                    X_clean[0], timeout=MICROBATCH_TIMEOUT_S
+                )
+            except QueueFullError:
+                logger.warning("Micro-batch queue full; rejecting request")
+                return jsonify({"status": "error", "error": "Server busy"}), 503
+            except FutureTimeoutError:
+                # The row stays queued and is scored later; only this caller gives up
+                logger.warning("No micro-batch result within %ss; rejecting request", MICROBATCH_TIMEOUT_S)
+                return jsonify({"status": "error", "error": "Prediction timed out"}), 504
+        else:
+            y_pred_probs = model.scorer.predict(X_clean)
+
+            # Extract the single probability score
+            confidence_score = float(y_pred_probs[0][0])
+        STAGE_SECONDS.observe(
+            time.perf_counter() - predict_start, endpoint="predict_single", stage="predict"
+        )
+        record_rows("predict_single", 1)
 
         # Apply classification threshold
         prediction_binary = 1 if confidence_score >= CLASSIFICATION_THRESHOLD else 0
@@ -311,6 +951,7 @@ def predict_single():
         return jsonify(
             {
                 "status": "success",
+                "model_version": model.version,
                 "prediction": prediction_label,
                 "confidence_score": confidence_score,
             }
@@ -321,6 +962,109 @@ def predict_single():
         return jsonify({"status": "error", "error": str(e)}), 500
 
 
+@app.route("/stats/batching", methods=["GET"])
+def batching_stats():
+    """
+    Micro-batching statistics for /predict_single.
+
+    Returns:
+        JSON response with queue depth and batch-size distribution
+    """
+    batcher = current_model().batcher
+    if batcher is None:
+        return jsonify({"status": "success", "enabled": False}), 200
+    return jsonify({"status": "success", "enabled": True, **batcher.stats()}), 200
+
+
+def admin_denied():
+    """
+    Check access to /admin/* endpoints.
+    With ADMIN_TOKEN set the X-AegisNet-Admin-Token header must match it;
+    otherwise only loopback clients are allowed.
+
+    Returns:
+        Error response tuple, or None if the request is allowed
+    """
+    if ADMIN_TOKEN is not None:
+        if request.headers.get("X-AegisNet-Admin-Token") != ADMIN_TOKEN:
+            return jsonify({"status": "error", "error": "Invalid admin token"}), 403
+    elif request.remote_addr not in ("127.0.0.1", "::1"):
+        return jsonify({"status": "error", "error": "Admin endpoints are loopback-only"}), 403
+    return None
+
+
+@app.route("/admin/model", methods=["GET"])
+def model_info():
+    """
+    Active model version, reload status and published registry versions.
+
+    Returns:
+        JSON response with the serving version and the registry contents
+    """
+    denied = admin_denied()
+    if denied:
+        return denied
+    model = current_model()
+    return jsonify(
+        {
+            "status": "success",
+            "active_version": model.version,
+            "backend": model.scorer.backend,
+            "loaded_at": model.loaded_at,
+            "cascade_short_circuit_fraction": (
+                model.scorer.short_circuit_fraction()
+                if isinstance(model.scorer, CascadeScorer)
+                else None
+            ),
+            "registry_current": current_version(),
+            "reload": dict(reload_status),
+            "versions": list_versions(),
+        }
+    ), 200
+
+
+@app.route("/admin/reload", methods=["POST"])
+def admin_reload():
+    """
+    Hot-swap the model without downtime.
+    The version is loaded and warmed up in the background, then swapped in;
+    requests already running finish on the previous version.
+
+    JSON body (optional):
+        version: Registry version to load (default: the registry's CURRENT)
+
+    Returns:
+        202 once loading has started, 404 for an unknown version (or one
+        the configured backend cannot serve), 409 if a reload is already running
+    """
+    denied = admin_denied()
+    if denied:
+        return denied
+    version = (request.get_json(silent=True) or {}).get("version")
+    try:
+        started = reload_model(version)
+    except ValueError as e:
+        return jsonify({"status": "error", "error": str(e)}), 404
+    if not started:
+        return jsonify({"status": "error", "error": "A reload is already in progress"}), 409
+    logger.info("Model reload requested (version=%s)", version or "CURRENT")
+    response = jsonify({"status": "success", "state": "loading", "version": version})
+    response.headers["Location"] = "/admin/model"
+    return response, 202
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """
+    Prometheus scrape endpoint.
+
+    Returns:
+        Per-stage latency histograms, request counters, in-flight gauges,
+        rows scored and model load time in Prometheus text format
+    """
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+
 # ============================================================================
 # Run the Application
 # ============================================================================
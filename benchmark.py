@@ -0,0 +1,513 @@
+# AegisNet Inference Benchmark Suite
+#
+# Usage:
+#   python benchmark.py                       # all scenarios, saved model
+#   python benchmark.py --backend numpy --rows 200000
+#   python benchmark.py --random-model        # offline, randomly initialized weights
+#   python benchmark.py --input-format npz --scenarios parse predict_http
+#   python benchmark.py --compare reports/benchmarks/OLD.json reports/benchmarks/NEW.json
+#
+# Each scenario runs in a fresh subprocess so startup time and peak RSS are
+# measured in isolation. Results are written as JSON keyed by git commit.
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+BENCHMARK_DIR = os.path.join("reports", "benchmarks")
+
+SCENARIOS = [
+    "parse",
+    "predict_http",
+    "predict_direct",
+    "predictor",
+    "predict_single_http",
+    "predict_single_direct",
+]
+
+# Metrics shown by --compare, with the direction that counts as an improvement
+COMPARED_METRICS = {
+    "rows_per_s": "higher",
+    "p50_ms": "lower",
+    "p95_ms": "lower",
+    "p99_ms": "lower",
+    "peak_rss_mb": "lower",
+    "time_to_first_prediction_s": "lower",
+}
+
+
+# ============================================================================
+# Artifacts
+# ============================================================================
+
+
+def architecture_hyperparameters():
+    """Champion hyperparameters from the tradeoff report, if one exists."""
+    from src.config import TRADEOFF_REPORT_PATH
+
+    try:
+        with open(TRADEOFF_REPORT_PATH) as f:
+            return json.load(f)["champion"]["hyperparameters"]
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def build_random_artifacts(output_dir, seed=42):
+    """Create a randomly initialized model, scaler, fused engine and TFLite export.
+
+    The architecture is cloned from the saved model when present, otherwise
+    built by the hypermodel from the champion (or default) hyperparameters.
+    The scaler is fitted on synthetic flows.
+
+    Returns:
+        Dict of artifact paths (model, scaler, fused, tflite)
+    """
+    import joblib
+    import keras_tuner as kt
+    import tensorflow as tf
+    from sklearn.preprocessing import StandardScaler
+
+    from src.config import MODEL_PATH, TOP_FEATURES
+    from src.feature_transform import scaling_params, transform
+    from src.flow_generator import generate_flows
+    from src.inference_engine import export_fused_model
+    from src.model_builder import build_hypermodel
+    from src.quantizer import convert_model
+
+    print(":: [Benchmark] - Building randomly initialized model artifacts... ::")
+    tf.keras.utils.set_random_seed(seed)
+    if os.path.exists(MODEL_PATH):
+        model = tf.keras.models.clone_model(tf.keras.models.load_model(MODEL_PATH))
+        print(f"-- Architecture cloned from {MODEL_PATH}")
+    else:
+        hp = kt.HyperParameters()
+        build_hypermodel(hp, input_shape=len(TOP_FEATURES))
+        hp.values.update(architecture_hyperparameters())
+        model = build_hypermodel(hp, input_shape=len(TOP_FEATURES))
+        print(f"-- Architecture built from hyperparameters {hp.values}")
+
+    X = transform(generate_flows(50000, seed=seed))
+    scaler = StandardScaler().fit(X)
+
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {
+        "model": os.path.join(output_dir, "aegisnet.keras"),
+        "scaler": os.path.join(output_dir, "aegisnet_scaler.joblib"),
+        "fused": os.path.join(output_dir, "aegisnet_fused.npz"),
+        "tflite": os.path.join(output_dir, "aegisnet_quant.tflite"),
+    }
+    model.save(paths["model"])
+    joblib.dump(scaler, paths["scaler"])
+    export_fused_model(model, scaler, paths["fused"], X_check=X[:4096])
+    with open(paths["tflite"], "wb") as f:
+        f.write(convert_model(model, calibration=transform(X[:2000], scaling_params(scaler), sanitize=False)))
+    return paths
+
+
+def saved_artifacts():
+    """Absolute paths of the project's saved model artifacts."""
+    from src.config import MODEL_PATH, SCALER_SAVE_PATH, FUSED_MODEL_PATH, TFLITE_MODEL_PATH
+
+    return {
+        "model": os.path.abspath(MODEL_PATH),
+        "scaler": os.path.abspath(SCALER_SAVE_PATH),
+        "fused": os.path.abspath(FUSED_MODEL_PATH),
+        "tflite": os.path.abspath(TFLITE_MODEL_PATH),
+    }
+
+
+# ============================================================================
+# Worker side (runs inside one subprocess per scenario)
+# ============================================================================
+
+
+def configure_worker(config):
+    """Point src.config at the benchmark artifacts before app/predictor import it."""
+    import src.config
+
+    src.config.MODEL_PATH = config["artifacts"]["model"]
+    src.config.SCALER_SAVE_PATH = config["artifacts"]["scaler"]
+    src.config.FUSED_MODEL_PATH = config["artifacts"]["fused"]
+    src.config.TFLITE_MODEL_PATH = config["artifacts"]["tflite"]
+    src.config.INFERENCE_BACKEND = config["backend"]
+    # Serve the benchmark artifacts, not a published registry version
+    src.config.MODEL_REGISTRY_DIR = os.path.join(config["work_dir"], "registry")
+    # Repeated uploads of the same CSV would otherwise be answered from the cache
+    src.config.RESULT_CACHE_ENABLED = False
+
+
+def latency_summary(latencies_s):
+    latencies_ms = np.asarray(latencies_s) * 1000.0
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    return {
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "mean_ms": float(np.mean(latencies_ms)),
+    }
+
+
+def timed_calls(fn, calls, concurrency=1):
+    """Run fn(i) for i in range(calls) and record per-call latency.
+
+    Returns:
+        Tuple of (latencies in seconds, wall time in seconds)
+    """
+    latencies = [0.0] * calls
+
+    def run(i):
+        start = time.perf_counter()
+        fn(i)
+        latencies[i] = time.perf_counter() - start
+
+    wall_start = time.perf_counter()
+    if concurrency <= 1:
+        for i in range(calls):
+            run(i)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(run, range(calls)))
+    return latencies, time.perf_counter() - wall_start
+
+
+def single_records(config):
+    """JSON-ready single-flow payloads drawn from the synthetic generator."""
+    from src.config import TOP_FEATURES
+    from src.flow_generator import generate_flows
+
+    df = generate_flows(config["single_requests"], seed=config["seed"] + 1)[TOP_FEATURES]
+    df = df.replace([np.inf, -np.inf], np.nan).fillna(0)
+    return df.to_dict(orient="records")
+
+
+def batch_scenario(config, load, call):
+    """Time a whole-file scoring path.
+
+    Args:
+        config: Worker configuration
+        load: Callable performing imports/model loading, returning a context
+        call: Callable(context) scoring config["input_path"] once
+    """
+    context = load()
+    call(context)
+    first_prediction_at = time.time()
+
+    for _ in range(config["warmup"]):
+        call(context)
+    latencies, wall = timed_calls(lambda i: call(context), config["repeats"])
+    result = latency_summary(latencies)
+    result["rows_per_s"] = config["rows"] * config["repeats"] / wall
+    return result, first_prediction_at
+
+
+def single_scenario(config, load, call):
+    """Time a one-flow-per-call path, optionally with concurrent callers."""
+    context = load()
+    records = single_records(config)
+    call(context, records[0])
+    first_prediction_at = time.time()
+
+    for i in range(min(config["warmup"] * 10, len(records))):
+        call(context, records[i])
+    latencies, wall = timed_calls(
+        lambda i: call(context, records[i]), len(records), config["concurrency"]
+    )
+    result = latency_summary(latencies)
+    result["rows_per_s"] = len(records) / wall
+    result["concurrency"] = config["concurrency"]
+    return result, first_prediction_at
+
+
+def load_app():
+    import app
+
+    return app
+
+
+def run_scenario(name, config):
+    if name == "parse":
+
+        def load():
+            from src.feature_transform import transform
+            from src.input_formats import read_feature_chunks
+
+            return read_feature_chunks, transform
+
+        def call(context):
+            # Read, decompress/decode and clean the upload, without scoring it
+            read_feature_chunks, transform = context
+            for chunk in read_feature_chunks(config["input_path"]):
+                transform(chunk)
+
+        return batch_scenario(config, load, call)
+
+    if name == "predict_http":
+        upload_name = os.path.basename(config["input_path"])
+
+        def load():
+            client = load_app().app.test_client()
+            with open(config["input_path"], "rb") as f:
+                return client, f.read()
+
+        def call(context):
+            import io
+
+            client, data = context
+            response = client.post(
+                "/predict", data={"file": (io.BytesIO(data), upload_name)}
+            )
+            assert response.status_code == 200, response.get_data(as_text=True)
+
+        return batch_scenario(config, load, call)
+
+    if name == "predict_direct":
+        return batch_scenario(
+            config, load_app, lambda app: app.stream_predict(config["input_path"])
+        )
+
+    if name == "predictor":
+
+        def load():
+            import predictor
+
+            # run_predictor writes prediction_report.csv to the working directory
+            os.chdir(config["work_dir"])
+            return predictor
+
+        return batch_scenario(
+            config,
+            load,
+            lambda predictor: predictor.run_predictor(config["input_path"], config["backend"]),
+        )
+
+    if name == "predict_single_http":
+        local = threading.local()
+
+        def call(app, record):
+            if not hasattr(local, "client"):
+                local.client = app.app.test_client()
+            response = local.client.post("/predict_single", json=record)
+            assert response.status_code == 200, response.get_data(as_text=True)
+
+        return single_scenario(config, load_app, call)
+
+    if name == "predict_single_direct":
+        def call(app, record):
+            # Same path as the endpoint, without HTTP and JSON handling
+            X_clean = app.record_to_block(record)
+            model = app.current_model()
+            if model.batcher is not None:
+                model.batcher.predict(X_clean[0])
+            else:
+                model.scorer.predict(X_clean)
+
+        return single_scenario(config, load_app, call)
+
+    raise ValueError(f"Unknown scenario: {name}")
+
+
+def run_worker(name, config_path, output_path):
+    """Subprocess entry point: run one scenario and write its metrics as JSON."""
+    import resource
+
+    with open(config_path) as f:
+        config = json.load(f)
+    configure_worker(config)
+
+    result, first_prediction_at = run_scenario(name, config)
+    # ru_maxrss is reported in KiB on Linux
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result["peak_rss_mb"] = peak_rss_kb / 1024.0
+    result["time_to_first_prediction_s"] = first_prediction_at - config["launched_at"]
+
+    with open(output_path, "w") as f:
+        json.dump(result, f)
+
+
+# ============================================================================
+# Driver side
+# ============================================================================
+
+
+def git_revision():
+    """Short commit hash, with a -dirty suffix if the tree has local changes."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+
+def launch_scenario(name, config, work_dir, verbose=False):
+    """Run one scenario in a fresh interpreter and return its metrics."""
+    config = dict(config, launched_at=time.time())
+    config_path = os.path.join(work_dir, f"{name}.config.json")
+    output_path = os.path.join(work_dir, f"{name}.result.json")
+    with open(config_path, "w") as f:
+        json.dump(config, f)
+
+    output = None if verbose else subprocess.DEVNULL
+    process = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", name, config_path, output_path],
+        cwd=PROJECT_ROOT, stdout=output, stderr=output,
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"Scenario {name} failed (exit {process.returncode}); rerun with --verbose")
+    with open(output_path) as f:
+        return json.load(f)
+
+
+def run_benchmarks(args):
+    from src.flow_generator import write_flows_csv
+
+    work_dir = tempfile.mkdtemp(prefix="aegisnet_bench_")
+    csv_path = os.path.join(work_dir, "flows.csv")
+    print(f":: [Benchmark] - Generating {args.rows} synthetic flows... ::")
+    write_flows_csv(csv_path, args.rows, seed=args.seed)
+    input_path = csv_path
+    if args.input_format != "csv":
+        from src.input_formats import convert_input
+
+        input_path = os.path.join(work_dir, "flows." + args.input_format)
+        convert_input(csv_path, input_path, args.input_format)
+    input_bytes = os.path.getsize(input_path)
+    print(f"-- Input: {args.input_format}, {input_bytes / 1e6:.1f} MB ({input_bytes / args.rows:.1f} bytes/row)")
+
+    from src.config import MODEL_PATH
+
+    random_model = args.random_model or not os.path.exists(MODEL_PATH)
+    if random_model:
+        artifacts = build_random_artifacts(os.path.join(work_dir, "models"), args.seed)
+    else:
+        artifacts = saved_artifacts()
+        if args.backend == "tflite" and not os.path.exists(artifacts["tflite"]):
+            print(f"ERROR: {artifacts['tflite']} not found. Run 'python -m src.quantizer' or use --random-model.")
+            sys.exit(1)
+
+    config = {
+        "backend": args.backend,
+        "artifacts": artifacts,
+        "random_model": random_model,
+        "input_path": input_path,
+        "input_format": args.input_format,
+        "input_bytes": input_bytes,
+        "work_dir": work_dir,
+        "rows": args.rows,
+        "repeats": args.repeats,
+        "warmup": args.warmup,
+        "single_requests": args.single_requests,
+        "concurrency": args.concurrency,
+        "seed": args.seed,
+    }
+
+    results = {}
+    try:
+        for name in args.scenarios:
+            print(f"-- Running {name}...")
+            results[name] = launch_scenario(name, config, work_dir, args.verbose)
+            metrics = results[name]
+            print(
+                f"   {metrics['rows_per_s']:,.0f} rows/s | p50={metrics['p50_ms']:.2f}ms "
+                f"p95={metrics['p95_ms']:.2f}ms p99={metrics['p99_ms']:.2f}ms | "
+                f"peak RSS={metrics['peak_rss_mb']:.0f}MB | "
+                f"first prediction after {metrics['time_to_first_prediction_s']:.2f}s"
+            )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    revision = git_revision()
+    report = {
+        "commit": revision,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+        },
+        "config": {
+            key: value
+            for key, value in config.items()
+            if key not in ("artifacts", "input_path", "work_dir")
+        },
+        "results": results,
+    }
+    output_path = args.output or os.path.join(BENCHMARK_DIR, f"{revision}-{args.backend}.json")
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f":: [Benchmark] - Results saved to {output_path} ::")
+    return report
+
+
+def compare_reports(baseline_path, candidate_path):
+    """Print per-scenario metric changes between two benchmark result files."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    with open(candidate_path) as f:
+        candidate = json.load(f)
+
+    print(f":: [Benchmark] - {baseline['commit']} -> {candidate['commit']} ::")
+    for name, metrics in candidate["results"].items():
+        if name not in baseline["results"]:
+            continue
+        print(f"\n{name}")
+        for metric, better in COMPARED_METRICS.items():
+            old = baseline["results"][name].get(metric)
+            new = metrics.get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old * 100.0 if old else float("inf")
+            improved = change > 0 if better == "higher" else change < 0
+            marker = "+" if improved else "-" if change else " "
+            print(f"  {marker} {metric:<28} {old:>12.3f} -> {new:>12.3f} ({change:+.1f}%)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="AegisNet inference benchmarks")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--backend", choices=["keras", "numpy", "tflite"], default="keras")
+    parser.add_argument("--rows", type=int, default=100000, help="Rows in the synthetic CSV")
+    parser.add_argument(
+        "--input-format", choices=["csv", "csv.gz", "csv.zst", "npy", "npz", "arrow"], default="csv",
+        help="Encoding of the synthetic input file (see src/input_formats.py)",
+    )
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per batch scenario")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs before timing")
+    parser.add_argument("--single-requests", type=int, default=2000, help="Calls per single-row scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent single-row callers")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--random-model", action="store_true", help="Use randomly initialized weights")
+    parser.add_argument("--output", help="Result JSON path (default: reports/benchmarks/<commit>-<backend>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CANDIDATE"))
+    parser.add_argument("--verbose", action="store_true", help="Show scenario subprocess output")
+    parser.add_argument("--worker", nargs=3, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.worker:
+        run_worker(*args.worker)
+    elif args.compare:
+        compare_reports(*args.compare)
+    else:
+        run_benchmarks(args)
@@ -39,6 +39,13 @@ let resultsChartInstance = null;
 let featureChartInstance = null;
 let currentThreatIndices = [];
 let currentThreatDetails = [];
+let currentResultsUrl = null; // Paged threats on the API (GET /jobs/<id>/results)
+let currentAttackCount = 0;
+
+// Threat rows shown in the panel; the full log is paged from the API on export
+const THREAT_PREVIEW_COUNT = 50;
+const EXPORT_PAGE_SIZE = 10000;
+const JOB_POLL_INTERVAL_MS = 500;
 
 document.addEventListener('DOMContentLoaded', () => {
   // Ensure submit button is disabled on initial load regardless of HTML state
@@ -358,15 +365,8 @@ document.addEventListener('DOMContentLoaded', () => {
     try {
       consoleLog('> Dataset validated successfully.', 'success');
       consoleLog('> Running deep threat scan...', 'info');
-      const response = await fetch(`${API_BASE_URL}/predict`, {
-        method: 'POST',
-        body: formData,
-      });
-
-      if (!response.ok)
-        throw new Error(`HTTP ${response.status}: ${response.statusText}`);
-
-      const data = await response.json();
+      // Background job: upload returns at once, progress is polled
+      const data = await runScanJob(formData);
       hideLoader();
 
       if (data.status === 'success') {
@@ -398,6 +398,52 @@ document.addEventListener('DOMContentLoaded', () => {
     }
   });
 
+  async function runScanJob(formData) {
+    const submitResponse = await fetch(`${API_BASE_URL}/jobs`, {
+      method: 'POST',
+      body: formData,
+    });
+    if (!submitResponse.ok)
+      throw new Error(
+        `HTTP ${submitResponse.status}: ${submitResponse.statusText}`
+      );
+    const { job_id } = await submitResponse.json();
+    consoleLog(`> Scan job ${job_id.slice(0, 8)} queued.`, 'info');
+
+    let lastRows = -1;
+    for (;;) {
+      await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+      const statusResponse = await fetch(`${API_BASE_URL}/jobs/${job_id}`);
+      if (!statusResponse.ok)
+        throw new Error(
+          `HTTP ${statusResponse.status}: ${statusResponse.statusText}`
+        );
+      const { job } = await statusResponse.json();
+      if (job.state === 'failed') throw new Error(job.error || 'Scan failed');
+      if (job.state === 'done') break;
+      if (job.state === 'running' && job.rows_processed !== lastRows) {
+        lastRows = job.rows_processed;
+        const pct = (job.progress * 100).toFixed(1);
+        const eta = job.eta_s != null ? ` | ETA ${Math.ceil(job.eta_s)}s` : '';
+        consoleLog(
+          `> Scanned ${job.rows_processed.toLocaleString()} / ${job.total_rows.toLocaleString()} flows (${pct}%)${eta}`,
+          'info'
+        );
+      }
+    }
+
+    // Summary + first page of threats; the rest is paged on export
+    const resultsUrl = `${API_BASE_URL}/jobs/${job_id}/results`;
+    const response = await fetch(
+      `${resultsUrl}?format=columnar&limit=${THREAT_PREVIEW_COUNT}`
+    );
+    if (!response.ok)
+      throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+    const data = await response.json();
+    data.results_url = resultsUrl;
+    return data;
+  }
+
   // ===============================
   // EVENT LISTENER 2: MANUAL ANALYSIS
   // ===============================
@@ -531,6 +577,8 @@ document.addEventListener('DOMContentLoaded', () => {
       attack_count,
       threat_indices,
       threat_details,
+      threats,
+      results_url,
       feature_importances,
     } = data;
 
@@ -547,13 +595,16 @@ document.addEventListener('DOMContentLoaded', () => {
       resultsChartInstance.update();
     }
 
-    // Handle threat indices display
-    if (threat_indices && threat_indices.length > 0) {
-      currentThreatIndices = threat_indices;
+    // Handle threat indices display (columnar page or legacy full payload)
+    const rowNumbers = threats ? threats.row_number : threat_indices;
+    currentResultsUrl = results_url || null;
+    currentAttackCount = attack_count;
+    if (rowNumbers && rowNumbers.length > 0) {
+      currentThreatIndices = rowNumbers;
       currentThreatDetails = Array.isArray(threat_details)
         ? threat_details
         : [];
-      displayThreatIndices(threat_indices);
+      displayThreatIndices(rowNumbers, attack_count);
       threatRecordsPanel.classList.add('active');
     } else {
       threatRecordsPanel.classList.remove('active');
@@ -631,7 +682,7 @@ document.addEventListener('DOMContentLoaded', () => {
     console.log('✅ Threat panel initialized');
   }
 
-  function displayThreatIndices(indices) {
+  function displayThreatIndices(indices, totalCount = indices.length) {
     if (!threatIndicesList) return;
 
     // Clear previous content
@@ -639,7 +690,7 @@ document.addEventListener('DOMContentLoaded', () => {
     threatMoreText.style.display = 'none';
 
     // Display first 50 indices
-    const displayCount = Math.min(50, indices.length);
+    const displayCount = Math.min(THREAT_PREVIEW_COUNT, indices.length);
     const displayIndices = indices.slice(0, displayCount);
 
     displayIndices.forEach((index) => {
@@ -650,31 +701,63 @@ document.addEventListener('DOMContentLoaded', () => {
     });
 
     // Show "and more" message if there are more than 50
-    if (indices.length > 50) {
+    if (totalCount > displayCount) {
       threatMoreText.style.display = 'block';
       threatMoreText.textContent = `...and ${
-        indices.length - 50
+        totalCount - displayCount
       } more. Download full log below.`;
     }
 
-    console.log(
-      `✅ Displayed ${displayCount} of ${indices.length} threat indices`
-    );
+    console.log(`✅ Displayed ${displayCount} of ${totalCount} threat indices`);
+  }
+
+  async function fetchThreatRows(resultsUrl) {
+    // Page through the stored results instead of one giant response
+    const rows = [];
+    let offset = 0;
+    while (offset !== null) {
+      const response = await fetch(
+        `${resultsUrl}?format=columnar&offset=${offset}&limit=${EXPORT_PAGE_SIZE}`
+      );
+      if (response.status === 404)
+        throw new Error('Results expired on the server. Re-run the analysis.');
+      if (!response.ok)
+        throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+      const page = await response.json();
+      const { row_number, confidence_score } = page.threats;
+      for (let i = 0; i < row_number.length; i++) {
+        rows.push([row_number[i], 'ATTACK', confidence_score[i]]);
+      }
+      offset = page.page.next_offset;
+    }
+    return rows;
   }
 
-  function downloadThreatLog() {
-    if (!currentThreatDetails || currentThreatDetails.length === 0) {
+  async function downloadThreatLog() {
+    let rows;
+    if (currentResultsUrl && currentAttackCount > 0) {
+      try {
+        toastr.info('📥 Fetching threat log...', 'Export');
+        rows = await fetchThreatRows(currentResultsUrl);
+      } catch (error) {
+        console.error('❌ Threat export error:', error);
+        toastr.error(`Export Failed: ${error.message}`, 'Error');
+        return;
+      }
+    } else {
+      rows = currentThreatDetails.map((d) => [
+        d.row_number,
+        d.predicted_label,
+        d.confidence_score,
+      ]);
+    }
+    if (!rows || rows.length === 0) {
       toastr.warning('⚠️ No threat records to download.');
       return;
     }
     // Build CSV content
     const timestamp = new Date().toISOString().replace(/[:.]/g, '-');
     const headers = ['row_number', 'predicted_label', 'confidence_score'];
-    const rows = currentThreatDetails.map((d) => [
-      d.row_number,
-      d.predicted_label,
-      d.confidence_score,
-    ]);
     const csvLines = [headers.join(','), ...rows.map((r) => r.join(','))];
     const csvContent = csvLines.join('\n');
 
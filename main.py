@@ -1,110 +1,549 @@
 # AegisNet v1.2 - Main Execution Pipeline
+#
+# Usage:
+#   python main.py                     # load -> preprocess -> tune -> train -> evaluate -> report
+#   python main.py select              # rank features for TOP_FEATURES (first run only)
+#   python main.py train --epochs 25   # retrain the champion only (reuses the search)
+#   python main.py --force evaluate    # rerun a stage even though it is up to date
+#
+# Every stage stores its outputs under cache/pipeline/<stage>/<hash of its
+# inputs>/ (PIPELINE_CACHE_DIR). A rerun skips stages whose inputs have not
+# changed, and an interrupted search or champion fit continues where it stopped.
 
-import tensorflow as tf
+import argparse
+import json
+import os
+import shutil
+import sys
+
+import joblib
 import keras_tuner as kt
-from src.data_loader import load_and_combine_data
-from src.data_preprocessor import preprocess_data
+import numpy as np
+import pandas as pd
+import tensorflow as tf
+from sklearn.preprocessing import StandardScaler
+
+from src.config import (
+    MODEL_PATH,
+    SCALER_SAVE_PATH,
+    FUSED_MODEL_PATH,
+    TFLITE_MODEL_PATH,
+    TFLITE_QUANTIZATION,
+    TFLITE_CALIBRATION_ROWS,
+    TFLITE_PARITY_ROWS,
+    TFLITE_MAX_FLIP_RATE,
+    TFLITE_MAX_RECALL_DROP,
+    CASCADE_MODEL_PATH,
+    CASCADE_FEATURES,
+    CASCADE_MAX_DEPTH,
+    CASCADE_MIN_SAMPLES_LEAF,
+    CASCADE_TRAIN_ROWS,
+    CASCADE_CALIBRATION_ROWS,
+    CASCADE_MAX_MISS_RATE,
+    STREAMING_TRAINING,
+    STREAM_BATCH_SIZE,
+    TUNER_SEED,
+    TUNER_WORKERS,
+    LATENCY_BUDGET_MS,
+    LATENCY_BATCH_SIZE,
+    LATENCY_CANDIDATE_TRIALS,
+    TRADEOFF_REPORT_PATH,
+    REPORTS_DIR,
+    CLASSIFICATION_THRESHOLD,
+    TARGET_FPRS,
+    INFERENCE_BACKEND,
+    TOP_FEATURES,
+)
+from src.feature_cache import load_features, read_manifest
+from src.feature_selector import get_important_features
+from src.feature_transform import scaling_params, transform
+from src.data_pipeline import split_indices, fit_scaler_streaming, make_dataset
+from src.hyper_tuner import build_tuner, search_callbacks, run_parallel_search
+from src.latency_profiler import (
+    measure_trial_costs,
+    select_champion,
+    save_tradeoff_report,
+)
 from src.model_builder import build_hypermodel
-from src.model_trainer import MODEL_SAVE_PATH
-from src.model_evaluator import evaluate_model
+from src.model_evaluator import evaluate_model, format_auc, roc_auc
+from src.model_registry import ARTIFACT_NAMES, publish_version
 from src.report_generator import generate_plots
+from src.inference_engine import export_fused_model, FusedMLP, KerasScorer
+from src.cascade import PreFilter, train_cascade, evaluate_cascade
+from src.quantizer import export_quantized_model
+from src.stage_cache import run_stage, source_hash
 
 
-def run_pipeline():
-    """Execute the AegisNet v1.2 anomaly detection pipeline with hyperparameter tuning."""
-    print(":: [AegisNet v1.2] - INITIATING ANOMALY DETECTION PIPELINE... ::")
-    print(":: [Phase 1/4] - LOADING DATA ::")
+# Rows used for the Hyperband search (a smaller subset makes it faster)
+SEARCH_TRAIN_ROWS = 500000
+SEARCH_VAL_ROWS = 100000
+SEARCH_EPOCHS = 10
 
-    df = load_and_combine_data()
+# Champion fit on the full training split
+CHAMPION_EPOCHS = 15  # Upper bound (train the final model for a bit longer)
+CHAMPION_PATIENCE = 3  # Stop once val_loss has not improved for this many epochs
+CHAMPION_BATCH_SIZE = 1024  # In-memory mode (streaming uses STREAM_BATCH_SIZE)
+
+# Output files inside the stage directories
+TRAIN_INDEX_NAME = "train_idx.npy"
+TEST_INDEX_NAME = "test_idx.npy"
+SELECTED_FEATURES_NAME = "top_features.json"
+TRADEOFF_NAME = "tradeoff.json"
+HISTORY_NAME = "history.csv"
+BACKUP_NAME = "backup"
+
+# Stage order, the stages each one needs, and its banner
+STAGE_DEPENDENCIES = {
+    "load": (),
+    "preprocess": ("load",),
+    "select": ("load",),
+    "tune": ("preprocess",),
+    "train": ("tune",),
+    "evaluate": ("train",),
+    "report": ("evaluate",),
+}
+STAGE_TITLES = {
+    "load": "LOADING DATA",
+    "preprocess": "PREPROCESSING DATA",
+    "select": "RUNNING FEATURE SELECTION",
+    "tune": "SEARCHING MODEL ARCHITECTURE",
+    "train": "TRAINING CHAMPION MODEL",
+    "evaluate": "EVALUATING MODEL PERFORMANCE",
+    "report": "REPORTING & PUBLISHING",
+}
+# Stages run by a plain `python main.py` (feature selection is run on request)
+DEFAULT_STAGES = ("report",)
+
+
+def resolve_stages(targets):
+    """Requested stages plus everything they depend on, in pipeline order."""
+    needed = set()
+
+    def visit(stage):
+        if stage not in needed:
+            needed.add(stage)
+            for dependency in STAGE_DEPENDENCIES[stage]:
+                visit(dependency)
+
+    for target in targets:
+        visit(target)
+    return [stage for stage in STAGE_DEPENDENCIES if stage in needed]
+
+
+def _record(state, stage, manifest, directory):
+    state["digests"][stage] = manifest["digest"]
+    state["outputs"][stage] = manifest["outputs"]
+    state["dirs"][stage] = directory
+
+
+def _stage_file(state, stage, name):
+    return os.path.join(state["dirs"][stage], name)
 
-    print(":: [Phase 1/4] - DATA LOADED. ::")
-    print(df.shape)
-    print(":: [Ingestion_Engine] - Verifying data types... ::")
-    print(df.info())
 
-    print(":: [Phase 2/4] - PREPROCESSING DATA ::")
-    X_train, X_test, y_train, y_test, X_unscaled, y_unscaled = preprocess_data(df)
-    print(":: [Phase 2/4] - PREPROCESSING COMPLETE. ::")
+def training_inputs(state):
+    """Build (once) the inputs for the tuner search, champion fit and evaluation.
 
+    In-memory mode scales full NumPy splits. Streaming mode keeps X on disk
+    and feeds tf.data pipelines that scale rows on the fly. Nothing is built
+    when every stage that needs these inputs is up to date.
+
+    Returns:
+        Dict with 'search' and 'fit' keyword arguments for fit(), plus
+        'X_eval' and 'y_eval' for evaluate_model
+    """
+    if "inputs" in state:
+        return state["inputs"]
+    X, y, scaler = state["X"], state["y"], state["scaler"]
+    train_idx, test_idx = state["train_idx"], state["test_idx"]
+
+    if STREAMING_TRAINING:
+        val_ds = make_dataset(X, y, test_idx, scaler)
+        state["inputs"] = {
+            "search": {
+                "x": make_dataset(X, y, train_idx[:SEARCH_TRAIN_ROWS], scaler, shuffle=True),
+                "validation_data": make_dataset(X, y, test_idx[:SEARCH_VAL_ROWS], scaler),
+            },
+            "fit": {
+                "x": make_dataset(X, y, train_idx, scaler, shuffle=True),
+                "validation_data": val_ds,
+            },
+            # make_dataset streams indices in sorted order; align labels to it
+            "X_eval": val_ds,
+            "y_eval": y[np.sort(test_idx)],
+        }
+        return state["inputs"]
+
+    print("-- Standardizing feature scales...")
+    # Same float32 multiply-add kernel the scorers use at serving time
+    scaling = scaling_params(scaler)
+    features = list(X.columns)
+    X_train = transform(X.iloc[train_idx], scaling, sanitize=False, features=features)
+    X_test = transform(X.iloc[test_idx], scaling, sanitize=False, features=features)
+    y_train, y_test = y[train_idx], y[test_idx]
     print(f"X_train shape: {X_train.shape}")
-    print(f"y_train shape: {y_train.shape}")
     print(f"X_test shape: {X_test.shape}")
-    print(f"y_test shape: {y_test.shape}")
-
-    # # Phase 2.5: Feature Selection (COMMENT OUT AFTER FIRST RUN)
-    # print(":: [Phase 2.5] - RUNNING FEATURE SELECTION ::")
-    # top_features_list = get_important_features(X_unscaled, y_unscaled)
-    # print("\n !! ACTION REQUIRED !!")
-    # print(
-    #     "Copy the list of features above into 'src/config.py' in the 'TOP_FEATURES' variable."
-    # )
-    # print("Then, comment out this 'Phase 2.5' block and re-run main.py to use them.")
-    # return  # Stop the pipeline here for the user to update the config
-
-    print(":: [Phase 3/4] - BUILDING & TRAINING MODEL ::")
-
-    # HyperTuner: Search for optimal architecture
-    tuner = kt.Hyperband(
-        hypermodel=lambda hp: build_hypermodel(hp, input_shape=X_train.shape[1]),
-        objective="val_accuracy",
-        max_epochs=10,
-        factor=3,
-        directory="models",
-        project_name="aegisnet_hyperband",
-    )
+    state["inputs"] = {
+        "search": {
+            "x": X_train[:SEARCH_TRAIN_ROWS],
+            "y": y_train[:SEARCH_TRAIN_ROWS],
+            "validation_data": (X_test[:SEARCH_VAL_ROWS], y_test[:SEARCH_VAL_ROWS]),
+        },
+        "fit": {
+            "x": X_train,
+            "y": y_train,
+            "validation_data": (X_test, y_test),
+            "batch_size": CHAMPION_BATCH_SIZE,
+        },
+        "X_eval": X_test,
+        "y_eval": y_test,
+    }
+    return state["inputs"]
 
-    # Create a callback to stop training early if it stops improving
-    stop_early = tf.keras.callbacks.EarlyStopping(monitor="val_loss", patience=3)
-
-    print(":: [HyperTuner] - Searching for optimal model architecture... ::")
-    # We use a smaller subset of data for the search to make it faster.
-    X_train_sample = X_train[:500000]
-    y_train_sample = y_train[:500000]
-    X_test_sample = X_test[:100000]
-    y_test_sample = y_test[:100000]
-
-    tuner.search(
-        X_train_sample,
-        y_train_sample,
-        epochs=10,
-        validation_data=(X_test_sample, y_test_sample),
-        callbacks=[stop_early],
-    )
 
-    # Get the optimal hyperparameters
-    best_hps = tuner.get_best_hyperparameters(num_trials=1)[0]
-    print(f":: [HyperTuner] - BEST HPs FOUND: {best_hps.values} ::")
-
-    # Build the 'champion' model with the best HPs and train it on ALL data
-    print(":: [TrainingSubsystem] - Training 'Champion' model on full dataset... ::")
-    champion_model = tuner.hypermodel.build(best_hps)
-    history = champion_model.fit(
-        X_train,
-        y_train,
-        validation_data=(X_test, y_test),
-        epochs=15,  # Train the final model for a bit longer
-        batch_size=1024,
-        callbacks=[stop_early],
+def build_champion(hyperparameters, input_shape):
+    """Build the hypermodel with fixed hyperparameter values (fresh weights)."""
+    hp = kt.HyperParameters()
+    build_hypermodel(hp, input_shape=input_shape)
+    hp.values.update(hyperparameters)
+    return build_hypermodel(hp, input_shape=input_shape)
+
+
+def load_history(path):
+    """Rebuild a Keras History object from the per-epoch CSV log."""
+    history = tf.keras.callbacks.History()
+    history.history = pd.read_csv(path).drop(columns="epoch").to_dict("list")
+    return history
+
+
+def stage_load(state):
+    """Sanitized features, from the memory-mapped cache when it is valid.
+
+    The feature cache is already keyed by a fingerprint of the source files
+    and cleaning rules, which serves as this stage's digest.
+    """
+    X, y = load_features(rebuild="load" in state["force"])
+    state["X"], state["y"] = X, y
+    state["digests"]["load"] = read_manifest()["fingerprint"]
+    print(X.shape)
+    print(":: [Ingestion_Engine] - Verifying data types... ::")
+    print(X.info())
+
+
+def stage_preprocess(state):
+    """Stratified 80/20 split indices and the production scaler."""
+    X, y = state["X"], state["y"]
+    inputs = {
+        "features": state["digests"]["load"],
+        "streaming": STREAMING_TRAINING,
+        "code": source_hash(split_indices, fit_scaler_streaming),
+    }
+
+    def compute(out_dir):
+        print("-- Splitting row indices (80% train, 20% test)...")
+        train_idx, test_idx = split_indices(y)
+        scaler_path = os.path.join(out_dir, ARTIFACT_NAMES["scaler_path"])
+        if STREAMING_TRAINING:
+            fit_scaler_streaming(X, train_idx, save_path=scaler_path)
+        else:
+            print("-- Fitting scaler on the training split...")
+            joblib.dump(StandardScaler().fit(X.iloc[train_idx]), scaler_path)
+        np.save(os.path.join(out_dir, TRAIN_INDEX_NAME), train_idx)
+        np.save(os.path.join(out_dir, TEST_INDEX_NAME), test_idx)
+        outputs = {"train_rows": len(train_idx), "test_rows": len(test_idx)}
+        return outputs, [TRAIN_INDEX_NAME, TEST_INDEX_NAME, ARTIFACT_NAMES["scaler_path"]]
+
+    _record(state, "preprocess", *run_stage("preprocess", inputs, compute, "preprocess" in state["force"]))
+    state["train_idx"] = np.load(_stage_file(state, "preprocess", TRAIN_INDEX_NAME))
+    state["test_idx"] = np.load(_stage_file(state, "preprocess", TEST_INDEX_NAME))
+    state["scaler"] = joblib.load(_stage_file(state, "preprocess", ARTIFACT_NAMES["scaler_path"]))
+    print(f"-- Train rows: {len(state['train_idx'])} | Test rows: {len(state['test_idx'])}")
+
+
+def stage_select(state):
+    """Rank the loaded feature columns with a RandomForest."""
+    inputs = {"features": state["digests"]["load"], "code": source_hash(get_important_features)}
+
+    def compute(out_dir):
+        top_features = get_important_features(state["X"], state["y"])
+        with open(os.path.join(out_dir, SELECTED_FEATURES_NAME), "w") as f:
+            json.dump(top_features, f, indent=2)
+        return {"top_features": top_features}, [SELECTED_FEATURES_NAME]
+
+    _record(state, "select", *run_stage("select", inputs, compute, "select" in state["force"]))
+    if TOP_FEATURES:
+        print(
+            f"-- TOP_FEATURES is set, so only those {len(TOP_FEATURES)} columns were ranked; "
+            "empty it in 'src/config.py' to rank every column."
+        )
+    print("\n !! ACTION REQUIRED !!")
+    print(json.dumps(state["outputs"]["select"]["top_features"], indent=4))
+    print(
+        "Copy the list of features above (also saved to "
+        f"{_stage_file(state, 'select', SELECTED_FEATURES_NAME)}) into 'src/config.py' "
+        "in the 'TOP_FEATURES' variable."
     )
+    print("Then re-run main.py; the feature cache and every later stage rebuild for the new columns.")
+
+
+def stage_tune(state):
+    """Hyperband search, then latency-aware champion selection."""
+    input_shape = state["X"].shape[1]
+    inputs = {
+        "split": state["digests"]["preprocess"],
+        "search_rows": [SEARCH_TRAIN_ROWS, SEARCH_VAL_ROWS],
+        "epochs": SEARCH_EPOCHS,
+        "seed": TUNER_SEED,
+        "latency": [LATENCY_BUDGET_MS, LATENCY_BATCH_SIZE, LATENCY_CANDIDATE_TRIALS],
+        "code": source_hash(build_hypermodel, build_tuner),
+    }
+
+    def compute(out_dir):
+        print(":: [HyperTuner] - Searching for optimal model architecture... ::")
+        search = training_inputs(state)["search"]
+        if TUNER_WORKERS > 1:
+            tuner = run_parallel_search(
+                search, input_shape, TUNER_WORKERS, epochs=SEARCH_EPOCHS, directory=out_dir
+            )
+        else:
+            # Reloads the oracle state an interrupted search left in out_dir
+            tuner = build_tuner(input_shape, directory=out_dir)
+            tuner.search(**search, epochs=SEARCH_EPOCHS, callbacks=search_callbacks())
+
+        # Get the optimal hyperparameters under the inference latency budget
+        trial_costs = measure_trial_costs(tuner, input_shape)
+        choice = select_champion(trial_costs)
+        save_tradeoff_report(trial_costs, choice, path=os.path.join(out_dir, TRADEOFF_NAME))
+        best_hps = tuner.oracle.get_trial(choice["trial_id"]).hyperparameters
+        return {"trial_id": choice["trial_id"], "hyperparameters": best_hps.values}, []
+
+    _record(state, "tune", *run_stage("tune", inputs, compute, "tune" in state["force"]))
+    print(f":: [HyperTuner] - BEST HPs FOUND: {state['outputs']['tune']['hyperparameters']} ::")
+
+
+def stage_train(state):
+    """Champion fit on the full training split, plus the fused and cascade exports.
+
+    BackupAndRestore checkpoints the model and optimizer after every epoch,
+    so an interrupted fit resumes from the last completed epoch, and the
+    CSV log keeps the history of every attempt.
+    """
+    X, y, scaler, train_idx = state["X"], state["y"], state["scaler"], state["train_idx"]
+    epochs = state["epochs"]
+    inputs = {
+        "split": state["digests"]["preprocess"],
+        "hyperparameters": state["digests"]["tune"],
+        "epochs": epochs,
+        "patience": CHAMPION_PATIENCE,
+        "streaming": STREAMING_TRAINING,
+        "batch_size": STREAM_BATCH_SIZE if STREAMING_TRAINING else CHAMPION_BATCH_SIZE,
+        "cascade": [
+            CASCADE_FEATURES,
+            CASCADE_MAX_DEPTH,
+            CASCADE_MIN_SAMPLES_LEAF,
+            CASCADE_TRAIN_ROWS,
+            CASCADE_CALIBRATION_ROWS,
+            CASCADE_MAX_MISS_RATE,
+        ],
+        "code": source_hash(build_hypermodel),
+    }
+
+    def compute(out_dir):
+        print(":: [TrainingSubsystem] - Training 'Champion' model on full dataset... ::")
+        backup_dir = os.path.join(out_dir, BACKUP_NAME)
+        history_path = os.path.join(out_dir, HISTORY_NAME)
+        if not os.path.isdir(backup_dir) and os.path.exists(history_path):
+            # The last attempt finished fitting, so this fit starts over
+            os.remove(history_path)
+        champion_model = build_champion(state["outputs"]["tune"]["hyperparameters"], X.shape[1])
+        champion_model.fit(
+            **training_inputs(state)["fit"],
+            epochs=epochs,
+            callbacks=[
+                # Stop training early if it stops improving
+                tf.keras.callbacks.EarlyStopping(monitor="val_loss", patience=CHAMPION_PATIENCE),
+                tf.keras.callbacks.BackupAndRestore(backup_dir),
+                tf.keras.callbacks.CSVLogger(history_path, append=True),
+            ],
+        )
+        model_path = os.path.join(out_dir, ARTIFACT_NAMES["model_path"])
+        champion_model.save(model_path)
+        print(f"-- Champion model saved to {model_path} --")
+
+        # Export the TensorFlow-free serving engine (scaler folded into layer 1)
+        export_fused_model(champion_model, scaler, os.path.join(out_dir, ARTIFACT_NAMES["fused_path"]))
+
+        # Fit the cascade's cheap first stage on the same training rows
+        train_cascade(X, y, train_idx, output_path=os.path.join(out_dir, ARTIFACT_NAMES["cascade_path"]))
+        outputs = {"epochs": len(pd.read_csv(history_path))}
+        files = [ARTIFACT_NAMES[key] for key in ("model_path", "fused_path", "cascade_path")]
+        return outputs, files + [HISTORY_NAME]
+
+    _record(state, "train", *run_stage("train", inputs, compute, "train" in state["force"]))
+    print(f"-- Champion trained for {state['outputs']['train']['epochs']} epochs")
+
 
-    # Save the champion model
-    champion_model.save(MODEL_SAVE_PATH)
-    print(f"-- Champion model saved to {MODEL_SAVE_PATH} --")
-    print(":: [Phase 3/4] - MODEL TRAINING COMPLETE. ::")
+def stage_evaluate(state):
+    """Threshold sweep, cascade comparison and quantized TFLite export with parity check."""
+    X, y, scaler = state["X"], state["y"], state["scaler"]
+    inputs = {
+        "model": state["digests"]["train"],
+        "split": state["digests"]["preprocess"],
+        "threshold": CLASSIFICATION_THRESHOLD,
+        "target_fprs": TARGET_FPRS,
+        "backend": INFERENCE_BACKEND,
+        "tflite": [
+            TFLITE_QUANTIZATION,
+            TFLITE_CALIBRATION_ROWS,
+            TFLITE_PARITY_ROWS,
+            TFLITE_MAX_FLIP_RATE,
+            TFLITE_MAX_RECALL_DROP,
+        ],
+    }
 
-    print(":: [Phase 4/5] - GENERATING PERFORMANCE PLOTS ::")
-    generate_plots(history)
-    print(":: [Phase 4/5] - PLOTS SAVED to 04_reports folder. ::")
+    def compute(out_dir):
+        champion_model = tf.keras.models.load_model(_stage_file(state, "train", ARTIFACT_NAMES["model_path"]))
+        inputs = training_inputs(state)
+        sweep = evaluate_model(champion_model, inputs["X_eval"], inputs["y_eval"])
 
-    print(":: [Phase 5/5] - EVALUATING MODEL PERFORMANCE ::")
+        # Measure what the cascade saves (and misses) with the serving backend
+        train_idx, test_idx = state["train_idx"], np.sort(state["test_idx"])
+        if INFERENCE_BACKEND == "numpy":
+            dnn_scorer = FusedMLP.load(_stage_file(state, "train", ARTIFACT_NAMES["fused_path"]))
+        else:
+            dnn_scorer = KerasScorer(champion_model, scaler)
+        prefilter = PreFilter.load(_stage_file(state, "train", ARTIFACT_NAMES["cascade_path"]))
+        cascade_report = evaluate_cascade(prefilter, dnn_scorer, X.iloc[test_idx], y[test_idx])
 
-    # Call the evaluation function with the champion model
-    evaluate_model(champion_model, X_test, y_test)
+        # Quantized TFLite export, written only if its parity report passes
+        tflite_report = export_quantized_model(
+            champion_model,
+            scaler,
+            X,
+            y,
+            train_idx,
+            test_idx,
+            output_path=os.path.join(out_dir, ARTIFACT_NAMES["tflite_path"]),
+        )
+        outputs = {
+            "roc_auc": roc_auc(sweep),
+            "cascade": {
+                "short_circuit_fraction": cascade_report["short_circuit_fraction"],
+                "speedup": cascade_report["speedup"],
+                "recall_delta": cascade_report["recall_delta"],
+            },
+            "tflite": {
+                "mode": tflite_report["mode"],
+                "passed": tflite_report["passed"],
+                "flip_rate": tflite_report["decision_flips"]["rate"],
+            },
+        }
+        return outputs, [ARTIFACT_NAMES["tflite_path"]] if tflite_report["passed"] else []
 
-    print(":: [Phase 5/5] - EVALUATION COMPLETE. ::")
+    _record(state, "evaluate", *run_stage("evaluate", inputs, compute, "evaluate" in state["force"]))
+    print(f"-- ROC-AUC: {format_auc(state['outputs']['evaluate']['roc_auc'])}")
+
+
+def stage_report(state):
+    """Plot the training history, install the artifacts in models/ and publish a version."""
+    inputs = {stage: state["digests"][stage] for stage in ("preprocess", "tune", "train", "evaluate")}
+
+    def compute(out_dir):
+        generate_plots(load_history(_stage_file(state, "train", HISTORY_NAME)))
+        shutil.copy2(_stage_file(state, "tune", TRADEOFF_NAME), TRADEOFF_REPORT_PATH)
+        print(f"-- Accuracy/latency tradeoff saved to {TRADEOFF_REPORT_PATH}")
+
+        installs = [
+            ("train", "model_path", MODEL_PATH),
+            ("preprocess", "scaler_path", SCALER_SAVE_PATH),
+            ("train", "fused_path", FUSED_MODEL_PATH),
+            ("train", "cascade_path", CASCADE_MODEL_PATH),
+        ]
+        artifacts = {"tflite_path": None}
+        if state["outputs"]["evaluate"]["tflite"]["passed"]:
+            installs.append(("evaluate", "tflite_path", TFLITE_MODEL_PATH))
+        elif os.path.exists(TFLITE_MODEL_PATH):
+            # An older champion's export must not be served next to this one
+            os.remove(TFLITE_MODEL_PATH)
+            print(f"-- Removed {TFLITE_MODEL_PATH} (the new export failed its parity check)")
+        for stage, key, destination in installs:
+            artifacts[key] = _stage_file(state, stage, ARTIFACT_NAMES[key])
+            shutil.copy2(artifacts[key], destination)
+            print(f"-- Installed {destination}")
+
+        # Publish exactly the evaluated artifacts; running APIs hot-swap to them
+        evaluation = state["outputs"]["evaluate"]
+        version = publish_version(
+            **artifacts,
+            metadata={
+                "hyperparameters": state["outputs"]["tune"]["hyperparameters"],
+                "roc_auc": evaluation["roc_auc"],
+                "threshold": CLASSIFICATION_THRESHOLD,
+                "cascade": evaluation["cascade"],
+                "tflite": evaluation["tflite"],
+            },
+        )
+        return {"version": version}, []
+
+    _record(state, "report", *run_stage("report", inputs, compute, "report" in state["force"]))
+    print(f"-- Published version: {state['outputs']['report']['version']}")
+
+
+STAGE_FUNCTIONS = {
+    "load": stage_load,
+    "preprocess": stage_preprocess,
+    "select": stage_select,
+    "tune": stage_tune,
+    "train": stage_train,
+    "evaluate": stage_evaluate,
+    "report": stage_report,
+}
+
+
+def run_pipeline(stages=DEFAULT_STAGES, force=(), epochs=CHAMPION_EPOCHS):
+    """Execute the AegisNet v1.2 anomaly detection pipeline with hyperparameter tuning.
+
+    Args:
+        stages: Stages to bring up to date (their dependencies run too)
+        force: Stages to recompute even if their outputs are current
+        epochs: Max epochs for the champion fit
+    """
+    print(":: [AegisNet v1.2] - INITIATING ANOMALY DETECTION PIPELINE... ::")
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    state = {"force": set(force), "epochs": epochs, "digests": {}, "outputs": {}, "dirs": {}}
+    plan = resolve_stages(list(stages) + list(force))
+    for i, stage in enumerate(plan, start=1):
+        print(f":: [Stage {i}/{len(plan)}: {stage}] - {STAGE_TITLES[stage]} ::")
+        STAGE_FUNCTIONS[stage](state)
+        print(f":: [Stage {i}/{len(plan)}: {stage}] - COMPLETE. ::")
     print()
     print(":: [AegisNet v1.2] - PIPELINE FINISHED. SYSTEM NOMINAL. ::")
 
 
 if __name__ == "__main__":
-    run_pipeline()
+    parser = argparse.ArgumentParser(description="Train, evaluate and publish the AegisNet model")
+    parser.add_argument(
+        "stages",
+        nargs="*",
+        metavar="STAGE",
+        help=f"Stages to run, with their dependencies: {', '.join(STAGE_DEPENDENCIES)} "
+        "(default: every stage but 'select')",
+    )
+    parser.add_argument(
+        "--force",
+        action="append",
+        default=[],
+        choices=list(STAGE_DEPENDENCIES),
+        metavar="STAGE",
+        help="Recompute a stage even if its outputs are up to date (repeatable)",
+    )
+    parser.add_argument("--epochs", type=int, default=CHAMPION_EPOCHS, help="Max champion epochs")
+    args = parser.parse_args()
+    unknown = [stage for stage in args.stages if stage not in STAGE_DEPENDENCIES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+
+    try:
+        run_pipeline(args.stages or DEFAULT_STAGES, args.force, args.epochs)
+    except FileNotFoundError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
@@ -1,86 +1,312 @@
 # AegisNet v1.3.1 - Standalone Prediction Script (Warning-Free)
+#
+# Usage:
+#   python predictor.py data/Monday-WorkingHours.pcap_ISCX.csv
+#   python predictor.py flows.csv.zst
+#   python predictor.py exports/ "sensors/*/flows-*.csv" --workers 4
+#
+# Inputs may be CSV (plain, .gz or .zst) or binary .npy/.npz/Arrow IPC files
+# (see src/input_formats.py). A single file is scored into
+# prediction_report.csv (or --output). Several files, directories or globs
+# are fanned out across worker processes that each load the model once, with
+# one <name>_predictions.csv per input in --output-dir and a combined summary
+# at the end.
+
+import argparse
+import glob
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 import pandas as pd
 import numpy as np
-import joblib
-import sys
-from tensorflow.keras.models import load_model
-from src.config import SCALER_SAVE_PATH, TOP_FEATURES, CLASSIFICATION_THRESHOLD
+from src.config import (
+    TOP_FEATURES,
+    CLASSIFICATION_THRESHOLD,
+    INFERENCE_BACKEND,
+    DEDUP_ENABLED,
+    PREDICT_CHUNK_SIZE,
+    PREDICTOR_OUTPUT_DIR,
+    PREDICTOR_WORKERS,
+)
+from src.inference_engine import configure_worker_threads, load_scorer, predict_deduplicated
+from src.feature_transform import transform
+from src.input_formats import INPUT_EXTENSIONS, input_stem, read_feature_chunks
+from src.cascade import CascadeScorer
+from src.model_registry import resolve_version
+
+# Report written by single-file runs
+REPORT_PATH = "prediction_report.csv"
+# Model loaded by each batch-mode worker process (see _init_worker)
+_worker_scorer = None
+
+
+def load_predictor_scorer(backend=INFERENCE_BACKEND, verbose=True):
+    """Load the registry's CURRENT version (or the configured model files).
+
+    Args:
+        backend: Inference backend, "keras", "numpy" (fused engine) or "tflite"
+        verbose: Print which artifacts are loaded
+
+    Returns:
+        Tuple of (version, scorer)
+    """
+    version, _, paths = resolve_version(backend=backend)
+    if verbose:
+        if backend == "numpy":
+            print(f"-- Loading fused NumPy engine from {paths['fused_path']}...")
+        elif backend == "tflite":
+            print(f"-- Loading quantized TFLite model from {paths['tflite_path']}...")
+            print(f"-- Loading data scaler from {paths['scaler_path']}...")
+        else:
+            print(f"-- Loading Champion model from {paths['model_path']}...")
+            print(f"-- Loading data scaler from {paths['scaler_path']}...")
+        print(f"-- Model version: {version}")
+    return version, load_scorer(backend, **paths)
 
-MODEL_SAVE_PATH = "models/aegisnet.keras"
 
+def score_file(scorer, input_path, output_path, chunk_size=PREDICT_CHUNK_SIZE):
+    """Score one input file chunk by chunk, appending each annotated chunk to its report.
 
-def clean_column_names(df):
-    """Strip leading/trailing whitespace from all column names.
+    Memory stays proportional to chunk_size. The report is written under a
+    temporary name and renamed when complete, so a crash never leaves a
+    truncated file that looks finished.
 
     Args:
-        df: pandas DataFrame
+        scorer: Object exposing predict(X) on cleaned, unscaled features
+        input_path: CSV (plain, .gz or .zst) with at least the TOP_FEATURES
+            columns, or a binary .npy/.npz/Arrow input (see src.input_formats)
+        output_path: Report CSV (input columns, or TOP_FEATURES for binary
+            inputs, plus prediction_probability and prediction)
+        chunk_size: Rows per chunk
 
     Returns:
-        DataFrame with cleaned column names
+        Dict with input/output paths, rows, unique_rows, attacks and seconds
     """
-    df.columns = [col.strip() if isinstance(col, str) else col for col in df.columns]
-    return df
+    start = time.perf_counter()
+    rows = unique_rows = attacks = 0
+    tmp_path = output_path + ".part"
+    try:
+        with open(tmp_path, "w", newline="") as report:
+            for chunk in read_feature_chunks(input_path, chunk_size, all_columns=True):
+                # Top features in model order as one float32 block; inf and NaN become 0
+                X = transform(chunk)
+                if not isinstance(chunk, pd.DataFrame):
+                    chunk = pd.DataFrame(chunk, columns=TOP_FEATURES)
+                if DEDUP_ENABLED:
+                    # Identical flows (floods, repeated scans) are scored once
+                    probabilities, n_unique = predict_deduplicated(scorer, X)
+                else:
+                    probabilities, n_unique = scorer.predict(X), len(X)
+                probabilities = np.asarray(probabilities).reshape(-1)
+                is_attack = probabilities > CLASSIFICATION_THRESHOLD
 
+                chunk["prediction_probability"] = probabilities
+                chunk["prediction"] = np.where(is_attack, "ATTACK", "BENIGN")
+                chunk.to_csv(report, header=rows == 0, index=False)
+                rows += len(chunk)
+                unique_rows += n_unique
+                attacks += int(np.count_nonzero(is_attack))
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return {
+        "input": input_path,
+        "output": output_path,
+        "rows": rows,
+        "unique_rows": unique_rows,
+        "attacks": attacks,
+        "seconds": time.perf_counter() - start,
+    }
 
-def run_predictor(input_csv_path):
+
+def run_predictor(input_csv_path, backend=INFERENCE_BACKEND, output_path=REPORT_PATH):
     """Run the AegisNet predictor on new data.
 
     Args:
-        input_csv_path: Path to the CSV file containing new data
+        input_csv_path: Path to the input file (CSV, .csv.gz, .csv.zst, .npy,
+            .npz or Arrow IPC)
+        backend: Inference backend, "keras", "numpy" (fused engine) or "tflite"
+        output_path: Report CSV to write
+
+    Returns:
+        Summary dict from score_file
     """
     print(":: [AegisNet v1.3.1 PREDICTOR] - Initiating... ::")
 
-    # Step 1: Load Data
-    print(f"-- Loading new data from {input_csv_path}...")
-    new_data_df = pd.read_csv(input_csv_path)
-    new_data_df = clean_column_names(new_data_df)
-    original_df = new_data_df.copy()  # Keep a copy for the final report
+    # Step 1: Load Model and Scaler (the registry's CURRENT version, if published)
+    _, scorer = load_predictor_scorer(backend)
 
-    # Step 2: Load Model and Scaler
-    print(f"-- Loading Champion model from {MODEL_SAVE_PATH}...")
-    model = load_model(MODEL_SAVE_PATH)
-    print(f"-- Loading data scaler from {SCALER_SAVE_PATH}...")
-    scaler = joblib.load(SCALER_SAVE_PATH)
+    # Step 2: Stream the data through preprocessing, scoring and the report
+    print(f"-- Scoring {input_csv_path} in chunks of {PREDICT_CHUNK_SIZE} rows...")
+    print(f"-- Preprocessing: filtering for Top {len(TOP_FEATURES)} features")
+    print(f"-- Running predictions... (Threshold: {CLASSIFICATION_THRESHOLD * 100}%)")
+    summary = score_file(scorer, input_csv_path, output_path)
+    rows, unique_rows = summary["rows"], summary["unique_rows"]
+    if DEDUP_ENABLED:
+        print(
+            f"-- Scored {unique_rows} unique rows for {rows} flows "
+            f"(dedup ratio {rows / max(unique_rows, 1):.2f}x)"
+        )
+    if isinstance(scorer, CascadeScorer):
+        print(f"-- Cascade pre-filter cleared {scorer.short_circuit_fraction():.2%} of scored rows as benign")
 
-    # Step 3: Preprocess New Data
-    print(f"-- Preprocessing data... (Filtering for Top {len(TOP_FEATURES)} features)")
-    if "Label" in new_data_df.columns:
-        new_data_df = new_data_df.drop("Label", axis=1)
+    print("\n:: [AegisNet PREDICTOR] - COMPLETE ::")
+    print(f"-- Final report saved to: {output_path}")
+    print(f"-- BENIGN: {rows - summary['attacks']} | ATTACK: {summary['attacks']}")
+    print(f"-- {rows / max(summary['seconds'], 1e-9):,.0f} rows/s")
+    return summary
 
-    # Filter for the Top 30 features in the correct order
-    new_data_X = new_data_df[TOP_FEATURES].copy()  # Use .copy() to prevent warnings
 
-    # Clean 'inf' and 'nan' values using .loc to modify the DataFrame directly
-    new_data_X.loc[:, :] = new_data_X.replace([np.inf, -np.inf], np.nan)
-    new_data_X.loc[:, :] = new_data_X.fillna(0)
+def expand_inputs(patterns):
+    """Resolve files, directories (their CSV and binary inputs) and glob patterns.
 
-    # Scale the data
-    X_scaled = scaler.transform(new_data_X)
+    Args:
+        patterns: Paths or glob patterns (** matches across directories)
 
-    # Step 4: Make Predictions
-    print(f"-- Running predictions... (Threshold: {CLASSIFICATION_THRESHOLD * 100}%)")
-    y_pred_probs = model.predict(X_scaled)
-    y_pred = (y_pred_probs > CLASSIFICATION_THRESHOLD).astype(int)
+    Returns:
+        Sorted list of distinct input paths
 
-    # Step 5: Generate Report
-    print("-- Generating prediction report... ::")
-    original_df["prediction_probability"] = y_pred_probs
-    original_df["prediction"] = np.where(y_pred == 1, "ATTACK", "BENIGN")
+    Raises:
+        FileNotFoundError: If a pattern matches nothing
+    """
+    paths = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = [
+                entry.path for entry in os.scandir(pattern)
+                if entry.is_file() and entry.name.lower().endswith(INPUT_EXTENSIONS)
+            ]
+        elif os.path.isfile(pattern):
+            matches = [pattern]
+        else:
+            matches = [path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path)]
+        if not matches:
+            raise FileNotFoundError(f"No input files match {pattern}")
+        paths.update(os.path.normpath(path) for path in matches)
+    return sorted(paths)
+
+
+def report_paths(input_paths, output_dir):
+    """One <name>_predictions.csv per input; clashing names get a numeric suffix."""
+    outputs, taken = [], set()
+    for path in input_paths:
+        stem = input_stem(path)
+        name, n = f"{stem}_predictions.csv", 2
+        while name in taken:
+            name, n = f"{stem}_predictions-{n}.csv", n + 1
+        taken.add(name)
+        outputs.append(os.path.join(output_dir, name))
+    return outputs
+
+
+def _init_worker(backend, intra_op):
+    global _worker_scorer
+    configure_worker_threads(intra_op, 1, backend)
+    _, _worker_scorer = load_predictor_scorer(backend, verbose=False)
 
-    # Save the report
-    output_filename = "prediction_report.csv"
-    original_df.to_csv(output_filename, index=False)
-    print("\n:: [AegisNet PREDICTOR] - COMPLETE ::")
-    print(f"-- Final report saved to: {output_filename}")
-    print(original_df["prediction"].value_counts())
+
+def _score_in_worker(input_path, output_path, chunk_size):
+    return score_file(_worker_scorer, input_path, output_path, chunk_size)
+
+
+def run_batch(patterns, output_dir=PREDICTOR_OUTPUT_DIR, backend=INFERENCE_BACKEND,
+              workers=PREDICTOR_WORKERS, chunk_size=PREDICT_CHUNK_SIZE):
+    """Score many input files across a pool of worker processes.
+
+    Each worker loads the model once and scores whole files, so a night of
+    sensor exports pays for one TensorFlow start per worker rather than per
+    file. A file that fails is reported and does not stop the others.
+
+    Args:
+        patterns: Files, directories or glob patterns (see expand_inputs)
+        output_dir: Directory for the per-file reports
+        backend: Inference backend, "keras", "numpy" (fused engine) or "tflite"
+        workers: Worker processes (None = CPU cores, capped at the file count)
+        chunk_size: Rows per chunk within a file
+
+    Returns:
+        Tuple of (summaries of scored files, {input path: error message} for failures)
+    """
+    print(":: [AegisNet v1.3.1 PREDICTOR] - Batch mode ::")
+    input_paths = expand_inputs(patterns)
+    outputs = report_paths(input_paths, output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    workers = min(workers or os.cpu_count() or 1, len(input_paths))
+    intra_op = max(1, (os.cpu_count() or 1) // workers)
+    print(
+        f"-- {len(input_paths)} file(s) across {workers} worker(s) ({intra_op} math thread(s) each, "
+        f"backend={backend}, threshold {CLASSIFICATION_THRESHOLD * 100}%)"
+    )
+
+    started = time.perf_counter()
+    summaries, failures = [], {}
+    # Spawned (not forked) workers: TensorFlow is not fork-safe
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(backend, intra_op),
+    ) as executor:
+        futures = {
+            executor.submit(_score_in_worker, path, output, chunk_size): path
+            for path, output in zip(input_paths, outputs)
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                summary = future.result()
+            except Exception as e:
+                failures[path] = f"{type(e).__name__}: {e}"
+                print(f"-- FAILED {path}: {failures[path]}")
+                continue
+            summaries.append(summary)
+            print(
+                f"-- {path}: {summary['rows']:,} rows, {summary['attacks']:,} ATTACK "
+                f"({summary['rows'] / max(summary['seconds'], 1e-9):,.0f} rows/s) -> {summary['output']}"
+            )
+    elapsed = time.perf_counter() - started
+
+    total_rows = sum(summary["rows"] for summary in summaries)
+    total_attacks = sum(summary["attacks"] for summary in summaries)
+    total_unique = sum(summary["unique_rows"] for summary in summaries)
+    print("\n:: [AegisNet PREDICTOR] - BATCH SUMMARY ::")
+    print(f"-- Files scored: {len(summaries)} of {len(input_paths)} ({len(failures)} failed)")
+    print(f"-- Flows: {total_rows:,} | BENIGN: {total_rows - total_attacks:,} | ATTACK: {total_attacks:,}")
+    if DEDUP_ENABLED:
+        print(f"-- Unique rows scored: {total_unique:,} (dedup ratio {total_rows / max(total_unique, 1):.2f}x)")
+    print(
+        f"-- Wall time {elapsed:.2f}s including model loads: {total_rows / max(elapsed, 1e-9):,.0f} rows/s total"
+    )
+    print(f"-- Reports in {output_dir}")
+    return summaries, failures
 
 
 if __name__ == "__main__":
-    # Check if the user provided a file path
-    if len(sys.argv) != 2:
-        print("ERROR: You must provide a path to a CSV file.")
-        print("Usage: python predictor.py <path_to_your_file.csv>")
-        sys.exit(1)
-    input_file = sys.argv[1]
-    run_predictor(input_file)
+    parser = argparse.ArgumentParser(description="Score flow exports with the AegisNet model")
+    parser.add_argument("inputs", nargs="+", help="Input files, directories of inputs or glob patterns")
+    parser.add_argument("--backend", choices=["keras", "numpy", "tflite"], default=INFERENCE_BACKEND)
+    parser.add_argument("--output", help=f"Report path for a single input file (default: {REPORT_PATH})")
+    parser.add_argument(
+        "--output-dir", help=f"Batch mode: directory for per-file reports (default: {PREDICTOR_OUTPUT_DIR})"
+    )
+    parser.add_argument("--workers", type=int, default=PREDICTOR_WORKERS, help="Batch mode: worker processes")
+    parser.add_argument("--chunk-size", type=int, default=PREDICT_CHUNK_SIZE, help="Batch mode: rows per chunk")
+    args = parser.parse_args()
+
+    single = len(args.inputs) == 1 and os.path.isfile(args.inputs[0]) and args.output_dir is None
+    if single:
+        run_predictor(args.inputs[0], args.backend, args.output or REPORT_PATH)
+    else:
+        if args.output:
+            parser.error("--output takes a single input file; use --output-dir for batch mode")
+        try:
+            _, failed = run_batch(
+                args.inputs, args.output_dir or PREDICTOR_OUTPUT_DIR, args.backend, args.workers, args.chunk_size
+            )
+        except FileNotFoundError as e:
+            parser.error(str(e))
+        raise SystemExit(1 if failed else 0)
@@ -0,0 +1,98 @@
+# AegisNet Production Server
+#
+# Usage:
+#   python serve.py
+#   python serve.py --workers 4 --threads 8 --bind 0.0.0.0:8000
+#
+# Runs app.py under gunicorn with one warm model per worker process and
+# per-worker TensorFlow/BLAS thread pools sized so workers don't fight over
+# cores. Defaults come from the SERVE_* settings in src/config.py.
+
+import argparse
+import gc
+import os
+
+from gunicorn.app.base import BaseApplication
+
+from src.config import (
+    INFERENCE_BACKEND,
+    SERVE_BIND,
+    SERVE_WORKERS,
+    SERVE_THREADS,
+    SERVE_TIMEOUT_S,
+    SERVE_INTRA_OP_THREADS,
+    SERVE_INTER_OP_THREADS,
+)
+from src.inference_engine import configure_worker_threads
+
+
+def intra_op_threads(workers, configured=SERVE_INTRA_OP_THREADS):
+    """Compute threads each worker may use, splitting the machine's cores evenly."""
+    if configured:
+        return configured
+    return max(1, (os.cpu_count() or 1) // workers)
+
+
+class AegisNetServer(BaseApplication):
+    """Gunicorn application serving the Flask app from app.py."""
+
+    def __init__(self, options):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        # Importing app loads the model and scaler and runs the warm-up
+        from app import app
+
+        if self.cfg.preload_app:
+            # Keep the garbage collector from touching (and so copying) the
+            # preloaded objects in every forked worker
+            gc.freeze()
+        return app
+
+
+def build_options(bind, workers, threads, timeout):
+    """Gunicorn settings for the configured backend.
+
+    The fused NumPy engine is preloaded in the master so its weights are shared
+    copy-on-write. TensorFlow is not fork-safe (a model used before fork hangs
+    in the child), so with the Keras backend each worker loads its own model
+    after its thread pools have been configured.
+    """
+    intra_op = intra_op_threads(workers)
+    inter_op = SERVE_INTER_OP_THREADS
+
+    def post_fork(server, worker):
+        configure_worker_threads(intra_op, inter_op, INFERENCE_BACKEND)
+        server.log.info(
+            "Worker %s: intra_op_threads=%d inter_op_threads=%d",
+            worker.pid,
+            intra_op,
+            inter_op,
+        )
+
+    return {
+        "bind": bind,
+        "workers": workers,
+        "worker_class": "gthread",
+        "threads": threads,
+        "timeout": timeout,
+        "preload_app": INFERENCE_BACKEND == "numpy",
+        "post_fork": post_fork,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the AegisNet API with gunicorn")
+    parser.add_argument("--bind", default=SERVE_BIND, help="host:port to listen on")
+    parser.add_argument("--workers", type=int, default=SERVE_WORKERS, help="Worker processes")
+    parser.add_argument("--threads", type=int, default=SERVE_THREADS, help="Request threads per worker")
+    parser.add_argument("--timeout", type=int, default=SERVE_TIMEOUT_S, help="Worker timeout in seconds")
+    args = parser.parse_args()
+
+    print(f":: [AegisNet Server] - {args.workers} workers on {args.bind} (backend={INFERENCE_BACKEND}) ::")
+    AegisNetServer(build_options(args.bind, args.workers, args.threads, args.timeout)).run()
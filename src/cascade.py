@@ -0,0 +1,328 @@
+# AegisNet Cascade Module
+
+import json
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import confusion_matrix
+from sklearn.tree import DecisionTreeClassifier
+
+from src.config import (
+    TOP_FEATURES,
+    CLASSIFICATION_THRESHOLD,
+    CASCADE_MODEL_PATH,
+    CASCADE_REPORT_PATH,
+    CASCADE_FEATURES,
+    CASCADE_MAX_DEPTH,
+    CASCADE_MIN_SAMPLES_LEAF,
+    CASCADE_TRAIN_ROWS,
+    CASCADE_CALIBRATION_ROWS,
+    CASCADE_MAX_MISS_RATE,
+)
+from src.metrics import CASCADE_ROWS
+
+
+def _take_rows(X, mask):
+    """Rows of a DataFrame or array selected by a boolean mask."""
+    if isinstance(X, pd.DataFrame):
+        return X.iloc[np.flatnonzero(mask)]
+    return np.asarray(X)[mask]
+
+
+def _select_columns(X, columns):
+    """Selected columns of a DataFrame or array, as float32."""
+    if isinstance(X, pd.DataFrame):
+        return X.iloc[:, columns].to_numpy(dtype=np.float32)
+    return np.asarray(X, dtype=np.float32)[:, columns]
+
+
+class PreFilter:
+    """Shallow decision tree over a few features, evaluated with NumPy.
+
+    The fitted sklearn tree is flattened into node arrays, and every row walks
+    one level per step, so a batch costs max_depth vectorized gathers.
+    Leaves point at themselves, so rows that reach a leaf early stay there.
+    """
+
+    def __init__(self, columns, feature, threshold, left, right, value, cutoff=-1.0):
+        self.columns = np.asarray(columns, dtype=np.intp)
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.left = np.asarray(left, dtype=np.intp)
+        self.right = np.asarray(right, dtype=np.intp)
+        self.value = np.asarray(value, dtype=np.float32)
+        self.depth = self._depth()
+        # Rows scoring at or below the cutoff are cleared as benign
+        self.cutoff = float(cutoff)
+
+    def _depth(self):
+        depth, frontier = 0, [0]
+        while True:
+            children = [child for node in frontier for child in (self.left[node], self.right[node]) if child != node]
+            if not children:
+                return depth
+            depth, frontier = depth + 1, children
+
+    @classmethod
+    def fit(cls, X, y, n_features=CASCADE_FEATURES, max_depth=CASCADE_MAX_DEPTH,
+            min_samples_leaf=CASCADE_MIN_SAMPLES_LEAF):
+        """Fit the tree on the leading n_features columns of X (ranked TOP_FEATURES order)."""
+        columns = np.arange(min(n_features, X.shape[1]))
+        tree = DecisionTreeClassifier(
+            max_depth=max_depth, min_samples_leaf=min_samples_leaf, random_state=42
+        )
+        tree.fit(_select_columns(X, columns), y)
+        nodes = tree.tree_
+        leaves = nodes.children_left == -1
+        index = np.arange(nodes.node_count)
+        counts = nodes.value[:, 0, :]
+        attack_column = list(tree.classes_).index(1) if 1 in tree.classes_ else None
+        value = counts[:, attack_column] / counts.sum(axis=1) if attack_column is not None else np.zeros(len(counts))
+        return cls(
+            columns,
+            np.where(leaves, 0, nodes.feature),
+            np.where(leaves, 0.0, nodes.threshold),
+            np.where(leaves, index, nodes.children_left),
+            np.where(leaves, index, nodes.children_right),
+            value,
+        )
+
+    @classmethod
+    def load(cls, path=CASCADE_MODEL_PATH):
+        with np.load(path, allow_pickle=False) as artifact:
+            names = [str(name) for name in artifact["feature_names"]]
+            columns = artifact["columns"]
+            if names != [TOP_FEATURES[i] for i in columns]:
+                raise ValueError(
+                    f"Cascade pre-filter at {path} was fitted on different features; re-run main.py"
+                )
+            return cls(
+                columns,
+                artifact["feature"],
+                artifact["threshold"],
+                artifact["left"],
+                artifact["right"],
+                artifact["value"],
+                float(artifact["cutoff"]),
+            )
+
+    def save(self, path=CASCADE_MODEL_PATH):
+        np.savez(
+            path,
+            columns=self.columns,
+            feature_names=np.array([TOP_FEATURES[i] for i in self.columns]),
+            feature=self.feature,
+            threshold=self.threshold,
+            left=self.left,
+            right=self.right,
+            value=self.value,
+            cutoff=np.float64(self.cutoff),
+        )
+
+    def score(self, X):
+        """Attack probability of each row's leaf (float32, shape (n,))."""
+        values = _select_columns(X, self.columns)
+        rows = np.arange(len(values))
+        node = np.zeros(len(values), dtype=np.intp)
+        for _ in range(self.depth):
+            # sklearn compares float32 features against float64 thresholds
+            go_left = values[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return self.value[node]
+
+
+def tune_cutoff(scores, y, max_miss_rate=CASCADE_MAX_MISS_RATE, threshold=CLASSIFICATION_THRESHOLD):
+    """Highest pre-filter cutoff that clears at most max_miss_rate of the attacks.
+
+    Args:
+        scores: Pre-filter scores on held-out rows
+        y: Labels of those rows (1 = ATTACK)
+        max_miss_rate: Allowed fraction of attacks scoring at or below the cutoff
+        threshold: Production threshold (the cutoff always stays below it)
+
+    Returns:
+        Cutoff, or -1.0 if no leaf is safe to clear (every row reaches the DNN)
+    """
+    y = np.asarray(y).ravel().astype(bool)
+    attack_scores = np.sort(scores[y])
+    budget = int(np.floor(max_miss_rate * len(attack_scores)))
+    cutoff = -1.0
+    for candidate in np.unique(scores):
+        if candidate >= threshold:
+            break
+        missed = np.searchsorted(attack_scores, candidate, side="right")
+        if missed > budget:
+            break
+        cutoff = float(candidate)
+    return cutoff
+
+
+class CascadeScorer:
+    """Pre-filter first; only rows it cannot clear are scored by the DNN.
+
+    Cleared rows keep the pre-filter's score as their probability, which is
+    always below CLASSIFICATION_THRESHOLD.
+    """
+
+    def __init__(self, prefilter, scorer):
+        self.prefilter = prefilter
+        self.scorer = scorer
+        self.backend = scorer.backend
+        self.rows_scored = 0
+        self.rows_short_circuited = 0
+        self._lock = threading.Lock()
+
+    def predict(self, X):
+        """Return attack probabilities of shape (n, 1) for unscaled features."""
+        scores = self.prefilter.score(X)
+        uncertain = scores > self.prefilter.cutoff
+        probabilities = scores.reshape(-1, 1).copy()
+        n_uncertain = int(np.count_nonzero(uncertain))
+        if n_uncertain:
+            probabilities[uncertain] = self.scorer.predict(_take_rows(X, uncertain)).reshape(-1, 1)
+        cleared = len(scores) - n_uncertain
+        with self._lock:
+            self.rows_scored += len(scores)
+            self.rows_short_circuited += cleared
+        CASCADE_ROWS.inc(cleared, stage="prefilter")
+        CASCADE_ROWS.inc(n_uncertain, stage="dnn")
+        return probabilities
+
+    def short_circuit_fraction(self):
+        with self._lock:
+            return self.rows_short_circuited / self.rows_scored if self.rows_scored else 0.0
+
+    def input_importances(self):
+        return self.scorer.input_importances()
+
+
+def train_cascade(X, y, train_idx, output_path=CASCADE_MODEL_PATH, train_rows=CASCADE_TRAIN_ROWS,
+                  calibration_rows=CASCADE_CALIBRATION_ROWS):
+    """Fit the pre-filter on training rows and tune its cutoff on others.
+
+    Args:
+        X: Sanitized, unscaled feature DataFrame (TOP_FEATURES columns)
+        y: Labels
+        train_idx: Training split indices (shuffled); test rows are never used
+        output_path: Destination .npz path
+        train_rows, calibration_rows: Rows drawn from train_idx for each step
+
+    Returns:
+        Fitted PreFilter
+    """
+    print(":: [Cascade] - Fitting first-stage pre-filter... ::")
+    y = np.asarray(y)
+    calibration_rows = min(calibration_rows, len(train_idx) // 5)
+    fit_idx = np.sort(train_idx[calibration_rows:calibration_rows + train_rows])
+    calibration_idx = np.sort(train_idx[:calibration_rows])
+
+    prefilter = PreFilter.fit(X.iloc[fit_idx], y[fit_idx])
+    print(
+        f"-- Tree over {len(prefilter.columns)} features, depth {prefilter.depth}, "
+        f"fitted on {len(fit_idx):,} rows"
+    )
+    scores = prefilter.score(X.iloc[calibration_idx])
+    prefilter.cutoff = tune_cutoff(scores, y[calibration_idx])
+    cleared = scores <= prefilter.cutoff
+    print(
+        f"-- Cutoff {prefilter.cutoff:.6f}: clears {cleared.mean():.2%} of {len(calibration_idx):,} "
+        f"calibration rows, {int(np.count_nonzero(cleared & (y[calibration_idx] == 1)))} of them attacks"
+    )
+    prefilter.save(output_path)
+    print(f"-- Pre-filter saved to {output_path}")
+    return prefilter
+
+
+def _confusion_summary(y_true, probabilities, seconds, threshold):
+    cm = confusion_matrix(y_true, (probabilities.ravel() > threshold).astype(int), labels=[0, 1])
+    tn, fp, fn, tp = (int(count) for count in cm.ravel())
+    return {
+        "confusion_matrix": cm.tolist(),
+        "recall": tp / (tp + fn) if tp + fn else 0.0,
+        "precision": tp / (tp + fp) if tp + fp else 1.0,
+        "false_negatives": fn,
+        "false_positives": fp,
+        "seconds": seconds,
+        "rows_per_s": len(y_true) / seconds if seconds else 0.0,
+    }
+
+
+def _timed(predict, X):
+    start = time.perf_counter()
+    probabilities = predict(X)
+    return probabilities, time.perf_counter() - start
+
+
+def evaluate_cascade(prefilter, scorer, X_test, y_test, threshold=CLASSIFICATION_THRESHOLD,
+                     report_path=CASCADE_REPORT_PATH, repeats=3):
+    """Compare the cascade against the DNN alone on the test split.
+
+    Both paths score the same rows end to end (unscaled features in,
+    probabilities out), so the timing includes the pre-filter's own cost.
+    Each path is timed repeats times, alternating, and the fastest run is kept.
+
+    Args:
+        prefilter: Fitted PreFilter
+        scorer: DNN scorer (KerasScorer or FusedMLP)
+        X_test: Unscaled test features
+        y_test: Test labels
+        threshold: Production threshold
+        report_path: Destination JSON path
+        repeats: Timed runs per path
+
+    Returns:
+        Report dict (also saved to report_path)
+    """
+    print(":: [Cascade] - Evaluating cascade against the DNN alone... ::")
+    y_test = np.asarray(y_test).ravel()
+    cascade = CascadeScorer(prefilter, scorer)
+    # Untimed warm-up so neither path pays for graph tracing
+    scorer.predict(X_test[:1024])
+    cascade.predict(X_test[:1024])
+    cascade.rows_scored = cascade.rows_short_circuited = 0
+
+    dnn_seconds = cascade_seconds = float("inf")
+    for _ in range(repeats):
+        dnn_probs, seconds = _timed(scorer.predict, X_test)
+        dnn_seconds = min(dnn_seconds, seconds)
+        cascade_probs, seconds = _timed(cascade.predict, X_test)
+        cascade_seconds = min(cascade_seconds, seconds)
+    dnn = _confusion_summary(y_test, dnn_probs, dnn_seconds, threshold)
+    staged = _confusion_summary(y_test, cascade_probs, cascade_seconds, threshold)
+
+    # Attacks the DNN flags that the pre-filter cleared before the DNN saw them
+    lost = (dnn_probs.ravel() > threshold) & (cascade_probs.ravel() <= threshold) & (y_test == 1)
+    report = {
+        "features": [TOP_FEATURES[i] for i in prefilter.columns],
+        "depth": prefilter.depth,
+        "cutoff": prefilter.cutoff,
+        "threshold": threshold,
+        "rows": len(y_test),
+        "short_circuit_fraction": cascade.short_circuit_fraction(),
+        "dnn": dnn,
+        "cascade": staged,
+        "recall_delta": staged["recall"] - dnn["recall"],
+        "attacks_lost": int(np.count_nonzero(lost)),
+        "speedup": dnn["seconds"] / staged["seconds"] if staged["seconds"] else 0.0,
+    }
+
+    print(f"-- Short-circuited: {report['short_circuit_fraction']:.2%} of {len(y_test):,} test rows")
+    print(
+        f"-- Throughput: DNN {dnn['rows_per_s']:,.0f} rows/s | cascade {staged['rows_per_s']:,.0f} rows/s "
+        f"({report['speedup']:.2f}x)"
+    )
+    print(":: CASCADE CONFUSION MATRIX ::")
+    print(np.array(staged["confusion_matrix"]))
+    print(
+        f"-- Recall: DNN {dnn['recall']:.4%} | cascade {staged['recall']:.4%} "
+        f"(delta {report['recall_delta']:+.4%}, {report['attacks_lost']} attacks lost)"
+    )
+    print(
+        f"-- False alarms: DNN {dnn['false_positives']} | cascade {staged['false_positives']}"
+    )
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"-- Cascade report saved to {report_path}")
+    return report
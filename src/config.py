@@ -16,6 +16,35 @@ DATA_FILES = [
     "Friday-WorkingHours-Afternoon-DDos.pcap_ISCX.csv",
 ]
 
+# Worker processes for parallel CSV ingestion (None = one per CPU, capped at file count)
+LOADER_MAX_WORKERS = None
+
+# Sanitized feature matrix cache (memory-mapped .npy + JSON manifest)
+FEATURE_CACHE_DIR = "cache/features"
+
+# Resumable training pipeline (main.py): stage outputs are stored under
+# <PIPELINE_CACHE_DIR>/<stage>/<hash of the stage inputs>/ and reused while current
+PIPELINE_CACHE_DIR = "cache/pipeline"
+PIPELINE_KEEP = 3  # Output sets kept per stage (the oldest are deleted first)
+
+# Out-of-core training: stream memory-mapped features through tf.data
+STREAMING_TRAINING = False
+STREAM_CHUNK_ROWS = 262144  # Rows gathered per read
+STREAM_BATCH_SIZE = 1024
+
+# Hyperband search: oracle state location (main.py uses its tune stage directory) and local parallel tuning
+TUNER_DIR = "models"
+TUNER_PROJECT_NAME = "aegisnet_hyperband"
+TUNER_SEED = 42
+TUNER_WORKERS = 1  # >1 runs a local chief oracle plus this many worker processes
+TUNER_ORACLE_PORT = 8000
+
+# Latency-aware champion selection (ms per batch of LATENCY_BATCH_SIZE rows)
+LATENCY_BUDGET_MS = None  # None = most accurate trial, regardless of latency
+LATENCY_BATCH_SIZE = 4096
+LATENCY_CANDIDATE_TRIALS = None  # Cap on trials profiled, most accurate first (None = every completed trial)
+TRADEOFF_REPORT_PATH = "models/aegisnet_tradeoff.json"
+
 # Target column name in the dataset
 TARGET_COLUMN = "Label"
 
@@ -27,6 +56,11 @@ LOSS_PLOT_PATH = "reports/aegisnet_loss.png"
 # Classification threshold for predictions
 CLASSIFICATION_THRESHOLD = 0.90
 
+# Threshold sweep: persisted PR/ROC table and false-positive-rate targets
+THRESHOLD_SWEEP_PATH = "reports/aegisnet_threshold_sweep.npz"
+THRESHOLD_REPORT_PATH = "reports/aegisnet_thresholds.json"
+TARGET_FPRS = [0.001, 0.0005, 0.0001]
+
 # Top features for model training (Generated by FeatureEngine)
 TOP_FEATURES = [
     "Max Packet Length",
@@ -63,3 +97,120 @@ TOP_FEATURES = [
 
 # Scaler save path for preprocessing
 SCALER_SAVE_PATH = "models/aegisnet_scaler.joblib"
+
+# Saved champion model used for inference
+MODEL_PATH = "models/aegisnet.keras"
+
+# Fused scaler + MLP weights for the pure-NumPy inference engine
+FUSED_MODEL_PATH = "models/aegisnet_fused.npz"
+
+# Post-training quantized TFLite export (main.py, or python -m src.quantizer)
+TFLITE_MODEL_PATH = "models/aegisnet_quant.tflite"
+TFLITE_QUANTIZATION = "float16"  # "float16", "dynamic" (int8 weights) or "int8" (weights + activations)
+TFLITE_CALIBRATION_ROWS = 2000  # Cached training rows used to calibrate int8 activation ranges
+TFLITE_PARITY_ROWS = 200000  # Test rows scored by both models for the parity report
+TFLITE_REPORT_PATH = "reports/aegisnet_tflite_parity.json"
+TFLITE_MAX_FLIP_RATE = 0.0005  # Parity passes if at most this share of decisions change...
+TFLITE_MAX_RECALL_DROP = 0.001  # ...and recall falls by no more than this
+TFLITE_NUM_THREADS = None  # Interpreter threads (None = runtime default)
+
+# Two-stage cascade: a shallow decision tree clears obviously benign flows
+# before they reach the DNN (fitted and evaluated by main.py)
+CASCADE_ENABLED = False  # Serve through the cascade (needs CASCADE_MODEL_PATH)
+CASCADE_MODEL_PATH = "models/aegisnet_cascade.npz"
+CASCADE_REPORT_PATH = "reports/aegisnet_cascade.json"
+CASCADE_FEATURES = 8  # Leading (highest-ranked) TOP_FEATURES the tree splits on
+CASCADE_MAX_DEPTH = 8
+CASCADE_MIN_SAMPLES_LEAF = 200
+CASCADE_TRAIN_ROWS = 1000000  # Training rows used to fit the tree...
+CASCADE_CALIBRATION_ROWS = 500000  # ...and held-out training rows used to tune its cutoff
+CASCADE_MAX_MISS_RATE = 0.0005  # Share of calibration attacks the tree may clear as benign
+
+# Versioned model registry: models/registry/<version>/ plus a CURRENT pointer file
+MODEL_REGISTRY_DIR = "models/registry"
+MODEL_REGISTRY_KEEP = 5  # Versions kept on disk (the CURRENT one is never deleted)
+MODEL_WATCH_INTERVAL_S = 5  # API polls CURRENT and hot-swaps on change; None disables
+# Token required by /admin/* (X-AegisNet-Admin-Token); None = loopback clients only
+ADMIN_TOKEN = None
+
+# Incremental updates (updater.py): fine-tune the CURRENT version on newly labeled flows
+INCREMENTAL_HOLDOUT = 0.2  # Share of the new batch held out for validation...
+INCREMENTAL_EARLY_STOP_SHARE = 0.1  # ...and watched by early stopping (the two never overlap)
+INCREMENTAL_REPLAY_RATIO = 8.0  # Cached historical training rows replayed per new training row...
+INCREMENTAL_MIN_REPLAY_ROWS = 50000  # ...but at least this many (less replay means more forgetting)
+INCREMENTAL_VALIDATION_ROWS = 200000  # Cached test-split rows in the regression check
+INCREMENTAL_EPOCHS = 8  # Upper bound; stops early once the held-out loss stops improving
+INCREMENTAL_BATCH_SIZE = 1024
+INCREMENTAL_LEARNING_RATE = 1e-3  # Adam, with fresh optimizer state
+INCREMENTAL_MAX_RECALL_DROP = 0.005  # Publish only if recall on historical rows falls by at most this...
+INCREMENTAL_MAX_FPR_RISE = 0.0005  # ...and their false-positive rate rises by at most this
+INCREMENTAL_REPORT_PATH = "reports/aegisnet_incremental.json"
+
+# Inference backend for app.py and predictor.py: "keras", "numpy" or "tflite"
+INFERENCE_BACKEND = "keras"
+
+# Rows parsed and scored per chunk when streaming CSV uploads through /predict
+PREDICT_CHUNK_SIZE = 50000
+
+# predictor.py batch mode (several files, directories or globs)
+PREDICTOR_OUTPUT_DIR = "reports/predictions"  # One <name>_predictions.csv per input file
+PREDICTOR_WORKERS = None  # Worker processes, each loading the model once; None = CPU cores (capped at file count)
+
+# Batch paths score each distinct feature row once and scatter results back
+DEDUP_ENABLED = True
+
+# Micro-batching for concurrent /predict_single requests
+MICROBATCH_ENABLED = True
+MICROBATCH_MAX_SIZE = 64  # Flush once this many rows are queued...
+MICROBATCH_MAX_WAIT_MS = 2  # ...or this long after the first queued row
+MICROBATCH_QUEUE_DEPTH = 1024  # Requests beyond this are rejected with 503
+MICROBATCH_TIMEOUT_S = 10  # Max time a caller waits for its result
+
+# Paged /predict results (format=columnar|npz), kept on disk for /results/<id> so
+# that any server worker can serve the pages
+RESULT_STORE_DIR = "cache/result_pages"
+RESULT_STORE_MAX_RESULTS = 32
+RESULT_TTL_S = 3600
+RESULT_PAGE_SIZE = 1000  # Default threats per page
+RESULT_MAX_PAGE_SIZE = 100000
+
+# Asynchronous scoring jobs (POST /jobs): uploads, progress and results on disk
+JOB_DIR = "cache/jobs"
+JOB_MAX_WORKERS = 1  # Jobs scored concurrently (keeps CPU free for /predict_single)
+JOB_MAX_PENDING = 16  # Queued + running jobs before POST /jobs returns 503
+JOB_TTL_S = 3600  # Finished jobs are deleted after this long
+
+# Content-addressed cache of scored uploads (upload hash + model + threshold)
+RESULT_CACHE_ENABLED = True
+RESULT_CACHE_DIR = "cache/results"
+RESULT_CACHE_MAX_BYTES = 1 << 30  # Disk budget; least recently used entries are evicted
+RESULT_CACHE_MEMORY_ENTRIES = 256  # Summaries kept in memory
+
+# /metrics: window for the rows-scored-per-second gauge
+METRICS_RATE_WINDOW_S = 60
+
+# Production serving (serve.py: gunicorn with preloaded artifacts)
+SERVE_BIND = "0.0.0.0:5001"
+SERVE_WORKERS = 2  # Worker processes
+SERVE_THREADS = 4  # Request threads per worker (lets micro-batching merge concurrent calls)
+SERVE_TIMEOUT_S = 300  # Large CSV uploads can take minutes to score
+SERVE_INTRA_OP_THREADS = None  # Per-worker TF/BLAS threads; None = CPU cores // workers
+SERVE_INTER_OP_THREADS = 1  # Per-worker TF inter-op threads (the MLP is one op chain)
+SERVE_WARMUP_ROWS = 64  # Rows in the warm-up prediction before serving; 0 disables
+
+# Live streaming scorer (streamer.py): micro-batches of flows from stdin, files or sockets
+STREAMER_BATCH_SIZE = 8192  # Score once this many flows are waiting...
+STREAMER_MAX_WAIT_MS = 200  # ...or this long after the oldest waiting flow was read
+STREAMER_QUEUE_BLOCKS = 32  # Parsed blocks buffered before sources block (backpressure)
+STREAMER_READ_SIZE = 1 << 16  # Bytes per read from a source
+STREAMER_BLOCK_BYTES = 1 << 20  # Reads already waiting are merged into blocks of up to this size
+STREAMER_TAIL_POLL_S = 0.1  # Poll interval at the end of a followed file
+STREAMER_STATS_INTERVAL_S = 10  # Seconds between throughput/lag lines on stderr
+# Columns copied into alerts when the input has them (CICFlowMeter names)
+STREAMER_ALERT_FIELDS = [
+    "Flow ID",
+    "Source IP",
+    "Source Port",
+    "Destination IP",
+    "Timestamp",
+]
@@ -1,17 +1,26 @@
 # AegisNet Data Loading Module
 
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
 import pandas as pd
 
-from src.config import DATA_DIR, DATA_FILES
+from src.config import (
+    DATA_DIR,
+    DATA_FILES,
+    TARGET_COLUMN,
+    TOP_FEATURES,
+    LOADER_MAX_WORKERS,
+)
 
 
 def clean_column_names(df):
     """Strip leading/trailing whitespace from all column names.
-    
+
     Args:
         df: pandas DataFrame
-        
+
     Returns:
         DataFrame with cleaned column names
     """
@@ -20,23 +29,145 @@ def clean_column_names(df):
     return df
 
 
-def load_and_combine_data():
+def count_data_rows(file_path, block_size=1 << 24):
+    """Count data rows in a CSV by scanning raw bytes for newlines.
+
+    Used to size the combined matrix before parsing. Blank lines are counted
+    too, so this is an upper bound on what pandas will parse.
+
+    Args:
+        file_path: Path to the CSV file
+        block_size: Bytes read per block
+
+    Returns:
+        Number of lines after the header
+    """
+    newlines = 0
+    last_byte = b"\n"
+    with open(file_path, "rb") as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            newlines += block.count(b"\n")
+            last_byte = block[-1:]
+    if last_byte != b"\n":
+        newlines += 1
+    return max(newlines - 1, 0)
+
+
+def load_file(file_path):
+    """Parse one dataset CSV into a compact float32 matrix and label codes.
+
+    Only TOP_FEATURES plus the target column are read when TOP_FEATURES is
+    set; otherwise every column is read. Features are parsed straight to
+    float32 and labels to a categorical.
+
+    Args:
+        file_path: Path to the CSV file
+
+    Returns:
+        Tuple of (feature_names, X float32 array, label codes, label categories)
+    """
+    # Header pass: pandas mangles the duplicate 'Fwd Header Length' here too
+    raw_columns = list(pd.read_csv(file_path, nrows=0).columns)
+    stripped = [col.strip() for col in raw_columns]
+
+    if TOP_FEATURES:
+        missing = [col for col in TOP_FEATURES + [TARGET_COLUMN] if col not in stripped]
+        if missing:
+            raise KeyError(f"{file_path} is missing columns: {missing}")
+        feature_names = list(TOP_FEATURES)
+    else:
+        feature_names = [col for col in stripped if col != TARGET_COLUMN]
+
+    # Select by position so duplicate/whitespace-padded names cannot collide
+    wanted = set(feature_names) | {TARGET_COLUMN}
+    positions = [i for i, col in enumerate(stripped) if col in wanted]
+    dtypes = {
+        raw: ("category" if col == TARGET_COLUMN else np.float32)
+        for raw, col in zip(raw_columns, stripped)
+        if col in wanted
+    }
+
+    df = pd.read_csv(file_path, usecols=positions, dtype=dtypes)
+    clean_column_names(df)
+
+    X = df[feature_names].to_numpy(dtype=np.float32)
+    labels = df[TARGET_COLUMN].cat
+    return feature_names, X, labels.codes.to_numpy(), list(labels.categories)
+
+
+def load_and_combine_data(max_workers=LOADER_MAX_WORKERS):
     """Load all CIC-IDS-2017 dataset files and combine them into a single DataFrame.
-    
+
+    Files are parsed in parallel worker processes. Each file's rows are
+    copied into one preallocated column-major float32 block as soon as the
+    file finishes, so no list of full DataFrames is concatenated at the end.
+
+    Args:
+        max_workers: Process pool size (defaults to one per CPU, capped at the file count)
+
     Returns:
         Combined pandas DataFrame with all data
     """
     print(':: [Ingestion_Engine] - Initiating data stream... ::')
-    dataframes_list = []
-    
-    for filename in DATA_FILES:
-        file_path = os.path.join(DATA_DIR, filename)
-        print(f'-- Loading file: {filename}')
-        df = pd.read_csv(file_path)
-        clean_column_names(df)
-        dataframes_list.append(df)
-    
+    file_paths = [os.path.join(DATA_DIR, filename) for filename in DATA_FILES]
+    if max_workers is None:
+        max_workers = min(len(file_paths), os.cpu_count() or 1)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # Pass 1: cheap byte scan to size the combined matrix
+        row_counts = list(executor.map(count_data_rows, file_paths))
+        offsets = np.concatenate([[0], np.cumsum(row_counts)])
+        print(f'-- Sized data matrix at {offsets[-1]} rows across {len(file_paths)} files')
+
+        # Pass 2: parse files in parallel, copying each into its slot
+        futures = {
+            executor.submit(load_file, path): i for i, path in enumerate(file_paths)
+        }
+        X_all = None
+        codes_all = np.full(offsets[-1], -1, dtype=np.int16)
+        categories = {}
+        feature_names = None
+        parsed_rows = [0] * len(file_paths)
+
+        for future in as_completed(futures):
+            i = futures[future]
+            names, X, codes, file_categories = future.result()
+            print(f'-- Loaded file: {DATA_FILES[i]} ({len(X)} rows)')
+
+            if X_all is None:
+                feature_names = names
+                X_all = np.empty((offsets[-1], len(names)), dtype=np.float32, order='F')
+            elif names != feature_names:
+                raise ValueError(f'Column mismatch in {DATA_FILES[i]}')
+
+            # Remap per-file label codes onto a global category table
+            lookup = np.array(
+                [categories.setdefault(label, len(categories)) for label in file_categories] + [-1],
+                dtype=np.int16,
+            )
+            start = offsets[i]
+            X_all[start:start + len(X)] = X
+            codes_all[start:start + len(X)] = lookup[codes]
+            parsed_rows[i] = len(X)
+            del X, codes
+
+    # Close gaps left by blank lines the byte scan counted but pandas skipped
+    if sum(parsed_rows) != offsets[-1]:
+        write = 0
+        for i, rows in enumerate(parsed_rows):
+            start = offsets[i]
+            if start != write:
+                X_all[write:write + rows] = X_all[start:start + rows]
+                codes_all[write:write + rows] = codes_all[start:start + rows]
+            write += rows
+        X_all = X_all[:write]
+        codes_all = codes_all[:write]
+
     print(':: [Ingestion_Engine] - All files loaded. Merging data streams... ::')
-    combined_df = pd.concat(dataframes_list, ignore_index=True)
+    combined_df = pd.DataFrame(X_all, columns=feature_names, copy=False)
+    combined_df[TARGET_COLUMN] = pd.Categorical.from_codes(codes_all, categories=list(categories))
     print(':: [Ingestion_Engine] - Data Matrix successfully combined. ::')
     return combined_df
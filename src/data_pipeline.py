@@ -0,0 +1,124 @@
+# AegisNet Streaming Training Input Module
+
+import numpy as np
+import joblib
+import tensorflow as tf
+
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+from src.config import SCALER_SAVE_PATH, STREAM_CHUNK_ROWS, STREAM_BATCH_SIZE
+from src.feature_transform import apply_in_place, scaling_params
+
+
+def split_indices(y, test_size=0.2, random_state=42):
+    """Stratified train/test split over row indices only.
+
+    Uses the same splitter and seed as split_and_scale, so the rows in each
+    split match the in-memory pipeline without materializing X.
+
+    Args:
+        y: Target labels
+        test_size: Fraction of rows held out
+        random_state: Split seed
+
+    Returns:
+        Tuple of (train_indices, test_indices)
+    """
+    return train_test_split(
+        np.arange(len(y)), test_size=test_size, random_state=random_state, stratify=y
+    )
+
+
+def fit_scaler_streaming(X, indices, chunk_rows=STREAM_CHUNK_ROWS, save_path=SCALER_SAVE_PATH):
+    """Fit the production StandardScaler chunk by chunk with partial_fit.
+
+    Args:
+        X: Feature DataFrame (typically backed by the feature cache memmap)
+        indices: Training row indices
+        chunk_rows: Rows read per chunk
+        save_path: Where the fitted scaler is saved
+
+    Returns:
+        Fitted StandardScaler (also saved to save_path)
+    """
+    print("-- Fitting scaler in streaming mode...")
+    scaler = StandardScaler()
+    ordered = np.sort(indices)
+    for start in range(0, len(ordered), chunk_rows):
+        scaler.partial_fit(X.iloc[ordered[start:start + chunk_rows]])
+    print(f"-- Saving scaler to {save_path}...")
+    joblib.dump(scaler, save_path)
+    return scaler
+
+
+def make_dataset(
+    X,
+    y,
+    indices,
+    scaler,
+    shuffle=False,
+    batch_size=STREAM_BATCH_SIZE,
+    chunk_rows=STREAM_CHUNK_ROWS,
+    seed=42,
+):
+    """Build a tf.data pipeline that streams, scales and batches rows.
+
+    Rows are gathered from X in chunks of sorted indices, so a memory-mapped
+    matrix is read mostly sequentially. With shuffle=True the indices are
+    randomly permuted every epoch before being cut into chunks, so each chunk
+    is a uniform sample of all rows (not a run of neighbouring days or one
+    class); each chunk is then sorted for the read and its rows permuted
+    again after it. Each chunk is scaled in place by the shared feature
+    kernel (byte-identical to serving) and the next batches are prefetched
+    while the model trains.
+
+    Args:
+        X: Unscaled feature DataFrame or array
+        y: Target labels
+        indices: Row indices to stream
+        scaler: Fitted StandardScaler
+        shuffle: Shuffle rows every epoch
+        batch_size: Rows per batch
+        chunk_rows: Rows gathered from X at a time
+        seed: Shuffle seed
+
+    Returns:
+        tf.data.Dataset yielding (X_scaled, y) batches
+    """
+    values = X.to_numpy(copy=False) if hasattr(X, "to_numpy") else X
+    indices = np.asarray(indices)
+    ordered = np.sort(indices)
+    chunk_rows = max(batch_size, (chunk_rows // batch_size) * batch_size)
+    starts = np.arange(0, len(ordered), chunk_rows)
+    rng = np.random.default_rng(seed)
+    n_features = values.shape[1]
+    scaling = scaling_params(scaler)
+
+    def generate():
+        epoch_order = rng.permutation(indices) if shuffle else ordered
+        for start in starts:
+            chunk_idx = epoch_order[start:start + chunk_rows]
+            if shuffle:
+                chunk_idx = np.sort(chunk_idx)
+            # The fancy-indexed gather is a private copy, so it is scaled in place
+            X_chunk = apply_in_place(np.asarray(values[chunk_idx], dtype=np.float32), scaling, sanitize=False)
+            y_chunk = np.asarray(y[chunk_idx], dtype=np.float32)
+            if shuffle:
+                perm = rng.permutation(len(chunk_idx))
+                X_chunk, y_chunk = X_chunk[perm], y_chunk[perm]
+            for b in range(0, len(chunk_idx), batch_size):
+                yield X_chunk[b:b + batch_size], y_chunk[b:b + batch_size]
+
+    n_batches = sum(
+        -(-min(chunk_rows, len(ordered) - start) // batch_size) for start in starts
+    )
+
+    dataset = tf.data.Dataset.from_generator(
+        generate,
+        output_signature=(
+            tf.TensorSpec(shape=(None, n_features), dtype=tf.float32),
+            tf.TensorSpec(shape=(None,), dtype=tf.float32),
+        ),
+    )
+    dataset = dataset.apply(tf.data.experimental.assert_cardinality(n_batches))
+    return dataset.prefetch(tf.data.AUTOTUNE)
@@ -4,25 +4,25 @@ import numpy as np
 import joblib
 
 from src.config import TARGET_COLUMN, TOP_FEATURES, SCALER_SAVE_PATH
+from src.feature_transform import finite_rows, scaling_params, transform
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 
 
-def preprocess_data(df):
-    """Preprocess the combined dataset for model training.
+def sanitize_data(df):
+    """Clean the combined dataset and separate features from the target.
 
     Args:
         df: Combined pandas DataFrame with all data
 
     Returns:
-        Tuple of (X_train_scaled, X_test_scaled, y_train, y_test, X, y)
+        Tuple of (X, y) with X restricted to TOP_FEATURES when configured
     """
     print(":: [DataSanitizer] - Initiating data sanitization... ::")
 
-    # Step 1: Handle infinite values
+    # Step 1: Handle infinite values (rows with inf or NaN anywhere are dropped)
     print("-- Step 1/5: Neutralizing infinite values...")
-    df.replace([np.inf, -np.inf], np.nan, inplace=True)
-    df.dropna(inplace=True)
+    df = df[finite_rows(df)]
 
     # Step 2: Separate features (X) and target (y)
     print("-- Step 2/5: Isolating target variable...")
@@ -43,6 +43,19 @@ def preprocess_data(df):
     unique, counts = np.unique(y, return_counts=True)
     print(dict(zip(unique, counts)))
 
+    return X, y
+
+
+def split_and_scale(X, y):
+    """Split the sanitized data and fit the production scaler.
+
+    Args:
+        X: Sanitized feature DataFrame
+        y: Target labels
+
+    Returns:
+        Tuple of (X_train_scaled, X_test_scaled, y_train, y_test)
+    """
     # Step 4: Split data into training and test sets
     print("-- Step 4/5: Splitting data matrix (80% train, 20% test)...")
     X_train, X_test, y_train, y_test = train_test_split(
@@ -55,8 +68,24 @@ def preprocess_data(df):
     scaler.fit(X_train)
     print(f"-- Saving scaler to {SCALER_SAVE_PATH}...")
     joblib.dump(scaler, SCALER_SAVE_PATH)
-    X_train_scaled = scaler.transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
+    # Same float32 multiply-add kernel the scorers use at serving time
+    scaling = scaling_params(scaler)
+    X_train_scaled = transform(X_train, scaling, sanitize=False, features=list(X_train.columns))
+    X_test_scaled = transform(X_test, scaling, sanitize=False, features=list(X_test.columns))
 
     print(":: [DataSanitizer] - Sanitization complete. Data is sterile. ::")
+    return X_train_scaled, X_test_scaled, y_train, y_test
+
+
+def preprocess_data(df):
+    """Preprocess the combined dataset for model training.
+
+    Args:
+        df: Combined pandas DataFrame with all data
+
+    Returns:
+        Tuple of (X_train_scaled, X_test_scaled, y_train, y_test, X, y)
+    """
+    X, y = sanitize_data(df)
+    X_train_scaled, X_test_scaled, y_train, y_test = split_and_scale(X, y)
     return X_train_scaled, X_test_scaled, y_train, y_test, X, y
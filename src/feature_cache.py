@@ -0,0 +1,166 @@
+# AegisNet Feature Cache Module
+
+import hashlib
+import inspect
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.config import (
+    DATA_DIR,
+    DATA_FILES,
+    TARGET_COLUMN,
+    TOP_FEATURES,
+    FEATURE_CACHE_DIR,
+)
+from src.data_loader import load_and_combine_data
+from src.data_preprocessor import sanitize_data
+from src.feature_transform import finite_rows
+
+MANIFEST_NAME = "manifest.json"
+FEATURES_NAME = "X.npy"
+LABELS_NAME = "y.npy"
+
+# Bytes hashed from the start and end of each source file
+FINGERPRINT_SAMPLE_BYTES = 1 << 20
+
+
+def file_fingerprint(file_path):
+    """Describe a source file by size, mtime and a hash of its head and tail.
+
+    Args:
+        file_path: Path to the source CSV
+
+    Returns:
+        Dict with name, size, mtime_ns and sample_sha256
+    """
+    stat = os.stat(file_path)
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        digest.update(f.read(FINGERPRINT_SAMPLE_BYTES))
+        if stat.st_size > 2 * FINGERPRINT_SAMPLE_BYTES:
+            f.seek(-FINGERPRINT_SAMPLE_BYTES, os.SEEK_END)
+            digest.update(f.read(FINGERPRINT_SAMPLE_BYTES))
+    return {
+        "name": os.path.basename(file_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sample_sha256": digest.hexdigest(),
+    }
+
+
+def compute_fingerprint():
+    """Fingerprint everything the cached matrix depends on.
+
+    Covers the source files, the TOP_FEATURES selection, the target column
+    and the source code of the cleaning rules (sanitize_data and the
+    finite_rows filter it applies).
+
+    Returns:
+        Tuple of (fingerprint hex digest, description dict)
+    """
+    description = {
+        "files": [file_fingerprint(os.path.join(DATA_DIR, f)) for f in DATA_FILES],
+        "top_features": list(TOP_FEATURES),
+        "target_column": TARGET_COLUMN,
+        "cleaning_rules_sha256": hashlib.sha256(
+            (inspect.getsource(sanitize_data) + inspect.getsource(finite_rows)).encode("utf-8")
+        ).hexdigest(),
+    }
+    encoded = json.dumps(description, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest(), description
+
+
+def read_manifest(cache_dir=FEATURE_CACHE_DIR):
+    """Return the cache manifest, or None if no complete cache exists."""
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def open_cache(manifest, cache_dir=FEATURE_CACHE_DIR):
+    """Open the cached arrays as zero-copy read-only memmaps.
+
+    Returns:
+        Tuple of (X DataFrame backed by the memmap, y memmap)
+    """
+    X = np.load(os.path.join(cache_dir, FEATURES_NAME), mmap_mode="r")
+    y = np.load(os.path.join(cache_dir, LABELS_NAME), mmap_mode="r")
+    return pd.DataFrame(X, columns=manifest["feature_names"], copy=False), y
+
+
+def write_cache(X, y, fingerprint, description, cache_dir=FEATURE_CACHE_DIR):
+    """Write the sanitized matrix and labels, then publish the manifest.
+
+    The manifest is written last via an atomic rename, so a crash mid-write
+    never leaves a cache that looks valid.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest_path = os.path.join(cache_dir, MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    features = np.lib.format.open_memmap(
+        os.path.join(cache_dir, FEATURES_NAME),
+        mode="w+",
+        dtype=np.float32,
+        shape=X.shape,
+    )
+    # Column by column, so no full C-ordered temporary is materialized
+    for j, column in enumerate(X.columns):
+        features[:, j] = X[column].to_numpy(dtype=np.float32, copy=False)
+    features.flush()
+    del features
+    np.save(os.path.join(cache_dir, LABELS_NAME), np.asarray(y, dtype=np.int8))
+
+    manifest = {
+        "fingerprint": fingerprint,
+        "source": description,
+        "feature_names": list(X.columns),
+        "rows": int(X.shape[0]),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+    return manifest
+
+
+def load_features(cache_dir=FEATURE_CACHE_DIR, rebuild=False):
+    """Return the sanitized feature matrix and labels, using the cache when valid.
+
+    On a miss the raw CSVs are loaded and sanitized once, written to the
+    cache, and reopened as memmaps so both paths return the same types.
+
+    Args:
+        cache_dir: Cache directory
+        rebuild: Ignore a valid cache and rebuild it from the raw CSVs
+
+    Returns:
+        Tuple of (X DataFrame, y array)
+    """
+    print(":: [FeatureCache] - Checking feature cache... ::")
+    fingerprint, description = compute_fingerprint()
+    manifest = read_manifest(cache_dir)
+
+    if not rebuild and manifest is not None and manifest.get("fingerprint") == fingerprint:
+        print(f"-- Cache hit: {manifest['rows']} rows from {cache_dir} (memory-mapped)")
+        return open_cache(manifest, cache_dir)
+
+    if rebuild:
+        reason = "rebuild requested"
+    else:
+        reason = "no cache found" if manifest is None else "sources or cleaning rules changed"
+    print(f"-- Cache miss ({reason}). Rebuilding from raw CSVs...")
+    df = load_and_combine_data()
+    X, y = sanitize_data(df)
+    del df
+    manifest = write_cache(X, y, fingerprint, description, cache_dir)
+    print(f"-- Cached {manifest['rows']} rows to {cache_dir}")
+    return open_cache(manifest, cache_dir)
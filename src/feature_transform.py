@@ -0,0 +1,229 @@
+# AegisNet Feature Transform Module
+
+import numpy as np
+import pandas as pd
+
+from src.config import TOP_FEATURES
+
+# Rows handled per pass: a 4096 x 30 float32 tile (~480 KB) stays in cache
+# while it is gathered, sanitized and scaled
+TILE_ROWS = 4096
+
+
+class NonNumericFeatureError(ValueError):
+    """A feature value is neither a number nor blank (e.g. "abc" in Destination Port)."""
+
+
+def column_map(columns, features=TOP_FEATURES):
+    """Positions of features within columns (first occurrence of each name).
+
+    Args:
+        columns: Column names of the input (already whitespace-stripped)
+        features: Feature names in model order
+
+    Returns:
+        Integer array of column positions, one per feature
+
+    Raises:
+        KeyError: If any feature is missing
+    """
+    positions = {}
+    for position, name in enumerate(columns):
+        positions.setdefault(name, position)
+    missing = [name for name in features if name not in positions]
+    if missing:
+        raise KeyError(f"Missing feature columns: {missing}")
+    return np.array([positions[name] for name in features], dtype=np.intp)
+
+
+def scaling_params(scaler):
+    """Fold a fitted StandardScaler into float32 (multiplier, offset) vectors.
+
+    x * (1 / scale) + (-mean / scale) is the scaler's (x - mean) / scale as
+    one multiply-add; training and serving both scale through these vectors,
+    so the model sees byte-identical inputs on either side.
+
+    Args:
+        scaler: Fitted StandardScaler
+
+    Returns:
+        Tuple of (multiplier, offset) float32 arrays
+    """
+    n_features = scaler.n_features_in_
+    mean = scaler.mean_ if scaler.mean_ is not None else np.zeros(n_features)
+    scale = scaler.scale_ if scaler.scale_ is not None else np.ones(n_features)
+    multiplier = (1.0 / scale).astype(np.float32)
+    offset = (-mean / scale).astype(np.float32)
+    return multiplier, offset
+
+
+def _to_numbers(column):
+    try:
+        return pd.to_numeric(column, errors="coerce")
+    except (TypeError, ValueError):
+        # Lists or dicts (e.g. from NDJSON) are not numbers either
+        return pd.to_numeric(
+            column.map(lambda value: value if value is None or np.isscalar(value) else np.nan),
+            errors="coerce",
+        )
+
+
+def _non_numeric(column, numbers):
+    """Mask of cells that hold something other than a number or a blank."""
+    bad = numbers.isna().to_numpy() & column.notna().to_numpy()
+    if bad.any():
+        suspects = np.flatnonzero(bad)
+        blank = [isinstance(value, str) and not value.strip() for value in column.iloc[suspects]]
+        bad[suspects[np.array(blank, dtype=bool)]] = False
+    return bad
+
+
+def _numeric(column):
+    """A DataFrame column as a numeric array (blanks become NaN).
+
+    Raises:
+        NonNumericFeatureError: If any other cell is not a number
+    """
+    if column.dtype == object:
+        numbers = _to_numbers(column)
+        bad = _non_numeric(column, numbers)
+        if bad.any():
+            raise NonNumericFeatureError(
+                f"Feature '{column.name}' has {int(np.count_nonzero(bad))} non-numeric value(s), "
+                f"e.g. {column.iloc[int(np.flatnonzero(bad)[0])]!r}"
+            )
+        column = numbers
+    return column.to_numpy()
+
+
+def numeric_rows(X, features=TOP_FEATURES):
+    """Mask of DataFrame rows whose features are all numbers or blanks (the rows transform accepts)."""
+    keep = np.ones(len(X), dtype=bool)
+    for position in column_map(X.columns, features):
+        column = X.iloc[:, position]
+        if column.dtype == object:
+            keep &= ~_non_numeric(column, _to_numbers(column))
+    return keep
+
+
+def apply_in_place(block, scaling=None, sanitize=True, tile_rows=TILE_ROWS):
+    """Sanitize and/or scale a float32 block in place, one tile at a time.
+
+    Args:
+        block: C-contiguous float32 array of shape (n, n_features)
+        scaling: (multiplier, offset) from scaling_params, or None
+        sanitize: Replace inf, -inf and NaN with 0
+        tile_rows: Rows per pass
+
+    Returns:
+        block
+    """
+    mask = np.empty((min(tile_rows, len(block)), block.shape[1]), dtype=bool)
+    for start in range(0, len(block), tile_rows):
+        tile = block[start:start + tile_rows]
+        _finish_tile(tile, mask[:len(tile)], scaling, sanitize)
+    return block
+
+
+def _finish_tile(tile, mask, scaling, sanitize):
+    if sanitize:
+        np.isfinite(tile, out=mask)
+        np.logical_not(mask, out=mask)
+        np.copyto(tile, 0.0, where=mask)
+    if scaling is not None:
+        tile *= scaling[0]
+        tile += scaling[1]
+
+
+def transform(X, scaling=None, sanitize=True, features=TOP_FEATURES, tile_rows=TILE_ROWS):
+    """Gather feature rows into a new float32 block, sanitized and/or scaled.
+
+    The single preprocessing kernel shared by training, the API, the batch
+    predictor and the streamer. Each tile of rows is gathered column by
+    column from the source, then cleaned and scaled while still in cache, so
+    the only allocation is the output block (plus one tile-sized mask).
+
+    Args:
+        X: DataFrame (features picked by name, blank cells read as NaN) or
+            2-D array whose columns are already in feature order
+        scaling: (multiplier, offset) from scaling_params, or None for
+            cleaned but unscaled rows
+        sanitize: Replace inf, -inf and NaN with 0
+        features: Feature names in model order (DataFrame inputs)
+        tile_rows: Rows per pass
+
+    Returns:
+        C-contiguous float32 array of shape (n, n_features), owned by the caller
+
+    Raises:
+        KeyError: If a DataFrame lacks any of the features
+        NonNumericFeatureError: If a DataFrame feature holds a non-numeric value
+    """
+    if isinstance(X, pd.DataFrame):
+        sources = [_numeric(X.iloc[:, position]) for position in column_map(X.columns, features)]
+        shape = (len(X), len(sources))
+    else:
+        values = np.asarray(X)
+        values = values.reshape(1, -1) if values.ndim == 1 else values
+        sources = None
+        shape = values.shape
+
+    block = np.empty(shape, dtype=np.float32)
+    mask = np.empty((min(tile_rows, shape[0]), shape[1]), dtype=bool)
+    for start in range(0, shape[0], tile_rows):
+        tile = block[start:start + tile_rows]
+        if sources is None:
+            tile[...] = values[start:start + tile_rows]
+        else:
+            for j, source in enumerate(sources):
+                tile[:, j] = source[start:start + tile_rows]
+        _finish_tile(tile, mask[:len(tile)], scaling, sanitize)
+    return block
+
+
+def record_to_block(record, features=TOP_FEATURES):
+    """Clean one JSON flow record into a (1, n_features) float32 block.
+
+    Args:
+        record: Dict of feature name to value (numbers or numeric strings;
+            None becomes 0, like NaN in the batch paths)
+        features: Feature names in model order
+
+    Returns:
+        float32 array of shape (1, n_features)
+
+    Raises:
+        KeyError: If any feature is missing
+        NonNumericFeatureError: If a feature value is not a number
+    """
+    if not isinstance(record, dict):
+        raise NonNumericFeatureError("A flow record must be a JSON object of feature values")
+    missing = [name for name in features if name not in record]
+    if missing:
+        raise KeyError(f"Missing feature columns: {missing}")
+    values = [record[name] for name in features]
+    try:
+        row = np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        for name, value in zip(features, values):
+            try:
+                float("nan" if value is None else value)
+            except (TypeError, ValueError):
+                raise NonNumericFeatureError(f"Feature '{name}' is not numeric: {value!r}") from None
+        raise
+    return transform(row.reshape(1, -1))
+
+
+def finite_rows(df):
+    """Mask of rows with no inf, -inf or NaN in any column (training keeps only these).
+
+    Works column by column, so no DataFrame-sized temporary is created.
+    """
+    keep = np.ones(len(df), dtype=bool)
+    for name in df.columns:
+        values = df[name].to_numpy()
+        if values.dtype.kind == "f":
+            keep &= np.isfinite(values)
+        elif values.dtype.kind not in "iub":
+            keep &= pd.notna(values)
+    return keep
@@ -0,0 +1,124 @@
+# AegisNet Synthetic Flow Generator Module
+
+import numpy as np
+import pandas as pd
+
+from src.config import TOP_FEATURES, TARGET_COLUMN
+
+# Attack labels drawn for malicious rows (CIC-IDS-2017 names)
+ATTACK_LABELS = ["DDoS", "DoS Hulk", "PortScan", "DoS GoldenEye", "FTP-Patator", "SSH-Patator"]
+BENIGN_PORTS = [80, 443, 53, 8080, 22, 123, 137, 389]
+WINDOW_SIZES = [-1, 0, 229, 256, 8192, 29200, 65535]
+MAX_PACKET_BYTES = 1500.0
+
+
+def generate_flows(n_rows, attack_fraction=0.2, seed=42):
+    """Generate CIC-IDS-2017-shaped flow records.
+
+    Per-flow packet counts, payload sizes and durations are drawn from
+    class-conditional distributions, and the TOP_FEATURES columns are derived
+    from them the way CICFlowMeter does (subflow totals equal flow totals,
+    rates divide by duration). Zero-duration flows yield Infinity/NaN rates,
+    like the real CSVs, so the cleaning step is exercised too.
+
+    Args:
+        n_rows: Number of flows
+        attack_fraction: Fraction of rows labelled as attacks
+        seed: Random seed
+
+    Returns:
+        DataFrame with the TOP_FEATURES columns plus TARGET_COLUMN
+    """
+    rng = np.random.default_rng(seed)
+    attack = rng.random(n_rows) < attack_fraction
+
+    # Attacks: short bursts, small payloads, few replies
+    fwd_packets = 1 + rng.geometric(np.where(attack, 0.5, 0.15))
+    bwd_packets = rng.geometric(np.where(attack, 0.7, 0.15)) - 1
+    fwd_mean = np.clip(rng.lognormal(np.where(attack, 2.0, 4.0), 1.0), 0.0, MAX_PACKET_BYTES)
+    bwd_mean = np.where(
+        bwd_packets > 0,
+        np.clip(rng.lognormal(np.where(attack, 3.0, 5.5), 1.2), 0.0, MAX_PACKET_BYTES),
+        0.0,
+    )
+    fwd_max = np.minimum(fwd_mean * (1.0 + rng.random(n_rows)), MAX_PACKET_BYTES)
+    bwd_max = np.minimum(bwd_mean * (1.0 + rng.random(n_rows)), MAX_PACKET_BYTES)
+    bwd_std = bwd_mean * rng.random(n_rows) * 0.5
+
+    # Durations in microseconds; ~1% of flows have zero duration
+    duration = np.where(
+        rng.random(n_rows) < 0.01,
+        0.0,
+        rng.lognormal(np.where(attack, 9.0, 12.0), 2.0),
+    )
+    seconds = duration / 1e6
+
+    fwd_bytes = fwd_packets * fwd_mean
+    bwd_bytes = bwd_packets * bwd_mean
+    packets = fwd_packets + bwd_packets
+    packet_mean = (fwd_bytes + bwd_bytes) / packets
+    packet_std = np.abs(fwd_mean - bwd_mean) * 0.5 + bwd_std
+    header = rng.choice([20, 32, 40], size=n_rows)
+    iat_mean = duration / np.maximum(packets - 1, 1)
+
+    ports = np.where(
+        attack,
+        np.where(rng.random(n_rows) < 0.6, 80, rng.integers(1, 65536, n_rows)),
+        np.where(rng.random(n_rows) < 0.8, rng.choice(BENIGN_PORTS, n_rows), rng.integers(1024, 65536, n_rows)),
+    )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        columns = {
+            "Max Packet Length": np.maximum(fwd_max, bwd_max),
+            "Avg Bwd Segment Size": bwd_mean,
+            "Packet Length Variance": packet_std**2,
+            "Destination Port": ports,
+            "Packet Length Std": packet_std,
+            "Average Packet Size": packet_mean * packets / np.maximum(packets - 1, 1),
+            "Bwd Packet Length Max": bwd_max,
+            "Bwd Packet Length Std": bwd_std,
+            "Total Length of Bwd Packets": bwd_bytes,
+            "Init_Win_bytes_forward": rng.choice(WINDOW_SIZES, n_rows),
+            "Total Length of Fwd Packets": fwd_bytes,
+            "Subflow Fwd Bytes": fwd_bytes,
+            "Bwd Packet Length Mean": bwd_mean,
+            "Packet Length Mean": packet_mean,
+            "Subflow Bwd Bytes": bwd_bytes,
+            "Fwd Header Length.1": fwd_packets * header,
+            "Avg Fwd Segment Size": fwd_mean,
+            "Fwd Packet Length Max": fwd_max,
+            "Bwd Header Length": bwd_packets * header,
+            "Subflow Fwd Packets": fwd_packets,
+            "Fwd Header Length": fwd_packets * header,
+            "Fwd IAT Max": duration * rng.random(n_rows),
+            "Init_Win_bytes_backward": np.where(bwd_packets > 0, rng.choice(WINDOW_SIZES, n_rows), -1),
+            "Fwd Packet Length Mean": fwd_mean,
+            "Flow Bytes/s": (fwd_bytes + bwd_bytes) / seconds,
+            "Total Fwd Packets": fwd_packets,
+            "Flow IAT Mean": iat_mean,
+            "Flow IAT Std": iat_mean * rng.random(n_rows),
+            "Flow Packets/s": packets / seconds,
+            "Bwd Packets/s": bwd_packets / seconds,
+        }
+
+    df = pd.DataFrame({name: columns[name] for name in TOP_FEATURES})
+    labels = np.where(attack, rng.choice(ATTACK_LABELS, n_rows), "BENIGN")
+    df[TARGET_COLUMN] = labels
+    return df
+
+
+def write_flows_csv(path, n_rows, attack_fraction=0.2, seed=42, chunk_rows=100000):
+    """Write synthetic flows to CSV in chunks, with CIC-style padded headers.
+
+    Args:
+        path: Output CSV path
+        n_rows: Total number of flows
+        attack_fraction: Fraction of rows labelled as attacks
+        seed: Base random seed (each chunk uses seed + chunk index)
+        chunk_rows: Rows generated and written at a time
+    """
+    for i, start in enumerate(range(0, n_rows, chunk_rows)):
+        chunk = generate_flows(min(chunk_rows, n_rows - start), attack_fraction, seed + i)
+        # The raw CSVs pad most headers with a leading space
+        chunk.columns = [" " + name for name in chunk.columns]
+        chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
@@ -0,0 +1,642 @@
+# AegisNet Live Flow Stream Module
+
+import csv
+import io
+import json
+import os
+import queue
+import select
+import socket
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from src.config import (
+    TOP_FEATURES,
+    CLASSIFICATION_THRESHOLD,
+    DEDUP_ENABLED,
+    STREAMER_BATCH_SIZE,
+    STREAMER_MAX_WAIT_MS,
+    STREAMER_QUEUE_BLOCKS,
+    STREAMER_READ_SIZE,
+    STREAMER_BLOCK_BYTES,
+    STREAMER_TAIL_POLL_S,
+    STREAMER_ALERT_FIELDS,
+)
+from src.inference_engine import predict_deduplicated
+from src.feature_transform import numeric_rows, transform
+from src.metrics import (
+    LATENCY_BUCKETS,
+    ROW_BUCKETS,
+    Counter,
+    Gauge,
+    Histogram,
+    RateMeter,
+    Registry,
+)
+
+# Always present in alerts: the port is one of the model's features
+DESTINATION_PORT_INDEX = TOP_FEATURES.index("Destination Port")
+
+# Kept apart from the API's registry: the streamer is its own process
+STREAM_REGISTRY = Registry()
+FLOWS_READ = Counter(
+    "aegisnet_stream_flows_read_total",
+    "Flow records parsed from the input sources.",
+    registry=STREAM_REGISTRY,
+)
+BAD_RECORDS = Counter(
+    "aegisnet_stream_bad_records_total",
+    "Input lines that could not be parsed as flow records.",
+    registry=STREAM_REGISTRY,
+)
+FLOWS_SCORED = Counter(
+    "aegisnet_stream_flows_scored_total",
+    "Flow records scored.",
+    registry=STREAM_REGISTRY,
+)
+ALERTS = Counter(
+    "aegisnet_stream_alerts_total",
+    "Flows at or above CLASSIFICATION_THRESHOLD written to the alert sink.",
+    registry=STREAM_REGISTRY,
+)
+BATCH_ROWS = Histogram(
+    "aegisnet_stream_batch_rows",
+    "Flows per scored micro-batch.",
+    buckets=ROW_BUCKETS,
+    registry=STREAM_REGISTRY,
+)
+SCORE_SECONDS = Histogram(
+    "aegisnet_stream_score_seconds",
+    "Time to score one micro-batch.",
+    registry=STREAM_REGISTRY,
+)
+LAG_SECONDS = Histogram(
+    "aegisnet_stream_lag_seconds",
+    "Time from reading the oldest flow of a batch to its alerts being written.",
+    buckets=LATENCY_BUCKETS,
+    registry=STREAM_REGISTRY,
+)
+QUEUE_DEPTH = Gauge(
+    "aegisnet_stream_queue_blocks",
+    "Parsed blocks waiting to be scored (readers block when the queue is full).",
+    registry=STREAM_REGISTRY,
+)
+FLOWS_SCORED_RATE = RateMeter()
+FLOWS_SCORED_PER_SECOND = Gauge(
+    "aegisnet_stream_flows_scored_per_second",
+    "Flows scored per second over the metrics rate window.",
+    registry=STREAM_REGISTRY,
+)
+FLOWS_SCORED_PER_SECOND.set_function(FLOWS_SCORED_RATE.rate)
+
+
+class StreamFormatError(ValueError):
+    """A stream's CSV header lacks model features, so none of its rows can be scored."""
+
+
+class FlowBlock:
+    """Parsed flows from one read of one source."""
+
+    def __init__(self, source, first_row, features, identity, read_time):
+        self.source = source
+        self.first_row = first_row  # 0-based index of the first flow within its source
+        self.features = features  # float32 (n, len(TOP_FEATURES)), inf/NaN replaced by 0
+        self.identity = identity  # DataFrame of STREAMER_ALERT_FIELDS present in the input
+        self.read_time = read_time  # time.monotonic() when the bytes were read
+
+    def __len__(self):
+        return len(self.features)
+
+
+def _clean_features(frame):
+    """Same cleaning as the batch paths (src.feature_transform): blanks, inf and NaN become 0."""
+    return transform(frame)
+
+
+class RecordParser:
+    """Turn the raw bytes of one stream into FlowBlocks.
+
+    The format is detected from the first non-blank line: a JSON object means
+    NDJSON, anything else is taken as a CSV header (CICFlowMeter style, column
+    names may carry leading spaces). Incomplete trailing lines are held back
+    until the rest arrives. Lines that cannot be parsed (wrong field count,
+    unterminated quote, invalid JSON, a non-numeric feature) are dropped and
+    counted in BAD_RECORDS; the rest of the block is still scored.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.rows = 0
+        self.format = None
+        self._pending = b""
+        self._header_line = None
+        self._positions = None
+        self._names_by_position = None
+        self._n_columns = None
+        self._discard_partial = False
+
+    def discard_partial_line(self):
+        """Drop input up to the next newline (after seeking into the middle of a file)."""
+        self._discard_partial = True
+
+    def feed(self, data, read_time):
+        """Parse the complete lines in data; returns a FlowBlock or None."""
+        data = self._pending + data
+        if self._discard_partial:
+            newline = data.find(b"\n")
+            if newline < 0:
+                self._pending = b""
+                return None
+            data = data[newline + 1:]
+            self._discard_partial = False
+        cut = data.rfind(b"\n") + 1
+        self._pending = data[cut:]
+        return self._parse(data[:cut], read_time)
+
+    def flush(self, read_time):
+        """Parse a final line that had no trailing newline (end of stream)."""
+        data, self._pending = self._pending, b""
+        return self._parse(data, read_time) if data.strip() else None
+
+    def _set_header(self, header_line):
+        # Let pandas name the columns so duplicates get the same ".1" suffixes
+        # as in training (e.g. "Fwd Header Length.1")
+        try:
+            columns = pd.read_csv(io.BytesIO(header_line), nrows=0, encoding_errors="replace").columns
+        except ValueError as e:
+            raise StreamFormatError(f"{self.source}: unreadable CSV header ({e})") from e
+        columns = [col.strip() for col in columns]
+        missing = [name for name in TOP_FEATURES if name not in columns]
+        if missing:
+            raise StreamFormatError(f"{self.source}: CSV header is missing features {missing}")
+        wanted = list(TOP_FEATURES) + [name for name in STREAMER_ALERT_FIELDS if name in columns]
+        self._header_line = header_line.rstrip(b"\r\n")
+        self._positions = [columns.index(name) for name in wanted]
+        self._names_by_position = dict(zip(self._positions, wanted))
+        self._n_columns = len(columns)
+
+    def _parse(self, data, read_time):
+        if self.format is None:
+            data = data.lstrip()
+            if not data:
+                return None
+            if data.startswith(b"{"):
+                self.format = "ndjson"
+            else:
+                self.format = "csv"
+                newline = data.find(b"\n")
+                self._set_header(data[:newline + 1])
+                data = data[newline + 1:]
+        if not data.strip():
+            return None
+
+        if self.format == "csv":
+            frame, bad = self._parse_csv(data)
+        else:
+            frame, bad = self._parse_ndjson(data)
+        if frame is not None:
+            keep = numeric_rows(frame)
+            if not keep.all():
+                bad += int(np.count_nonzero(~keep))
+                frame = frame[keep]
+        if bad:
+            BAD_RECORDS.inc(bad)
+        if frame is None or frame.empty:
+            return None
+
+        identity_fields = [name for name in STREAMER_ALERT_FIELDS if name in frame.columns]
+        block = FlowBlock(
+            self.source,
+            self.rows,
+            _clean_features(frame),
+            frame[identity_fields].astype(str),
+            read_time,
+        )
+        self.rows += len(block)
+        FLOWS_READ.inc(len(block))
+        return block
+
+    def _parse_csv(self, data):
+        # Dropping repeated headers covers a writer that restarted
+        lines = [
+            line for line in data.split(b"\n")
+            if line.strip() and line.rstrip(b"\r") != self._header_line
+        ]
+        if b'"' in data:
+            return self._parse_csv_lines(lines)
+        # Unquoted, a well-formed line has exactly one field per header column;
+        # pandas would pad a short line with NaN (or reject the whole block)
+        good = [line for line in lines if line.count(b",") == self._n_columns - 1]
+        if not good:
+            return None, len(lines)
+        identity_positions = self._positions[len(TOP_FEATURES):]
+        try:
+            frame = pd.read_csv(
+                io.BytesIO(b"\n".join(good)),
+                header=None,
+                usecols=self._positions,
+                dtype={position: str for position in identity_positions},
+                encoding_errors="replace",
+            )
+        except ValueError:
+            return self._parse_csv_lines(lines)
+        frame.columns = [self._names_by_position[position] for position in frame.columns]
+        return frame, len(lines) - len(frame)
+
+    def _parse_csv_lines(self, lines):
+        """Slow path for quoted fields: parse line by line, skipping the bad ones."""
+        rows = []
+        for line in lines:
+            try:
+                fields = next(csv.reader([line.rstrip(b"\r").decode("utf-8", errors="replace")], strict=True))
+            except csv.Error:
+                continue
+            if len(fields) == self._n_columns:
+                rows.append([fields[position] for position in self._positions])
+        if not rows:
+            return None, len(lines)
+        frame = pd.DataFrame(rows, columns=[self._names_by_position[position] for position in self._positions])
+        return frame, len(lines) - len(frame)
+
+    def _parse_ndjson(self, data):
+        records = []
+        bad = 0
+        for line in data.splitlines():
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                bad += 1
+                continue
+            if not isinstance(record, dict):
+                bad += 1
+                continue
+            records.append(record)
+        if not records:
+            return None, bad
+        frame = pd.DataFrame.from_records(records)
+        frame.columns = [str(col).strip() for col in frame.columns]
+        # Missing fields are treated like empty CSV cells (cleaned to 0)
+        frame = frame.reindex(columns=list(dict.fromkeys(list(TOP_FEATURES) + list(frame.columns))))
+        return frame, bad
+
+
+# ============================================================================
+# Sources: each runs in its own thread and hands blocks to StreamScorer.emit
+# ============================================================================
+
+
+def _readable(fd):
+    return bool(select.select([fd], [], [], 0)[0])
+
+
+class _Coalescer:
+    """Join consecutive reads into one parse while more input is already waiting.
+
+    Parsing has a fixed per-call cost, so under load reads are merged into
+    blocks of up to block_bytes; when the source is idle each read is parsed
+    (and scored) right away.
+    """
+
+    def __init__(self, parser, emit, block_bytes=STREAMER_BLOCK_BYTES):
+        self.parser = parser
+        self.emit = emit
+        self.block_bytes = block_bytes
+        self._chunks = []
+        self._size = 0
+        self._read_time = None
+
+    def add(self, data, more_waiting):
+        if not self._chunks:
+            self._read_time = time.monotonic()
+        self._chunks.append(data)
+        self._size += len(data)
+        if not more_waiting or self._size >= self.block_bytes:
+            self.flush()
+
+    def flush(self):
+        if self._chunks:
+            data, self._chunks, self._size = b"".join(self._chunks), [], 0
+            self.emit(self.parser.feed(data, self._read_time))
+
+    def close(self):
+        self.flush()
+        self.emit(self.parser.flush(time.monotonic()))
+
+
+def _report_format_error(error):
+    BAD_RECORDS.inc()
+    print(f"ERROR: {error}", file=sys.stderr, flush=True)
+
+
+def read_fd(fd, source, emit, stop_event, read_size=STREAMER_READ_SIZE):
+    """Read a pipe or stdin until EOF (or until its header proves unusable).
+
+    Args:
+        fd: File descriptor to read
+        source: Name used in alerts
+        emit: Callable receiving FlowBlocks (blocks while the scorer is behind)
+        stop_event: threading.Event that ends the read loop
+        read_size: Maximum bytes per read
+    """
+    reader = _Coalescer(RecordParser(source), emit)
+    try:
+        while not stop_event.is_set():
+            data = os.read(fd, read_size)
+            if not data:
+                break
+            reader.add(data, _readable(fd))
+        reader.close()
+    except StreamFormatError as e:
+        _report_format_error(e)
+
+
+def tail_file(path, emit, stop_event, from_start=False, read_size=STREAMER_READ_SIZE, poll_s=STREAMER_TAIL_POLL_S):
+    """Follow a growing CSV/NDJSON file, like `tail -F`.
+
+    The CSV header is always read from the top of the file. Unless from_start
+    is set, scoring starts with the rows appended after the streamer started.
+    A truncated or replaced (rotated) file is reopened from the beginning; so
+    is a file whose header lacks model features, once it is rotated.
+
+    Args:
+        path: File to follow
+        emit: Callable receiving FlowBlocks
+        stop_event: threading.Event that ends the loop
+        from_start: Also score the rows already in the file
+        read_size: Maximum bytes per read
+        poll_s: Sleep between checks once the end of the file is reached
+    """
+    skip_existing = not from_start
+    while not stop_event.is_set():
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            time.sleep(poll_s)
+            continue
+
+        with f:
+            parser = RecordParser(path)
+            reader = _Coalescer(parser, emit)
+            unusable = False
+            try:
+                if skip_existing:
+                    header = f.readline()
+                    if header.strip() and not header.lstrip().startswith(b"{"):
+                        parser.feed(header, time.monotonic())
+                    end = os.fstat(f.fileno()).st_size
+                    if end > f.tell():
+                        f.seek(end - 1)
+                        if f.read(1) != b"\n":
+                            parser.discard_partial_line()
+                    skip_existing = False
+            except StreamFormatError as e:
+                _report_format_error(e)
+                unusable = True
+                skip_existing = False
+
+            while not stop_event.is_set():
+                data = f.read(read_size)
+                if data and not unusable:
+                    try:
+                        # A full read means the file has more waiting
+                        reader.add(data, len(data) == read_size)
+                    except StreamFormatError as e:
+                        _report_format_error(e)
+                        unusable = True
+                    continue
+                if data:
+                    # Skip to the end; only a rotated file can have a usable header
+                    f.seek(0, os.SEEK_END)
+                    continue
+                try:
+                    current = os.stat(path)
+                except FileNotFoundError:
+                    current = None
+                if current is None or current.st_ino != os.fstat(f.fileno()).st_ino or current.st_size < f.tell():
+                    # Rotated or truncated: finish this file, then reopen
+                    if not unusable:
+                        reader.close()
+                    break
+                time.sleep(poll_s)
+
+
+def parse_address(address):
+    """Split tcp://host:port or unix:///path into (family, bind address)."""
+    if address.startswith("unix://"):
+        return socket.AF_UNIX, address[len("unix://"):]
+    if address.startswith("tcp://"):
+        host, _, port = address[len("tcp://"):].rpartition(":")
+        return socket.AF_INET, (host or "127.0.0.1", int(port))
+    raise ValueError(f"Unsupported address (use tcp://host:port or unix:///path): {address}")
+
+
+def listen_socket(address, emit, stop_event, read_size=STREAMER_READ_SIZE):
+    """Accept sensor connections on a local TCP or Unix socket.
+
+    Each connection is an independent stream (its own CSV header or NDJSON)
+    read on its own thread. When the scorer falls behind, reads stop and TCP
+    flow control pushes back on the sender.
+
+    Args:
+        address: tcp://host:port or unix:///path
+        emit: Callable receiving FlowBlocks
+        stop_event: threading.Event that stops accepting and reading
+        read_size: Maximum bytes per recv
+    """
+    family, bind_address = parse_address(address)
+    if family == socket.AF_UNIX and os.path.exists(bind_address):
+        os.unlink(bind_address)
+    server = socket.socket(family, socket.SOCK_STREAM)
+    if family == socket.AF_INET:
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind(bind_address)
+    server.listen()
+    server.settimeout(0.5)
+
+    def handle(conn, peer):
+        reader = _Coalescer(RecordParser(f"{address}#{peer}"), emit)
+        conn.settimeout(0.5)
+        with conn:
+            try:
+                while not stop_event.is_set():
+                    try:
+                        data = conn.recv(read_size)
+                    except socket.timeout:
+                        continue
+                    except OSError:
+                        break
+                    if not data:
+                        break
+                    reader.add(data, _readable(conn))
+                reader.close()
+            except StreamFormatError as e:
+                # Only this connection is dropped; the listener keeps accepting
+                _report_format_error(e)
+
+    connections = 0
+    with server:
+        while not stop_event.is_set():
+            try:
+                conn, peer = server.accept()
+            except socket.timeout:
+                continue
+            connections += 1
+            peer = f"{peer[0]}:{peer[1]}" if family == socket.AF_INET else connections
+            threading.Thread(target=handle, args=(conn, peer), daemon=True).start()
+    if family == socket.AF_UNIX:
+        os.unlink(bind_address)
+
+
+# ============================================================================
+# Alert sink and scorer
+# ============================================================================
+
+
+class AlertSink:
+    """Append alerts as NDJSON lines to a file, or to stdout for "-"."""
+
+    def __init__(self, path="-"):
+        self.path = path
+        self._file = sys.stdout if path == "-" else open(path, "a")
+
+    def write(self, alerts):
+        if alerts:
+            self._file.write("".join(json.dumps(alert) + "\n" for alert in alerts))
+            self._file.flush()
+
+    def close(self):
+        if self._file is not sys.stdout:
+            self._file.close()
+
+
+class StreamScorer:
+    """Micro-batch parsed flow blocks and score them as they arrive.
+
+    Source threads call emit(); blocks wait in a bounded queue, so a source
+    that outruns the model simply blocks (backpressure) instead of growing
+    memory. The scoring loop flushes a batch once batch_size flows are
+    waiting or max_wait_ms after the oldest one was read, whichever is first.
+    """
+
+    def __init__(
+        self,
+        scorer,
+        sink,
+        batch_size=STREAMER_BATCH_SIZE,
+        max_wait_ms=STREAMER_MAX_WAIT_MS,
+        queue_blocks=STREAMER_QUEUE_BLOCKS,
+        threshold=CLASSIFICATION_THRESHOLD,
+    ):
+        self.scorer = scorer
+        self.sink = sink
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.threshold = threshold
+        self.stop_event = threading.Event()
+        self._queue = queue.Queue(maxsize=queue_blocks)
+        QUEUE_DEPTH.set_function(self._queue.qsize)
+
+    def emit(self, block):
+        """Queue a block for scoring, waiting while the queue is full."""
+        if block is None:
+            return
+        while not self.stop_event.is_set():
+            try:
+                self._queue.put(block, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def run(self, sources, on_batch=None):
+        """Score until every source has finished (or stop_event is set).
+
+        Args:
+            sources: Callables taking (emit, stop_event), each run on its own thread
+            on_batch: Optional callback(n_flows, n_alerts, lag_s) after each batch
+        """
+        threads = [
+            threading.Thread(target=source, args=(self.emit, self.stop_event), daemon=True)
+            for source in sources
+        ]
+        for thread in threads:
+            thread.start()
+
+        pending = []
+        pending_rows = 0
+        deadline = None
+        while True:
+            timeout = 0.5 if deadline is None else max(deadline - time.monotonic(), 0.0)
+            try:
+                block = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                block = None
+            if block is not None:
+                pending.append(block)
+                pending_rows += len(block)
+                if deadline is None:
+                    deadline = block.read_time + self.max_wait
+
+            finished = (
+                block is None
+                and self._queue.empty()
+                and (self.stop_event.is_set() or not any(thread.is_alive() for thread in threads))
+            )
+            if pending and (finished or pending_rows >= self.batch_size or time.monotonic() >= deadline):
+                n_alerts, lag = self._score(pending)
+                if on_batch is not None:
+                    on_batch(pending_rows, n_alerts, lag)
+                pending, pending_rows, deadline = [], 0, None
+            if finished:
+                break
+
+    def _score(self, blocks):
+        """Score one micro-batch and write its alerts; returns (alerts, lag_s)."""
+        with SCORE_SECONDS.time():
+            X = np.concatenate([block.features for block in blocks])
+            if DEDUP_ENABLED:
+                probabilities, _ = predict_deduplicated(self.scorer, X)
+            else:
+                probabilities = self.scorer.predict(X)
+            probabilities = np.asarray(probabilities).reshape(-1)
+
+        alerts = []
+        detected_at = datetime.now(timezone.utc).isoformat()
+        start = 0
+        for block in blocks:
+            scores = probabilities[start:start + len(block)]
+            start += len(block)
+            flagged = np.flatnonzero(scores >= self.threshold)
+            if not len(flagged):
+                continue
+            if len(block.identity.columns):
+                identities = block.identity.iloc[flagged].to_dict("records")
+            else:
+                identities = [{}] * len(flagged)
+            for local, score, identity in zip(flagged.tolist(), scores[flagged].tolist(), identities):
+                alerts.append(
+                    {
+                        "detected_at": detected_at,
+                        "source": block.source,
+                        "row": block.first_row + local + 1,
+                        "confidence_score": score,
+                        "Destination Port": int(block.features[local, DESTINATION_PORT_INDEX]),
+                        **identity,
+                    }
+                )
+        self.sink.write(alerts)
+
+        n_flows = len(probabilities)
+        lag = time.monotonic() - min(block.read_time for block in blocks)
+        FLOWS_SCORED.inc(n_flows)
+        FLOWS_SCORED_RATE.add(n_flows)
+        ALERTS.inc(len(alerts))
+        BATCH_ROWS.observe(n_flows)
+        LAG_SECONDS.observe(lag)
+        return len(alerts), lag
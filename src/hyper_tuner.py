@@ -0,0 +1,203 @@
+# AegisNet HyperTuner Module
+
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import tensorflow as tf
+import keras_tuner as kt
+
+from src.config import (
+    TUNER_DIR,
+    TUNER_PROJECT_NAME,
+    TUNER_SEED,
+    TUNER_ORACLE_PORT,
+)
+from src.model_builder import build_hypermodel
+
+SEARCH_DATA_FILES = ("x", "y", "val_x", "val_y")
+# How often the parent checks on the chief and worker processes
+POLL_INTERVAL_S = 1.0
+# Seconds a search process gets to exit after SIGTERM before it is killed
+STOP_GRACE_S = 10.0
+
+
+class SeededHyperband(kt.Hyperband):
+    """Hyperband that reseeds TensorFlow from the trial id before each trial.
+
+    The chief oracle hands out trial ids and hyperparameters in a fixed
+    order, so seeding per trial makes results independent of which worker
+    happens to run a trial.
+    """
+
+    def run_trial(self, trial, *fit_args, **fit_kwargs):
+        tf.keras.utils.set_random_seed(TUNER_SEED + int(trial.trial_id))
+        return super().run_trial(trial, *fit_args, **fit_kwargs)
+
+
+def build_tuner(input_shape, overwrite=False, directory=TUNER_DIR):
+    """Create (or reload) the Hyperband tuner for the AegisNet hypermodel.
+
+    Args:
+        input_shape: Number of input features
+        overwrite: Discard existing oracle state in directory
+        directory: Parent directory of the oracle state
+
+    Returns:
+        SeededHyperband tuner
+    """
+    return SeededHyperband(
+        hypermodel=lambda hp: build_hypermodel(hp, input_shape=input_shape),
+        objective="val_accuracy",
+        max_epochs=10,
+        factor=3,
+        seed=TUNER_SEED,
+        directory=directory,
+        project_name=TUNER_PROJECT_NAME,
+        overwrite=overwrite,
+    )
+
+
+def search_callbacks():
+    """Callbacks shared by every search trial."""
+    # Stop a trial early if it stops improving
+    return [tf.keras.callbacks.EarlyStopping(monitor="val_loss", patience=3)]
+
+
+def limit_threads(num_threads):
+    """Cap TensorFlow's thread pools so parallel workers don't oversubscribe cores."""
+    tf.config.threading.set_intra_op_parallelism_threads(num_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(min(2, num_threads))
+
+
+def search_data_dir(directory=TUNER_DIR):
+    return os.path.join(directory, f"{TUNER_PROJECT_NAME}_search_data")
+
+
+def save_search_data(x, y, val_x, val_y, data_dir):
+    """Persist the scaled search subset so worker processes can memory-map it."""
+    os.makedirs(data_dir, exist_ok=True)
+    for name, array in zip(SEARCH_DATA_FILES, (x, y, val_x, val_y)):
+        np.save(os.path.join(data_dir, f"{name}.npy"), np.asarray(array))
+
+
+def load_search_data(data_dir):
+    x, y, val_x, val_y = (
+        np.load(os.path.join(data_dir, f"{name}.npy"), mmap_mode="r")
+        for name in SEARCH_DATA_FILES
+    )
+    return {"x": x, "y": y, "validation_data": (val_x, val_y)}
+
+
+def dataset_to_arrays(dataset):
+    """Materialize a (features, labels) tf.data pipeline into NumPy arrays."""
+    batches = list(dataset.as_numpy_iterator())
+    return (
+        np.concatenate([features for features, _ in batches]),
+        np.concatenate([labels for _, labels in batches]),
+    )
+
+
+def run_parallel_search(search_inputs, input_shape, num_workers, epochs=10, directory=TUNER_DIR):
+    """Run the Hyperband search with a local chief oracle and N worker processes.
+
+    The chief process serves the shared oracle state in directory over gRPC.
+    Each worker trains trials with intra-op threads limited to its share of
+    the CPU cores. If any process exits with an error, the others are stopped;
+    no child outlives this call.
+
+    Args:
+        search_inputs: fit() keyword arguments for the search (arrays or datasets)
+        input_shape: Number of input features
+        num_workers: Number of worker processes
+        epochs: Max epochs per trial
+        directory: Parent directory of the oracle state
+
+    Returns:
+        Tuner reloaded from the finished oracle state
+
+    Raises:
+        RuntimeError: If the chief or a worker exits with an error
+    """
+    print(f":: [HyperTuner] - Launching parallel search with {num_workers} workers... ::")
+    if "y" in search_inputs:
+        arrays = (
+            search_inputs["x"],
+            search_inputs["y"],
+            *search_inputs["validation_data"],
+        )
+    else:
+        arrays = (
+            *dataset_to_arrays(search_inputs["x"]),
+            *dataset_to_arrays(search_inputs["validation_data"]),
+        )
+    data_dir = search_data_dir(directory)
+    save_search_data(*arrays, data_dir)
+
+    # Start from a clean oracle so the chief and workers share fresh state
+    build_tuner(input_shape, overwrite=True, directory=directory)
+
+    threads = max(1, (os.cpu_count() or 1) // num_workers)
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    base_env = dict(
+        os.environ,
+        PYTHONPATH=os.pathsep.join(filter(None, [project_root, os.environ.get("PYTHONPATH")])),
+        KERASTUNER_ORACLE_IP="127.0.0.1",
+        KERASTUNER_ORACLE_PORT=str(TUNER_ORACLE_PORT),
+    )
+    command = [sys.executable, "-m", "src.hyper_tuner", data_dir, str(input_shape)]
+    options = [str(epochs), directory]
+
+    processes = {}
+    try:
+        processes["chief"] = subprocess.Popen(
+            command + ["1", *options], env=dict(base_env, KERASTUNER_TUNER_ID="chief")
+        )
+        for i in range(num_workers):
+            processes[f"tuner{i}"] = subprocess.Popen(
+                command + [str(threads), *options],
+                env=dict(base_env, KERASTUNER_TUNER_ID=f"tuner{i}"),
+            )
+        while True:
+            codes = {name: process.poll() for name, process in processes.items()}
+            failed = sorted(name for name, code in codes.items() if code not in (None, 0))
+            if failed:
+                raise RuntimeError(f"Hyperband search processes failed: {failed}")
+            if all(code == 0 for code in codes.values()):
+                break
+            time.sleep(POLL_INTERVAL_S)
+    finally:
+        stop_processes(processes.values())
+
+    print(":: [HyperTuner] - Parallel search complete. ::")
+    return build_tuner(input_shape, directory=directory)
+
+
+def stop_processes(processes, grace_s=STOP_GRACE_S):
+    """Terminate processes that are still running, kill any that linger, and reap all."""
+    processes = list(processes)
+    for process in processes:
+        if process.poll() is None:
+            process.terminate()
+    deadline = time.monotonic() + grace_s
+    for process in processes:
+        try:
+            process.wait(timeout=max(0.0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def run_search_process(data_dir, input_shape, num_threads, epochs, directory=TUNER_DIR):
+    """Entry point for one chief or worker process (configured via KERASTUNER_* env vars)."""
+    limit_threads(num_threads)
+    tf.config.experimental.enable_op_determinism()
+    tuner = build_tuner(input_shape, directory=directory)
+    tuner.search(**load_search_data(data_dir), epochs=epochs, callbacks=search_callbacks())
+
+
+if __name__ == "__main__":
+    # Usage: python -m src.hyper_tuner <data_dir> <input_shape> <threads> <epochs> [<tuner_dir>]
+    run_search_process(sys.argv[1], int(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4]), *sys.argv[5:6])
@@ -0,0 +1,446 @@
+# AegisNet Incremental Update Module
+
+import copy
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+from src.config import (
+    TARGET_COLUMN,
+    TOP_FEATURES,
+    CLASSIFICATION_THRESHOLD,
+    FEATURE_CACHE_DIR,
+    MODEL_REGISTRY_DIR,
+    TFLITE_REPORT_PATH,
+    INCREMENTAL_HOLDOUT,
+    INCREMENTAL_EARLY_STOP_SHARE,
+    INCREMENTAL_REPLAY_RATIO,
+    INCREMENTAL_MIN_REPLAY_ROWS,
+    INCREMENTAL_VALIDATION_ROWS,
+    INCREMENTAL_EPOCHS,
+    INCREMENTAL_BATCH_SIZE,
+    INCREMENTAL_LEARNING_RATE,
+    INCREMENTAL_MAX_RECALL_DROP,
+    INCREMENTAL_MAX_FPR_RISE,
+    INCREMENTAL_REPORT_PATH,
+    CASCADE_ENABLED,
+    CASCADE_CALIBRATION_ROWS,
+)
+from src.cascade import CascadeScorer, PreFilter, tune_cutoff
+from src.data_pipeline import split_indices
+from src.data_preprocessor import sanitize_data
+from src.feature_cache import open_cache, read_manifest
+from src.feature_transform import scaling_params, transform
+from src.inference_engine import KerasScorer, _import_load_model, export_fused_model
+from src.input_formats import read_feature_chunks
+from src.model_evaluator import confusion_at, roc_auc, sweep_thresholds
+from src.model_registry import ARTIFACT_NAMES, list_versions, publish_version, resolve_version
+from src.quantizer import draw_rows, export_quantized_model
+
+
+def load_labeled_batch(paths):
+    """Read and sanitize newly labeled flows with the training cleaning rules.
+
+    Args:
+        paths: CSV files (plain, .gz or .zst) with the TOP_FEATURES columns
+            and a Label column
+
+    Returns:
+        Tuple of (X DataFrame of TOP_FEATURES, y array with 1 = ATTACK)
+
+    Raises:
+        ValueError: If an input has no labels or no rows survive cleaning
+    """
+    frames = []
+    for path in paths:
+        for chunk in read_feature_chunks(path, all_columns=True):
+            if not isinstance(chunk, pd.DataFrame) or TARGET_COLUMN not in chunk.columns:
+                raise ValueError(f"{path}: labeled batches must be CSV files with a '{TARGET_COLUMN}' column")
+            frames.append(chunk)
+    if not frames:
+        raise ValueError("The labeled batch contains no rows")
+    X, y = sanitize_data(pd.concat(frames, ignore_index=True))
+    if len(X) == 0:
+        raise ValueError("No labeled rows are left after removing rows with inf/NaN values")
+    return X[TOP_FEATURES], y
+
+
+def update_scaler(scaler, X):
+    """Fold new rows into a copy of the scaler's running mean and variance.
+
+    Args:
+        scaler: Fitted StandardScaler of the current version
+        X: New unscaled training rows
+
+    Returns:
+        Updated StandardScaler (the original is left untouched)
+    """
+    updated = copy.deepcopy(scaler)
+    updated.partial_fit(np.asarray(X, dtype=np.float64))
+    return updated
+
+
+def compensate_first_layer(model, old_scaler, new_scaler):
+    """Rewrite the first Dense layer so the model is unchanged under the new scaler.
+
+    With z_old = (x - m0) / s0 and z_new = (x - m1) / s1,
+    z_old = z_new * (s1 / s0) + (m1 - m0) / s0, so
+    z_old @ W + b == z_new @ (W * (s1 / s0)) + (b + ((m1 - m0) / s0) @ W).
+    Fine-tuning then starts from the current decision function exactly.
+
+    Args:
+        model: Keras model trained on old_scaler's outputs (modified in place)
+        old_scaler: StandardScaler the model was trained with
+        new_scaler: Updated StandardScaler it will be served with
+    """
+    layer = next(layer for layer in model.layers if type(layer).__name__ == "Dense")
+    W, b = layer.get_weights()
+    old_mul, old_add = (p.astype(np.float64) for p in scaling_params(old_scaler))
+    new_mul, new_add = (p.astype(np.float64) for p in scaling_params(new_scaler))
+    # In multiply-add form: z = x * mul + add
+    ratio = old_mul / new_mul
+    shift = old_add - new_add * ratio
+    layer.set_weights([
+        (W * ratio[:, None]).astype(W.dtype),
+        (b + shift @ W).astype(b.dtype),
+    ])
+
+
+def retune_prefilter(prefilter, X_new, y_new, X_history, y_history):
+    """Copy of the parent's pre-filter with its cutoff re-tuned for the new rows.
+
+    The tree was fitted before the new campaign existed, so its old cutoff
+    may clear the campaign's flows before the DNN sees them. The cutoff is
+    re-tuned on the new training rows and on historical calibration rows
+    separately, and the lower of the two is kept, so each set alone stays
+    within CASCADE_MAX_MISS_RATE.
+
+    Args:
+        prefilter: Parent PreFilter
+        X_new, y_new: New training rows (unscaled)
+        X_history, y_history: Cached calibration rows (unscaled)
+
+    Returns:
+        New PreFilter (the parent's is left untouched)
+    """
+    updated = copy.deepcopy(prefilter)
+    updated.cutoff = min(
+        tune_cutoff(prefilter.score(X_new), y_new),
+        tune_cutoff(prefilter.score(X_history), y_history),
+    )
+    return updated
+
+
+def _split_batch(X, y, test_size, seed):
+    """Stratified split of labeled rows (plain split if a class has under two rows)."""
+    counts = np.bincount(y, minlength=2)
+    stratify = y if counts.min() >= 2 else None
+    return train_test_split(X, y, test_size=test_size, random_state=seed, stratify=stratify)
+
+
+def decision_summary(y, probabilities, threshold=CLASSIFICATION_THRESHOLD):
+    """Confusion matrix, recall and false-positive rate at the production threshold.
+
+    roc_auc is None when the rows hold a single class, as a new-batch
+    hold-out that is all ATTACK often does.
+    """
+    sweep = sweep_thresholds(y, probabilities)
+    counts = confusion_at(sweep, threshold)
+    return {
+        "confusion_matrix": [[counts["tn"], counts["fp"]], [counts["fn"], counts["tp"]]],
+        "recall": counts["recall"],
+        "fpr": counts["fpr"],
+        "errors": counts["fp"] + counts["fn"],
+        "roc_auc": roc_auc(sweep),
+    }
+
+
+def validate_update(reference, candidate, history, new_holdout, threshold=CLASSIFICATION_THRESHOLD):
+    """Compare the current and updated models on held-out rows neither was tuned on.
+
+    The rows must not overlap the early-stopping set; pass the scorers that
+    serve traffic (cascade included when it is enabled).
+
+    The update passes if, on historical test rows, recall drops by at most
+    INCREMENTAL_MAX_RECALL_DROP and the false-positive rate rises by at most
+    INCREMENTAL_MAX_FPR_RISE, and it makes no more mistakes than the current
+    model on the held-out part of the new batch.
+
+    Args:
+        reference: Scorer of the current version
+        candidate: Scorer of the updated model
+        history: (X, y) sample of the cached test split
+        new_holdout: (X, y) held out from the new batch
+        threshold: Production threshold
+
+    Returns:
+        Dict with per-set summaries for both models, the deltas and passed
+    """
+    report = {"threshold": threshold}
+    for name, (X, y) in (("history", history), ("new", new_holdout)):
+        report[name] = {
+            "rows": len(y),
+            "current": decision_summary(y, reference.predict(X).ravel(), threshold),
+            "updated": decision_summary(y, candidate.predict(X).ravel(), threshold),
+        }
+    current, updated = report["history"]["current"], report["history"]["updated"]
+    report["recall_delta"] = updated["recall"] - current["recall"]
+    report["fpr_delta"] = updated["fpr"] - current["fpr"]
+    report["new_errors_delta"] = report["new"]["updated"]["errors"] - report["new"]["current"]["errors"]
+    report["passed"] = (
+        report["recall_delta"] >= -INCREMENTAL_MAX_RECALL_DROP
+        and report["fpr_delta"] <= INCREMENTAL_MAX_FPR_RISE
+        and report["new_errors_delta"] <= 0
+    )
+    return report
+
+
+def _version_metadata(version, registry_dir):
+    for manifest in list_versions(registry_dir):
+        if manifest["version"] == version:
+            return manifest.get("metadata", {})
+    return {}
+
+
+def _print_summary(name, report):
+    current, updated = report["current"], report["updated"]
+    print(
+        f"-- {name} ({report['rows']} rows): recall {current['recall']:.4%} -> {updated['recall']:.4%}, "
+        f"FPR {current['fpr']:.4%} -> {updated['fpr']:.4%}, errors {current['errors']} -> {updated['errors']}"
+    )
+
+
+def incremental_update(
+    batch_paths,
+    version=None,
+    epochs=INCREMENTAL_EPOCHS,
+    cache_dir=FEATURE_CACHE_DIR,
+    registry_dir=MODEL_REGISTRY_DIR,
+    report_path=INCREMENTAL_REPORT_PATH,
+    publish=True,
+    seed=42,
+):
+    """Fine-tune a published model on newly labeled flows and publish it if it validates.
+
+    The current model is warm-started rather than re-searched: the scaler's
+    running moments absorb the new rows (with the first layer compensated so
+    the starting point is unchanged), then a few low-learning-rate epochs run
+    over the new rows mixed with a replay sample of cached historical
+    training rows, which keeps the model from forgetting older traffic.
+    A parent's cascade keeps its tree but gets a re-tuned cutoff (see
+    retune_prefilter).
+
+    Args:
+        batch_paths: Labeled CSV files (see load_labeled_batch)
+        version: Registry version to start from (None = CURRENT)
+        epochs: Fine-tuning epochs
+        cache_dir: Feature cache holding the historical rows
+        registry_dir: Model registry root
+        report_path: Destination JSON path for the update report
+        publish: Publish (and activate) the updated model if it passes validation
+        seed: Seed for the batch split, replay sample and weight updates
+
+    Returns:
+        Update report dict (its "version" is the published version, or None)
+    """
+    import tensorflow as tf
+
+    started = time.perf_counter()
+    tf.keras.utils.set_random_seed(seed)
+    print(":: [IncrementalUpdater] - Loading labeled batch and current model... ::")
+    manifest = read_manifest(cache_dir)
+    if manifest is None:
+        raise FileNotFoundError("No feature cache found. Run main.py once to build it.")
+    X_new, y_new = load_labeled_batch(batch_paths)
+    parent, _, paths = resolve_version(version, "keras", registry_dir)
+    load_model = _import_load_model()
+    reference_model = load_model(paths["model_path"])
+    model = load_model(paths["model_path"])
+    old_scaler = joblib.load(paths["scaler_path"])
+    print(f"-- Warm start from version {parent}")
+
+    # Three disjoint parts: training, early stopping and the validation hold-out
+    held_out = INCREMENTAL_HOLDOUT + INCREMENTAL_EARLY_STOP_SHARE
+    X_fit, X_rest, y_fit, y_rest = _split_batch(X_new, y_new, held_out, seed)
+    X_stop, X_hold, y_stop, y_hold = _split_batch(X_rest, y_rest, INCREMENTAL_HOLDOUT / held_out, seed)
+    print(
+        f"-- New rows: {len(X_fit)} for training, {len(X_stop)} for early stopping, {len(X_hold)} held out "
+        f"({int(np.count_nonzero(y_new))} ATTACK in total)"
+    )
+
+    X_cached, y_cached = open_cache(manifest, cache_dir)
+    train_idx, test_idx = split_indices(y_cached)
+    n_replay = max(INCREMENTAL_MIN_REPLAY_ROWS, int(INCREMENTAL_REPLAY_RATIO * len(X_fit)))
+    replay_idx = draw_rows(train_idx, n_replay, seed)
+    # Cached test rows for early stopping and for validation, disjoint as well
+    n_stop = min(max(len(X_stop), 10000), len(test_idx) // 2)
+    picked = np.random.default_rng(seed).permutation(test_idx)[:n_stop + INCREMENTAL_VALIDATION_ROWS]
+    stop_idx, history_idx = np.sort(picked[:n_stop]), np.sort(picked[n_stop:])
+    X_replay = transform(X_cached.iloc[replay_idx], sanitize=False)
+    X_history = transform(X_cached.iloc[history_idx], sanitize=False)
+    y_replay = np.asarray(y_cached[replay_idx])
+    y_history = np.asarray(y_cached[history_idx])
+    print(f"-- Replaying {len(replay_idx)} cached training rows; validating on {len(history_idx)} cached test rows")
+
+    print(":: [IncrementalUpdater] - Updating scaler statistics... ::")
+    scaler = update_scaler(old_scaler, transform(X_fit, sanitize=False))
+    compensate_first_layer(model, old_scaler, scaler)
+    scaling = scaling_params(scaler)
+
+    print(f":: [IncrementalUpdater] - Fine-tuning for up to {epochs} epoch(s)... ::")
+    X_train = np.concatenate([
+        transform(X_fit, scaling, sanitize=False),
+        transform(X_replay, scaling, sanitize=False),
+    ])
+    y_train = np.concatenate([y_fit, y_replay]).astype(np.float32)
+    # Early stopping watches new and historical rows that validation never sees
+    X_watch = np.concatenate([
+        transform(X_stop, scaling, sanitize=False),
+        transform(X_cached.iloc[stop_idx], scaling, sanitize=False),
+    ])
+    y_watch = np.concatenate([y_stop, np.asarray(y_cached[stop_idx])]).astype(np.float32)
+    model.compile(
+        optimizer=tf.keras.optimizers.Adam(learning_rate=INCREMENTAL_LEARNING_RATE),
+        loss="binary_crossentropy",
+        metrics=["accuracy"],
+    )
+    fit_history = model.fit(
+        X_train,
+        y_train,
+        validation_data=(X_watch, y_watch),
+        epochs=epochs,
+        batch_size=INCREMENTAL_BATCH_SIZE,
+        shuffle=True,
+        callbacks=[tf.keras.callbacks.EarlyStopping(monitor="val_loss", patience=2, restore_best_weights=True)],
+        verbose=2,
+    )
+
+    reference = KerasScorer(reference_model, old_scaler)
+    candidate = KerasScorer(model, scaler)
+    parent_prefilter = prefilter = None
+    if os.path.exists(paths["cascade_path"]):
+        print(":: [IncrementalUpdater] - Re-tuning the cascade cutoff... ::")
+        parent_prefilter = PreFilter.load(paths["cascade_path"])
+        calibration_rows = min(CASCADE_CALIBRATION_ROWS, len(train_idx) // 5)
+        # train_cascade's calibration rows, which the tree was not fitted on
+        calibration_idx = draw_rows(train_idx[:calibration_rows], n_replay, seed)
+        prefilter = retune_prefilter(
+            parent_prefilter,
+            transform(X_fit, sanitize=False),
+            y_fit,
+            transform(X_cached.iloc[calibration_idx], sanitize=False),
+            np.asarray(y_cached[calibration_idx]),
+        )
+        print(f"-- Cutoff {parent_prefilter.cutoff:.6f} -> {prefilter.cutoff:.6f}")
+        if CASCADE_ENABLED:
+            # Validate what actually serves traffic
+            reference = CascadeScorer(parent_prefilter, reference)
+            candidate = CascadeScorer(prefilter, candidate)
+
+    print(":: [IncrementalUpdater] - Validating against held-out rows... ::")
+    validation = validate_update(
+        reference, candidate, (X_history, y_history), (transform(X_hold, sanitize=False), y_hold)
+    )
+    _print_summary("Historical test rows", validation["history"])
+    _print_summary("New held-out rows", validation["new"])
+    print("-- Historical confusion matrix (current -> updated):")
+    print(np.array(validation["history"]["current"]["confusion_matrix"]))
+    print(np.array(validation["history"]["updated"]["confusion_matrix"]))
+
+    report = {
+        "parent": parent,
+        "batches": [os.path.abspath(path) for path in batch_paths],
+        "new_rows": len(X_new),
+        "new_training_rows": len(X_fit),
+        "replay_rows": len(replay_idx),
+        "epochs_run": len(fit_history.history["loss"]),
+        "cascade": None if prefilter is None else {
+            "parent_cutoff": parent_prefilter.cutoff,
+            "cutoff": prefilter.cutoff,
+            "validated": CASCADE_ENABLED,
+        },
+        "validation": validation,
+        "version": None,
+    }
+
+    if validation["passed"] and publish:
+        print(":: [IncrementalUpdater] - Validation PASSED, publishing... ::")
+        report["version"] = _publish_update(
+            model, scaler, prefilter, paths, parent, registry_dir, report, X_cached, y_cached, train_idx, test_idx,
+            X_check=X_history[:4096],
+        )
+    elif validation["passed"]:
+        print("-- Validation PASSED (not published)")
+    else:
+        print(
+            f"-- Validation FAILED (limits: recall drop {INCREMENTAL_MAX_RECALL_DROP}, FPR rise "
+            f"{INCREMENTAL_MAX_FPR_RISE}, no extra errors on new rows); version {parent} stays current"
+        )
+
+    report["seconds"] = time.perf_counter() - started
+    os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"-- Update report saved to {report_path} ({report['seconds']:.1f}s)")
+    return report
+
+
+def _publish_update(model, scaler, prefilter, paths, parent, registry_dir, report, X, y, train_idx, test_idx,
+                    X_check):
+    """Write the updated artifacts to a scratch directory and publish them as a new version."""
+    work_dir = tempfile.mkdtemp(prefix="aegisnet_update_")
+    try:
+        staged = {key: os.path.join(work_dir, name) for key, name in ARTIFACT_NAMES.items()}
+        model.save(staged["model_path"])
+        joblib.dump(scaler, staged["scaler_path"])
+        export_fused_model(model, scaler, staged["fused_path"], X_check=X_check)
+        metadata = _version_metadata(parent, registry_dir)
+        if prefilter is not None:
+            prefilter.save(staged["cascade_path"])
+            metadata["cascade"] = report["cascade"]
+        else:
+            metadata.pop("cascade", None)
+        if os.path.exists(paths["tflite_path"]):
+            # Re-quantize only when the parent served a TFLite export
+            os.makedirs(os.path.dirname(TFLITE_REPORT_PATH) or ".", exist_ok=True)
+            tflite_report = export_quantized_model(
+                model, scaler, X, y, train_idx, test_idx,
+                output_path=staged["tflite_path"], report_path=TFLITE_REPORT_PATH,
+            )
+            metadata["tflite"] = {
+                "mode": tflite_report["mode"],
+                "passed": tflite_report["passed"],
+                "flip_rate": tflite_report["decision_flips"]["rate"],
+            }
+        else:
+            metadata.pop("tflite", None)
+        history = report["validation"]["history"]["updated"]
+        metadata.update(
+            roc_auc=history["roc_auc"],
+            threshold=CLASSIFICATION_THRESHOLD,
+            incremental={
+                "parent": parent,
+                "new_rows": report["new_rows"],
+                "replay_rows": report["replay_rows"],
+                "recall_delta": report["validation"]["recall_delta"],
+                "fpr_delta": report["validation"]["fpr_delta"],
+            },
+        )
+        return publish_version(
+            model_path=staged["model_path"],
+            scaler_path=staged["scaler_path"],
+            fused_path=staged["fused_path"],
+            tflite_path=staged["tflite_path"],
+            cascade_path=staged["cascade_path"],
+            registry_dir=registry_dir,
+            metadata=metadata,
+        )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
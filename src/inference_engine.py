@@ -0,0 +1,396 @@
+# AegisNet Inference Engine Module
+
+import threading
+import warnings
+
+import numpy as np
+import pandas as pd
+import joblib
+
+from src.config import (
+    MODEL_PATH,
+    SCALER_SAVE_PATH,
+    FUSED_MODEL_PATH,
+    TFLITE_MODEL_PATH,
+    TFLITE_NUM_THREADS,
+    INFERENCE_BACKEND,
+    CASCADE_ENABLED,
+    CASCADE_MODEL_PATH,
+)
+from src.cascade import CascadeScorer, PreFilter
+from src.feature_transform import scaling_params, transform
+
+
+def _import_load_model():
+    """Import Keras' load_model lazily so the NumPy backend never pulls in TensorFlow."""
+    try:
+        from tensorflow.keras.models import load_model
+    except Exception:
+        try:
+            from keras.models import load_model
+        except Exception:
+            raise ImportError(
+                "Could not import 'load_model' from 'tensorflow.keras' or 'keras'. Please install 'tensorflow' or 'keras' in your environment."
+            )
+    return load_model
+
+
+def _import_interpreter():
+    """Import a TFLite interpreter: the standalone LiteRT runtime if installed, else TensorFlow's."""
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except Exception:
+        try:
+            import tensorflow as tf
+
+            Interpreter = tf.lite.Interpreter
+        except Exception:
+            raise ImportError(
+                "Could not import a TFLite interpreter. Please install 'ai-edge-litert' or 'tensorflow' in your environment."
+            )
+    return Interpreter
+
+
+def load_interpreter(path, num_threads=TFLITE_NUM_THREADS):
+    """Open a .tflite model with the available interpreter."""
+    Interpreter = _import_interpreter()
+    with warnings.catch_warnings():
+        # TensorFlow's bundled interpreter warns that it moved to ai_edge_litert
+        warnings.simplefilter("ignore", UserWarning)
+        return Interpreter(model_path=path, num_threads=num_threads)
+
+
+def configure_worker_threads(intra_op, inter_op, backend=INFERENCE_BACKEND):
+    """
+    Cap the math thread pools of the current (freshly started) worker process.
+
+    Args:
+        intra_op: Threads for a single op / BLAS call
+        inter_op: TensorFlow threads running independent ops concurrently
+        backend: Inference backend the worker will load
+    """
+    from threadpoolctl import threadpool_limits
+
+    threadpool_limits(limits=intra_op)
+    if backend == "keras":
+        # Must run before TensorFlow executes its first op in this process
+        import tensorflow as tf
+
+        tf.config.threading.set_intra_op_parallelism_threads(intra_op)
+        tf.config.threading.set_inter_op_parallelism_threads(inter_op)
+
+
+def _relu(x):
+    return np.maximum(x, 0, out=x)
+
+
+def _sigmoid(x):
+    # Clip before exp to avoid overflow warnings on very confident logits
+    np.clip(x, -88.0, 88.0, out=x)
+    np.negative(x, out=x)
+    np.exp(x, out=x)
+    x += 1.0
+    return np.reciprocal(x, out=x)
+
+
+def _linear(x):
+    return x
+
+
+ACTIVATIONS = {"relu": _relu, "sigmoid": _sigmoid, "linear": _linear}
+
+
+class KerasScorer:
+    """Scores cleaned feature rows with the saved Keras model and scaler."""
+
+    backend = "keras"
+
+    def __init__(self, model, scaler):
+        self.model = model
+        self.scaler = scaler
+        self.scaling = scaling_params(scaler)
+
+    @classmethod
+    def load(cls, model_path=MODEL_PATH, scaler_path=SCALER_SAVE_PATH):
+        load_model = _import_load_model()
+        return cls(load_model(model_path), joblib.load(scaler_path))
+
+    def predict(self, X):
+        """Return attack probabilities of shape (n, 1) for unscaled features."""
+        return self.model.predict(transform(X, self.scaling, sanitize=False), verbose=0)
+
+    def input_importances(self):
+        """Absolute first-layer weights summed over units, one value per feature."""
+        for layer in getattr(self.model, "layers", []):
+            weights = layer.get_weights()
+            if weights:
+                return np.sum(np.abs(weights[0]), axis=1)
+        return None
+
+
+class TFLiteScorer:
+    """Scores cleaned feature rows with a (quantized) TFLite export of the model.
+
+    The interpreter is not thread-safe, so calls are serialized; its input is
+    resized to each batch's row count (a few microseconds).
+    """
+
+    backend = "tflite"
+
+    def __init__(self, interpreter, scaler):
+        self.interpreter = interpreter
+        self.scaler = scaler
+        self.scaling = scaling_params(scaler)
+        self._input_index = interpreter.get_input_details()[0]["index"]
+        self._output_index = interpreter.get_output_details()[0]["index"]
+        self._batch_rows = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, tflite_path=TFLITE_MODEL_PATH, scaler_path=SCALER_SAVE_PATH):
+        return cls(load_interpreter(tflite_path), joblib.load(scaler_path))
+
+    def predict(self, X):
+        """Return attack probabilities of shape (n, 1) for unscaled features."""
+        if len(X) == 0:
+            return np.empty((0, 1), dtype=np.float32)
+        rows = transform(X, self.scaling, sanitize=False)
+        with self._lock:
+            if rows.shape[0] != self._batch_rows:
+                self.interpreter.resize_tensor_input(self._input_index, rows.shape)
+                self.interpreter.allocate_tensors()
+                self._batch_rows = rows.shape[0]
+            self.interpreter.set_tensor(self._input_index, rows)
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self._output_index).copy()
+
+    def input_importances(self):
+        """Not recoverable from the flatbuffer; feature insights are omitted."""
+        return None
+
+
+class FusedMLP:
+    """Pure-NumPy forward pass over a scaler-folded Dense stack.
+
+    The StandardScaler is folded into the first layer and Dropout layers are
+    removed, so raw (cleaned) feature rows go straight into the matmuls.
+    """
+
+    backend = "numpy"
+
+    def __init__(self, weights, biases, activations, importances=None):
+        self.weights = [np.ascontiguousarray(W, dtype=np.float32) for W in weights]
+        self.biases = [np.ascontiguousarray(b, dtype=np.float32) for b in biases]
+        self.activations = [ACTIVATIONS[name] for name in activations]
+        self.activation_names = list(activations)
+        self.importances = importances
+
+    @classmethod
+    def load(cls, path=FUSED_MODEL_PATH):
+        with np.load(path, allow_pickle=False) as artifact:
+            n_layers = int(artifact["n_layers"])
+            weights = [artifact[f"W_{i}"] for i in range(n_layers)]
+            biases = [artifact[f"b_{i}"] for i in range(n_layers)]
+            activations = [str(name) for name in artifact["activations"]]
+            importances = artifact["importances"]
+        return cls(weights, biases, activations, importances)
+
+    def save(self, path=FUSED_MODEL_PATH):
+        arrays = {}
+        for i, (W, b) in enumerate(zip(self.weights, self.biases)):
+            arrays[f"W_{i}"] = W
+            arrays[f"b_{i}"] = b
+        np.savez(
+            path,
+            n_layers=np.int64(len(self.weights)),
+            activations=np.array(self.activation_names),
+            importances=self.importances,
+            **arrays,
+        )
+
+    def predict(self, X):
+        """Return attack probabilities of shape (n, 1) for unscaled features."""
+        h = np.asarray(X, dtype=np.float32)
+        for W, b, activation in zip(self.weights, self.biases, self.activations):
+            h = h @ W
+            h += b
+            h = activation(h)
+        return h
+
+    def input_importances(self):
+        """Absolute first-layer weights (before folding) summed over units."""
+        return self.importances
+
+
+def fuse_model(model, scaler):
+    """Fold the scaler into the first Dense layer and drop Dropout layers.
+
+    Args:
+        model: Trained Keras Sequential model of Dense/Dropout layers
+        scaler: Fitted StandardScaler used during training
+
+    Returns:
+        FusedMLP equivalent to model.predict(scaler.transform(X))
+    """
+    weights, biases, activations = [], [], []
+    importances = None
+    for layer in model.layers:
+        layer_type = type(layer).__name__
+        if layer_type == "Dropout":
+            continue
+        if layer_type != "Dense":
+            raise ValueError(f"Unsupported layer for fused export: {layer_type}")
+        activation = layer.get_config()["activation"]
+        if activation not in ACTIVATIONS:
+            raise ValueError(f"Unsupported activation for fused export: {activation}")
+        W, b = layer.get_weights()
+        if importances is None:
+            importances = np.sum(np.abs(W), axis=1)
+        weights.append(W.astype(np.float64))
+        biases.append(b.astype(np.float64))
+        activations.append(activation)
+
+    # (x - mean) / scale @ W + b  ==  x @ (W / scale) + (b - (mean / scale) @ W)
+    n_features = weights[0].shape[0]
+    mean = scaler.mean_ if scaler.mean_ is not None else np.zeros(n_features)
+    scale = scaler.scale_ if scaler.scale_ is not None else np.ones(n_features)
+    biases[0] = biases[0] - (mean / scale) @ weights[0]
+    weights[0] = weights[0] / scale[:, None]
+
+    return FusedMLP(weights, biases, activations, importances)
+
+
+def check_parity(fused, model, scaler, X_check=None, atol=1e-4):
+    """Compare fused NumPy probabilities against the Keras model.
+
+    Args:
+        fused: FusedMLP instance
+        model: Source Keras model
+        scaler: Source StandardScaler
+        X_check: Optional unscaled rows; defaults to samples drawn around the scaler mean
+        atol: Maximum tolerated absolute probability difference
+
+    Returns:
+        Maximum absolute probability difference
+    """
+    if X_check is None:
+        rng = np.random.default_rng(42)
+        X_check = scaler.mean_ + scaler.scale_ * rng.standard_normal(
+            (4096, len(scaler.mean_))
+        )
+    expected = KerasScorer(model, scaler).predict(X_check)
+    actual = fused.predict(X_check)
+    max_delta = float(np.max(np.abs(expected - actual)))
+    if max_delta > atol:
+        raise ValueError(
+            f"Fused engine parity check failed: max |delta p| = {max_delta:.2e} > {atol:.0e}"
+        )
+    return max_delta
+
+
+def export_fused_model(model, scaler, output_path=FUSED_MODEL_PATH, X_check=None):
+    """Export a Keras model + scaler pair to the fused NumPy engine format.
+
+    Args:
+        model: Trained Keras model
+        scaler: Fitted StandardScaler
+        output_path: Destination .npz path
+        X_check: Optional unscaled rows for the parity check
+
+    Returns:
+        FusedMLP instance that was saved
+    """
+    print(":: [InferenceEngine] - Fusing scaler into model weights... ::")
+    fused = fuse_model(model, scaler)
+    max_delta = check_parity(fused, model, scaler, X_check)
+    print(f"-- Parity check passed (max |delta p| = {max_delta:.2e})")
+    fused.save(output_path)
+    print(f"-- Fused engine saved to {output_path}")
+    return fused
+
+
+def deduplicate_rows(X):
+    """Find the distinct feature rows of a batch.
+
+    Rows are hashed column-wise to 64 bits and factorized, then every row is
+    compared with its representative; on a hash collision the exact (slower)
+    np.unique over the raw row bytes is used instead.
+
+    Args:
+        X: Cleaned feature DataFrame or 2-D array
+
+    Returns:
+        Tuple of (first, inverse): index of one representative row per
+        distinct row, and for each row the position of its representative
+        in first
+    """
+    frame = X if isinstance(X, pd.DataFrame) else pd.DataFrame(X)
+    values = frame.to_numpy()
+    codes, uniques = pd.factorize(pd.util.hash_pandas_object(frame, index=False).to_numpy())
+    first = np.empty(len(uniques), dtype=np.int64)
+    # Reversed assignment leaves the first occurrence of each code
+    first[codes[::-1]] = np.arange(len(codes) - 1, -1, -1)
+    if np.array_equal(values[first][codes], values):
+        return first, codes
+
+    rows = np.ascontiguousarray(values)
+    rows = rows.view(np.dtype((np.void, rows.dtype.itemsize * rows.shape[1]))).ravel()
+    _, first, inverse = np.unique(rows, return_index=True, return_inverse=True)
+    return first, inverse.ravel()
+
+
+def predict_deduplicated(scorer, X):
+    """Score only the distinct rows of X and scatter probabilities back.
+
+    Args:
+        scorer: Object exposing predict(X) on cleaned, unscaled features
+        X: Cleaned feature DataFrame or 2-D array
+
+    Returns:
+        Tuple of (probabilities of shape (n, 1) in the original row order,
+        number of distinct rows scored)
+    """
+    if len(X) == 0:
+        return scorer.predict(X), 0
+    first, inverse = deduplicate_rows(X)
+    unique_X = X.iloc[first] if isinstance(X, pd.DataFrame) else np.asarray(X)[first]
+    return scorer.predict(unique_X)[inverse], len(first)
+
+
+def load_scorer(
+    backend=INFERENCE_BACKEND,
+    model_path=MODEL_PATH,
+    scaler_path=SCALER_SAVE_PATH,
+    fused_path=FUSED_MODEL_PATH,
+    tflite_path=TFLITE_MODEL_PATH,
+    cascade_path=CASCADE_MODEL_PATH,
+    cascade=CASCADE_ENABLED,
+):
+    """Load the configured inference backend.
+
+    Args:
+        backend: "keras" for the saved Keras model + scaler, "numpy" for the fused engine,
+            "tflite" for the quantized TFLite export + scaler
+        model_path, scaler_path, fused_path, tflite_path, cascade_path: Artifact
+            locations (e.g. a registry version)
+        cascade: Put the pre-filter from cascade_path in front of the DNN
+
+    Returns:
+        Scorer exposing predict(X) on cleaned, unscaled features
+    """
+    if backend == "keras":
+        scorer = KerasScorer.load(model_path, scaler_path)
+    elif backend == "numpy":
+        scorer = FusedMLP.load(fused_path)
+    elif backend == "tflite":
+        scorer = TFLiteScorer.load(tflite_path, scaler_path)
+    else:
+        raise ValueError(f"Unknown inference backend: {backend}")
+    if cascade:
+        scorer = CascadeScorer(PreFilter.load(cascade_path), scorer)
+    return scorer
+
+
+if __name__ == "__main__":
+    load_model = _import_load_model()
+    export_fused_model(load_model(MODEL_PATH), joblib.load(SCALER_SAVE_PATH))
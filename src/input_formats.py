@@ -0,0 +1,338 @@
+# AegisNet Input Formats Module
+
+import gzip
+import os
+import shutil
+import sys
+import zipfile
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from src.config import TOP_FEATURES, PREDICT_CHUNK_SIZE
+from src.data_loader import count_data_rows
+from src.feature_transform import column_map, transform
+
+# Leading bytes of each supported format; anything else is parsed as plain CSV
+MAGIC_BYTES = (
+    (b"\x1f\x8b", "csv.gz"),
+    (b"\x28\xb5\x2f\xfd", "csv.zst"),
+    (b"\x93NUMPY", "npy"),
+    (b"PK\x03\x04", "npz"),
+    (b"ARROW1", "arrow"),
+    (b"\xff\xff\xff\xff", "arrow_stream"),
+)
+INPUT_FORMATS = ("csv", "csv.gz", "csv.zst", "npy", "npz", "arrow", "arrow_stream")
+# Formats carrying TOP_FEATURES as numbers (no text parsing)
+BINARY_FORMATS = ("npy", "npz", "arrow", "arrow_stream")
+# File name endings picked up when predictor.py is given a directory
+INPUT_EXTENSIONS = (".csv", ".csv.gz", ".csv.zst", ".npy", ".npz", ".arrow", ".arrows", ".feather")
+
+
+def _import_zstd():
+    """Import the zstandard package lazily (only zstd-compressed inputs need it)."""
+    try:
+        import zstandard
+    except Exception:
+        raise ImportError(
+            "Could not import 'zstandard'. Please install 'zstandard' to read .csv.zst inputs."
+        )
+    return zstandard
+
+
+def _import_pyarrow():
+    """Import pyarrow lazily (only Arrow IPC inputs need it)."""
+    try:
+        import pyarrow
+        import pyarrow.ipc
+    except Exception:
+        raise ImportError("Could not import 'pyarrow'. Please install 'pyarrow' to read Arrow IPC inputs.")
+    return pyarrow
+
+
+@contextmanager
+def _binary_stream(source):
+    """Binary file object for a path (opened and closed here) or an upload (left open)."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            yield f
+    else:
+        yield getattr(source, "stream", source)
+
+
+def detect_format(source):
+    """Identify an input by its leading bytes.
+
+    Args:
+        source: Path or seekable binary file object (rewound afterwards)
+
+    Returns:
+        One of INPUT_FORMATS
+    """
+    with _binary_stream(source) as stream:
+        start = stream.tell()
+        head = stream.read(8)
+        stream.seek(start)
+    for magic, input_format in MAGIC_BYTES:
+        if head.startswith(magic):
+            return input_format
+    return "csv"
+
+
+def input_stem(path):
+    """File name without its input extension (flows.csv.gz -> flows)."""
+    name = os.path.basename(path)
+    for extension in sorted(INPUT_EXTENSIONS, key=len, reverse=True):
+        if name.lower().endswith(extension):
+            return name[: -len(extension)]
+    return os.path.splitext(name)[0]
+
+
+def _read_exact(stream, n_bytes):
+    """Read up to n_bytes, looping over short reads from decompressing streams."""
+    parts = []
+    while n_bytes > 0:
+        part = stream.read(n_bytes)
+        if not part:
+            break
+        parts.append(part)
+        n_bytes -= len(part)
+    return b"".join(parts)
+
+
+def _read_npy_header(stream):
+    """Shape, dtype and Fortran-order flag of a .npy stream, leaving it positioned at the data."""
+    version = np.lib.format.read_magic(stream)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+    else:
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+    if dtype.hasobject or dtype.names is not None:
+        raise ValueError("Binary uploads must hold numeric arrays")
+    return shape, dtype, fortran_order
+
+
+def _npy_blocks(stream, n_rows, row_shape, dtype, chunk_size):
+    row_bytes = dtype.itemsize * int(np.prod(row_shape, dtype=np.int64))
+    for start in range(0, n_rows, chunk_size):
+        rows = min(chunk_size, n_rows - start)
+        data = _read_exact(stream, rows * row_bytes)
+        if len(data) != rows * row_bytes:
+            raise ValueError("Binary upload is truncated")
+        yield np.frombuffer(data, dtype=dtype).reshape((rows,) + tuple(row_shape))
+
+
+def _npy_fortran_blocks(stream, n_rows, n_columns, dtype, chunk_size):
+    """Row blocks of a column-major array: one seek and read per column per block."""
+    if not stream.seekable():
+        raise ValueError("Fortran-ordered .npy data must come from a seekable file")
+    data_start = stream.tell()
+    column_bytes = n_rows * dtype.itemsize
+    for start in range(0, n_rows, chunk_size):
+        rows = min(chunk_size, n_rows - start)
+        block = np.empty((rows, n_columns), dtype=dtype)
+        for j in range(n_columns):
+            stream.seek(data_start + j * column_bytes + start * dtype.itemsize)
+            data = _read_exact(stream, rows * dtype.itemsize)
+            if len(data) != rows * dtype.itemsize:
+                raise ValueError("Binary upload is truncated")
+            block[:, j] = np.frombuffer(data, dtype=dtype)
+        yield block
+
+
+def _npy_chunks(stream, chunk_size):
+    shape, dtype, fortran_order = _read_npy_header(stream)
+    if len(shape) != 2 or shape[1] != len(TOP_FEATURES):
+        raise ValueError(
+            f".npy uploads must be 2-D with {len(TOP_FEATURES)} columns in TOP_FEATURES order, got shape {shape}"
+        )
+    if fortran_order:
+        # np.save writes column-major data for F-contiguous arrays (e.g. df.to_numpy())
+        yield from _npy_fortran_blocks(stream, shape[0], shape[1], dtype, chunk_size)
+    else:
+        yield from _npy_blocks(stream, shape[0], shape[1:], dtype, chunk_size)
+
+
+def _npz_chunks(stream, chunk_size):
+    """Columnar .npz: one 1-D array per feature, read member by member in step.
+
+    An archive holding a single 2-D array is read like a .npy upload.
+    """
+    with zipfile.ZipFile(stream) as archive:
+        members = {name[:-4] if name.endswith(".npy") else name: name for name in archive.namelist()}
+        if len(members) == 1:
+            with archive.open(next(iter(members.values()))) as member:
+                yield from _npy_chunks(member, chunk_size)
+            return
+
+        missing = [name for name in TOP_FEATURES if name not in members]
+        if missing:
+            raise KeyError(f"Missing feature columns: {missing}")
+        columns = [archive.open(members[name]) for name in TOP_FEATURES]
+        try:
+            headers = [_read_npy_header(column) for column in columns]
+            n_rows = headers[0][0][0] if headers[0][0] else 0
+            if any(shape != (n_rows,) for shape, _, _ in headers):
+                raise ValueError("Columnar .npz uploads need one 1-D array of equal length per feature")
+            readers = [
+                _npy_blocks(column, n_rows, (), dtype, chunk_size)
+                for column, (_, dtype, _) in zip(columns, headers)
+            ]
+            for blocks in zip(*readers):
+                yield np.column_stack(blocks)
+        finally:
+            for column in columns:
+                column.close()
+
+
+def _arrow_chunks(stream, chunk_size, stream_format=False):
+    pa = _import_pyarrow()
+    reader = pa.ipc.open_stream(stream) if stream_format else pa.ipc.open_file(stream)
+    positions = column_map([name.strip() for name in reader.schema.names])
+    batches = reader if stream_format else (reader.get_batch(i) for i in range(reader.num_record_batches))
+    for batch in batches:
+        for start in range(0, batch.num_rows, chunk_size):
+            part = batch.slice(start, chunk_size)
+            yield np.column_stack(
+                [part.column(int(position)).to_numpy(zero_copy_only=False) for position in positions]
+            )
+
+
+def _csv_chunks(stream, chunk_size, all_columns):
+    wanted = set(TOP_FEATURES)
+    reader = pd.read_csv(
+        stream,
+        usecols=None if all_columns else (lambda col: col.strip() in wanted),
+        chunksize=chunk_size,
+    )
+    for chunk in reader:
+        chunk.columns = [col.strip() if isinstance(col, str) else col for col in chunk.columns]
+        yield chunk
+
+
+def read_feature_chunks(source, chunk_size=PREDICT_CHUNK_SIZE, all_columns=False):
+    """Stream any supported input in fixed-size row chunks.
+
+    CSV (plain, gzip or zstd, decompressed on the fly) yields DataFrames with
+    whitespace-stripped column names. Binary inputs (.npy, columnar .npz,
+    Arrow IPC) yield numeric arrays whose columns are TOP_FEATURES in order,
+    with no text parsing. Both go straight into src.feature_transform.
+
+    Args:
+        source: Path or seekable binary file object (e.g. a werkzeug upload)
+        chunk_size: Rows per chunk
+        all_columns: For CSV, keep every column instead of only TOP_FEATURES
+
+    Yields:
+        pd.DataFrame or np.ndarray chunk
+    """
+    input_format = detect_format(source)
+    with _binary_stream(source) as stream:
+        if input_format == "csv":
+            yield from _csv_chunks(stream, chunk_size, all_columns)
+        elif input_format == "csv.gz":
+            with gzip.GzipFile(fileobj=stream) as decompressed:
+                yield from _csv_chunks(decompressed, chunk_size, all_columns)
+        elif input_format == "csv.zst":
+            zstandard = _import_zstd()
+            with zstandard.ZstdDecompressor().stream_reader(stream, read_across_frames=True) as decompressed:
+                yield from _csv_chunks(decompressed, chunk_size, all_columns)
+        elif input_format == "npy":
+            yield from _npy_chunks(stream, chunk_size)
+        elif input_format == "npz":
+            yield from _npz_chunks(stream, chunk_size)
+        else:
+            yield from _arrow_chunks(stream, chunk_size, stream_format=input_format == "arrow_stream")
+
+
+def count_rows(path):
+    """Data rows in an input file, or None when only a full decompression would tell.
+
+    Args:
+        path: Input file path
+
+    Returns:
+        Row count (an upper bound for plain CSV, see count_data_rows) or None
+    """
+    input_format = detect_format(path)
+    if input_format == "csv":
+        return count_data_rows(path)
+    if input_format == "npy":
+        with open(path, "rb") as f:
+            return int(_read_npy_header(f)[0][0])
+    if input_format == "npz":
+        with zipfile.ZipFile(path) as archive:
+            with archive.open(archive.namelist()[0]) as member:
+                shape, _, _ = _read_npy_header(member)
+        return int(shape[0]) if shape else 0
+    if input_format == "arrow":
+        pa = _import_pyarrow()
+        with pa.memory_map(path) as source:
+            reader = pa.ipc.open_file(source)
+            return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+    return None
+
+
+def convert_input(input_path, output_path, output_format, chunk_size=PREDICT_CHUNK_SIZE):
+    """Re-encode a flow export for upload (e.g. on a sensor before sending it).
+
+    Compressed CSV keeps every column. Binary formats keep only TOP_FEATURES,
+    as float32 (the precision the model scores at): .npy as one 2-D array in
+    TOP_FEATURES order, .npz as one compressed array per feature, Arrow as a
+    zstd-compressed IPC file with one record batch per chunk.
+
+    Args:
+        input_path: Source file in any supported format
+        output_path: Destination path
+        output_format: "csv.gz", "csv.zst", "npy", "npz" or "arrow"
+        chunk_size: Rows per chunk (and per Arrow record batch)
+    """
+    if output_format in ("csv.gz", "csv.zst"):
+        if detect_format(input_path) != "csv":
+            raise ValueError("Compressed CSV output needs a plain CSV input")
+        with open(input_path, "rb") as src, open(output_path, "wb") as dst:
+            if output_format == "csv.gz":
+                with gzip.GzipFile(fileobj=dst, mode="wb", compresslevel=6) as compressed:
+                    shutil.copyfileobj(src, compressed, 1 << 20)
+            else:
+                _import_zstd().ZstdCompressor(level=3).copy_stream(src, dst)
+        return
+
+    # Raw values (inf and NaN kept); the server cleans them like CSV input
+    blocks = [
+        transform(chunk, sanitize=False) for chunk in read_feature_chunks(input_path, chunk_size)
+    ]
+    if output_format == "npy":
+        np.save(output_path, np.concatenate(blocks) if blocks else np.empty((0, len(TOP_FEATURES)), np.float32))
+    elif output_format == "npz":
+        X = np.concatenate(blocks) if blocks else np.empty((0, len(TOP_FEATURES)), np.float32)
+        with open(output_path, "wb") as f:
+            np.savez_compressed(f, **{name: X[:, j] for j, name in enumerate(TOP_FEATURES)})
+    elif output_format == "arrow":
+        pa = _import_pyarrow()
+        schema = pa.schema([(name, pa.float32()) for name in TOP_FEATURES])
+        options = pa.ipc.IpcWriteOptions(compression="zstd")
+        with pa.OSFile(output_path, "wb") as sink, pa.ipc.new_file(sink, schema, options=options) as writer:
+            for block in blocks:
+                writer.write_batch(pa.record_batch(list(block.T), schema=schema))
+    else:
+        raise ValueError(f"Unknown output format: {output_format}")
+
+
+if __name__ == "__main__":
+    # Usage: python -m src.input_formats flows.csv flows.npz
+    # The output format follows the output file name.
+    if len(sys.argv) != 3:
+        print("Usage: python -m src.input_formats <input> <output.csv.gz|.csv.zst|.npy|.npz|.arrow>")
+        sys.exit(1)
+    input_path, output_path = sys.argv[1], sys.argv[2]
+    for extension, output_format in ((".csv.gz", "csv.gz"), (".csv.zst", "csv.zst"), (".npy", "npy"),
+                                     (".npz", "npz"), (".arrow", "arrow"), (".feather", "arrow")):
+        if output_path.lower().endswith(extension):
+            break
+    else:
+        print(f"ERROR: Cannot tell the output format from {output_path}")
+        sys.exit(1)
+    convert_input(input_path, output_path, output_format)
+    print(f"-- Wrote {output_path} ({os.path.getsize(output_path) / 1e6:.1f} MB)")
@@ -0,0 +1,246 @@
+# AegisNet Job Queue Module
+
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.config import JOB_DIR, JOB_MAX_WORKERS, JOB_MAX_PENDING, JOB_TTL_S
+from src.input_formats import count_rows
+from src.micro_batcher import QueueFullError
+from src.result_store import StoredResult
+
+STATUS_NAME = "status.json"
+# Saved as uploaded; the format (CSV, compressed CSV, binary) is detected from its leading bytes
+UPLOAD_NAME = "upload"
+ROWS_NAME = "rows.npy"
+SCORES_NAME = "scores.npy"
+
+# Minimum seconds between opportunistic TTL sweeps
+CLEANUP_INTERVAL_S = 60
+# Job ids are uuid4 hex strings; anything else never reaches the filesystem
+JOB_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+
+def is_job_id(job_id):
+    """True if job_id has the form submit() hands out."""
+    return isinstance(job_id, str) and JOB_ID_PATTERN.fullmatch(job_id) is not None
+
+
+class JobQueue:
+    """Background scoring of uploaded flow files with disk-backed state and results.
+
+    Each job owns a directory under job_dir holding the upload, a
+    status.json that is atomically replaced on every progress update, and
+    the flagged rows/scores as .npy files once scoring finishes. Because
+    all state is on disk, any server process can answer status and result
+    requests for any job.
+    """
+
+    def __init__(
+        self,
+        score_fn,
+        job_dir=JOB_DIR,
+        max_workers=JOB_MAX_WORKERS,
+        max_pending=JOB_MAX_PENDING,
+        ttl_s=JOB_TTL_S,
+    ):
+        """
+        Args:
+            score_fn: Callable(csv_path, progress) returning
+                (threat_rows, threat_scores, summary); progress(rows_done)
+                is called after each scored chunk
+            job_dir: Directory for job state and results
+            max_workers: Jobs scored concurrently
+            max_pending: Queued plus running jobs accepted before rejecting
+            ttl_s: Seconds a finished job is kept
+        """
+        self.score_fn = score_fn
+        self.job_dir = job_dir
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.ttl_s = ttl_s
+        self._executor = None
+        self._active = set()
+        self._lock = threading.Lock()
+        self._last_cleanup = 0.0
+
+    def _path(self, job_id, name=""):
+        if not is_job_id(job_id):
+            raise ValueError(f"Invalid job id: {job_id!r}")
+        return os.path.join(self.job_dir, job_id, name)
+
+    def _write_status(self, job_id, status):
+        tmp_path = self._path(job_id, STATUS_NAME + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(status, f)
+        os.replace(tmp_path, self._path(job_id, STATUS_NAME))
+
+    def _read_status(self, job_id):
+        try:
+            with open(self._path(job_id, STATUS_NAME)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def submit(self, file, filename="upload.csv"):
+        """Save an upload to disk and queue it for scoring.
+
+        Args:
+            file: Object with a save(path) method (e.g. werkzeug FileStorage)
+            filename: Original filename, kept for display
+
+        Returns:
+            Job id
+
+        Raises:
+            QueueFullError: If max_pending jobs are already queued or running
+        """
+        self.cleanup()
+        with self._lock:
+            if len(self._active) >= self.max_pending:
+                raise QueueFullError("Job queue is full")
+            job_id = uuid.uuid4().hex
+            self._active.add(job_id)
+            if self._executor is None:
+                # Created lazily so forked server workers each get their own threads
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="aegisnet-job"
+                )
+
+        try:
+            os.makedirs(self._path(job_id))
+            upload_path = self._path(job_id, UPLOAD_NAME)
+            file.save(upload_path)
+            status = {
+                "job_id": job_id,
+                "state": "queued",
+                "filename": filename,
+                "total_rows": count_rows(upload_path),
+                "rows_processed": 0,
+                "created": time.time(),
+                "started": None,
+                "finished": None,
+                "error": None,
+                "summary": None,
+            }
+            self._write_status(job_id, status)
+            self._executor.submit(self._run, job_id, status)
+        except Exception:
+            with self._lock:
+                self._active.discard(job_id)
+            shutil.rmtree(self._path(job_id), ignore_errors=True)
+            raise
+        return job_id
+
+    def _run(self, job_id, status):
+        status.update(state="running", started=time.time())
+        self._write_status(job_id, status)
+
+        def progress(rows_done):
+            status["rows_processed"] = int(rows_done)
+            self._write_status(job_id, status)
+
+        try:
+            threat_rows, threat_scores, summary = self.score_fn(
+                self._path(job_id, UPLOAD_NAME), progress
+            )
+            np.save(self._path(job_id, ROWS_NAME), np.asarray(threat_rows, dtype=np.int64))
+            np.save(self._path(job_id, SCORES_NAME), np.asarray(threat_scores, dtype=np.float32))
+            status.update(state="done", summary=summary, total_rows=summary["total_flows"])
+        except Exception as e:
+            status.update(state="failed", error=str(e))
+        finally:
+            status["finished"] = time.time()
+            self._write_status(job_id, status)
+            # The upload is no longer needed once scored
+            try:
+                os.remove(self._path(job_id, UPLOAD_NAME))
+            except OSError:
+                pass
+            with self._lock:
+                self._active.discard(job_id)
+
+    def get(self, job_id):
+        """Job status with progress, throughput and ETA, or None if unknown/expired."""
+        if not is_job_id(job_id):
+            return None
+        self.cleanup()
+        status = self._read_status(job_id)
+        if status is None:
+            return None
+
+        now = time.time()
+        total = status["total_rows"] or 0
+        done = status["rows_processed"]
+        status["progress"] = 1.0 if status["state"] == "done" else (done / total if total else 0.0)
+        status["rows_per_s"] = None
+        status["eta_s"] = None
+        if status["started"] is not None:
+            elapsed = (status["finished"] or now) - status["started"]
+            if elapsed > 0 and done:
+                status["rows_per_s"] = done / elapsed
+                # Compressed CSV uploads have no row count until scored
+                if status["state"] == "running" and total:
+                    status["eta_s"] = max(total - done, 0) / status["rows_per_s"]
+        if status["state"] == "queued":
+            status["queue_position"] = self.queue_position(job_id, status["created"])
+        return status
+
+    def queue_position(self, job_id, created):
+        """Number of this process's queued jobs submitted before job_id."""
+        with self._lock:
+            others = [other for other in self._active if other != job_id]
+        position = 0
+        for other in others:
+            status = self._read_status(other)
+            if status and status["state"] == "queued" and status["created"] < created:
+                position += 1
+        return position
+
+    def load_result(self, job_id):
+        """Open a finished job's threats as a StoredResult backed by memmaps.
+
+        Returns:
+            StoredResult, or None if the job is unknown or not finished
+        """
+        if not is_job_id(job_id):
+            return None
+        status = self._read_status(job_id)
+        if status is None or status["state"] != "done":
+            return None
+        rows = np.load(self._path(job_id, ROWS_NAME), mmap_mode="r")
+        scores = np.load(self._path(job_id, SCORES_NAME), mmap_mode="r")
+        return StoredResult(rows, scores, status["summary"])
+
+    def cleanup(self, force=False):
+        """Delete job directories whose results are older than the TTL."""
+        now = time.time()
+        if not force and now - self._last_cleanup < CLEANUP_INTERVAL_S:
+            return
+        self._last_cleanup = now
+        if not os.path.isdir(self.job_dir):
+            return
+
+        with self._lock:
+            active = set(self._active)
+        for job_id in os.listdir(self.job_dir):
+            if job_id in active or not is_job_id(job_id):
+                continue
+            status = self._read_status(job_id)
+            if status is None:
+                # Half-created or corrupt job: age it by directory mtime
+                reference = os.path.getmtime(self._path(job_id))
+            else:
+                reference = status["finished"] or status["created"]
+                if status["finished"] is None and now - reference <= self.ttl_s * 2:
+                    # Possibly still running in another server process
+                    continue
+            if now - reference > self.ttl_s:
+                shutil.rmtree(self._path(job_id), ignore_errors=True)
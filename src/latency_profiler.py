@@ -0,0 +1,142 @@
+# AegisNet Latency Profiler Module
+
+import json
+import time
+
+import numpy as np
+
+from src.config import (
+    LATENCY_BUDGET_MS,
+    LATENCY_BATCH_SIZE,
+    LATENCY_CANDIDATE_TRIALS,
+    TRADEOFF_REPORT_PATH,
+)
+
+
+def _architecture_values(hp):
+    """Hyperparameter values without Hyperband's bookkeeping keys."""
+    return {k: v for k, v in hp.values.items() if not k.startswith("tuner/")}
+
+
+def measure_latency(model, input_shape, batch_size=LATENCY_BATCH_SIZE, repeats=20):
+    """Median wall time (ms) of one batched forward pass.
+
+    Args:
+        model: Keras model
+        input_shape: Number of input features
+        batch_size: Rows per batch
+        repeats: Timed repetitions after warm-up
+
+    Returns:
+        Median latency in milliseconds
+    """
+    X = np.random.default_rng(0).standard_normal((batch_size, input_shape)).astype(np.float32)
+    for _ in range(3):
+        model.predict_on_batch(X)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict_on_batch(X)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1000.0)
+
+
+def measure_trial_costs(tuner, input_shape, num_trials=LATENCY_CANDIDATE_TRIALS):
+    """Profile parameter count and batched latency of the completed search trials.
+
+    Latency depends only on the architecture, so each distinct configuration
+    is built once with fresh weights and timed (with its best score). Every
+    completed trial is a candidate by default: the fastest architectures are
+    rarely among the most accurate few, so capping by accuracy would hide
+    exactly the trials a latency budget needs.
+
+    Args:
+        tuner: Finished KerasTuner tuner
+        input_shape: Number of input features
+        num_trials: Profile only this many top trials by val_accuracy
+            (None = all completed trials)
+
+    Returns:
+        List of dicts with trial_id, val_accuracy, params and latency_ms
+    """
+    if num_trials is None:
+        num_trials = len(tuner.oracle.trials)
+    print(f":: [LatencyProfiler] - Profiling up to {num_trials} trials (batch={LATENCY_BATCH_SIZE})... ::")
+    records = []
+    seen = set()
+    for trial in tuner.oracle.get_best_trials(num_trials):
+        if trial.score is None:
+            continue
+        values = _architecture_values(trial.hyperparameters)
+        key = json.dumps(values, sort_keys=True)
+        if key in seen:
+            continue
+        seen.add(key)
+
+        model = tuner.hypermodel.build(trial.hyperparameters)
+        record = {
+            "trial_id": trial.trial_id,
+            "val_accuracy": float(trial.score),
+            "params": int(model.count_params()),
+            "latency_ms": measure_latency(model, input_shape),
+            "hyperparameters": values,
+        }
+        records.append(record)
+        print(
+            f"-- Trial {record['trial_id']}: val_accuracy={record['val_accuracy']:.5f} "
+            f"params={record['params']} latency={record['latency_ms']:.2f}ms"
+        )
+    return records
+
+
+def pareto_front(records):
+    """Trials not beaten on both accuracy and latency by any other trial.
+
+    Returns:
+        Records on the front, fastest first
+    """
+    front = []
+    best_accuracy = -np.inf
+    for record in sorted(records, key=lambda r: (r["latency_ms"], -r["val_accuracy"])):
+        if record["val_accuracy"] > best_accuracy:
+            front.append(record)
+            best_accuracy = record["val_accuracy"]
+    return front
+
+
+def select_champion(records, latency_budget_ms=LATENCY_BUDGET_MS):
+    """Pick the most accurate trial that fits the latency budget.
+
+    With no budget this is simply the most accurate trial. If no trial fits
+    the budget, the fastest trial is chosen.
+
+    Returns:
+        Chosen record
+
+    Raises:
+        ValueError: If there are no records (no trial completed)
+    """
+    if not records:
+        raise ValueError("No completed search trials to choose a champion from")
+    if latency_budget_ms is None:
+        return max(records, key=lambda r: r["val_accuracy"])
+    within = [r for r in records if r["latency_ms"] <= latency_budget_ms]
+    if not within:
+        print(f"-- No trial meets the {latency_budget_ms}ms budget; choosing the fastest.")
+        return min(records, key=lambda r: r["latency_ms"])
+    return max(within, key=lambda r: r["val_accuracy"])
+
+
+def save_tradeoff_report(records, choice, latency_budget_ms=LATENCY_BUDGET_MS, path=TRADEOFF_REPORT_PATH):
+    """Record the chosen accuracy/latency tradeoff next to the saved model."""
+    report = {
+        "latency_budget_ms": latency_budget_ms,
+        "latency_batch_size": LATENCY_BATCH_SIZE,
+        "champion": choice,
+        "pareto_front": pareto_front(records),
+        "candidates": records,
+    }
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"-- Accuracy/latency tradeoff saved to {path}")
+    return report
@@ -0,0 +1,302 @@
+# AegisNet Metrics Module
+
+import bisect
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from src.config import METRICS_RATE_WINDOW_S
+
+# Latency buckets in seconds (0.5ms .. 60s)
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+ROW_BUCKETS = (1, 10, 100, 1000, 10000, 100000, 1000000, 10000000)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Registry:
+    """Collection of metrics rendered together in Prometheus text format."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, pairs, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{_format_labels(pairs)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help_text, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _pairs(self, key):
+        return list(zip(self.labelnames, key))
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, one series per label combination."""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        key = self._key(labels)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [("", self._pairs(key), value) for key, value in items]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be computed at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labelnames=(), registry=REGISTRY):
+        super().__init__(name, help_text, labelnames, registry)
+        self._function = None
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function):
+        """Report function() at scrape time instead of a stored value (unlabelled gauges only)."""
+        self._function = function
+
+    def samples(self):
+        if self._function is not None:
+            return [("", [], self._function())]
+        with self._lock:
+            items = list(self._values.items())
+        return [("", self._pairs(key), value) for key, value in items]
+
+
+class Histogram(_Metric):
+    """Bucketed observations (latencies, row counts) with sum and count.
+
+    observe() does one bisect and a few increments under a per-histogram
+    lock, so instrumenting a hot path costs a few microseconds per call.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS, registry=REGISTRY):
+        super().__init__(name, help_text, labelnames, registry)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                # Per-bucket counts (last slot is +Inf), then the running sum
+                series = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall time of the enclosed block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._values.items()]
+        samples = []
+        for key, series in items:
+            pairs = self._pairs(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                samples.append(("_bucket", pairs + [("le", _format_value(float(bound)))], cumulative))
+            samples.append(("_sum", pairs, series[-1]))
+            samples.append(("_count", pairs, cumulative))
+        return samples
+
+
+class RateMeter:
+    """Events per second over a sliding window, kept as per-second buckets."""
+
+    def __init__(self, window_s=METRICS_RATE_WINDOW_S):
+        self.window_s = window_s
+        self._buckets = deque()  # [second, amount], oldest first
+        self._lock = threading.Lock()
+
+    def _prune(self, now):
+        cutoff = now - self.window_s
+        while self._buckets and self._buckets[0][0] <= cutoff:
+            self._buckets.popleft()
+
+    def add(self, amount):
+        now = int(time.monotonic())
+        with self._lock:
+            if self._buckets and self._buckets[-1][0] == now:
+                self._buckets[-1][1] += amount
+            else:
+                self._buckets.append([now, amount])
+                self._prune(now)
+
+    def rate(self):
+        now = int(time.monotonic())
+        with self._lock:
+            self._prune(now)
+            total = sum(amount for _, amount in self._buckets)
+        return total / self.window_s
+
+
+def timed_iter(iterable, histogram, **labels):
+    """Yield from iterable, observing the time spent producing each item."""
+    iterator = iter(iterable)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        histogram.observe(time.perf_counter() - start, **labels)
+        yield item
+
+
+# ============================================================================
+# Inference service metrics
+# ============================================================================
+STAGE_SECONDS = Histogram(
+    "aegisnet_stage_seconds",
+    "Time spent in each stage of a prediction request.",
+    ("endpoint", "stage"),
+)
+REQUEST_SECONDS = Histogram(
+    "aegisnet_request_seconds",
+    "End-to-end request latency.",
+    ("endpoint",),
+)
+REQUESTS_TOTAL = Counter(
+    "aegisnet_requests_total",
+    "Requests handled, by endpoint and HTTP status.",
+    ("endpoint", "status"),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "aegisnet_requests_in_flight",
+    "Requests currently being handled.",
+    ("endpoint",),
+)
+ROWS_PER_REQUEST = Histogram(
+    "aegisnet_rows_per_request",
+    "Flows scored per request.",
+    ("endpoint",),
+    buckets=ROW_BUCKETS,
+)
+ROWS_SCORED = Counter(
+    "aegisnet_rows_scored_total",
+    "Flows scored since startup.",
+    ("endpoint",),
+)
+UNIQUE_ROWS_SCORED = Counter(
+    "aegisnet_unique_rows_scored_total",
+    "Distinct feature rows actually run through the model (after deduplication).",
+    ("endpoint",),
+)
+ROWS_SCORED_RATE = RateMeter()
+ROWS_SCORED_PER_SECOND = Gauge(
+    "aegisnet_rows_scored_per_second",
+    f"Flows scored per second over the last {METRICS_RATE_WINDOW_S}s.",
+)
+ROWS_SCORED_PER_SECOND.set_function(ROWS_SCORED_RATE.rate)
+RESULT_CACHE_LOOKUPS = Counter(
+    "aegisnet_result_cache_lookups_total",
+    "Result cache lookups for uploaded captures, by outcome (hit/miss).",
+    ("outcome",),
+)
+MODEL_LOAD_SECONDS = Gauge(
+    "aegisnet_model_load_seconds",
+    "Time taken to load the most recent model version.",
+    ("backend",),
+)
+CASCADE_ROWS = Counter(
+    "aegisnet_cascade_rows_total",
+    "Flows decided by each cascade stage (prefilter = cleared as benign without the DNN).",
+    ("stage",),
+)
+MODEL_ACTIVE = Gauge(
+    "aegisnet_model_active",
+    "1 for the model version currently serving, 0 for versions swapped out.",
+    ("version",),
+)
+
+
+def record_rows(endpoint, rows):
+    """Count flows scored by one request."""
+    ROWS_SCORED.inc(rows, endpoint=endpoint)
+    ROWS_PER_REQUEST.observe(rows, endpoint=endpoint)
+    ROWS_SCORED_RATE.add(rows)
@@ -0,0 +1,164 @@
+# AegisNet Micro-Batching Module
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from src.config import (
+    MICROBATCH_MAX_SIZE,
+    MICROBATCH_MAX_WAIT_MS,
+    MICROBATCH_QUEUE_DEPTH,
+)
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the micro-batch queue is at capacity."""
+
+
+# Queue marker telling the worker thread to exit after the rows ahead of it
+_STOP = object()
+
+
+class MicroBatcher:
+    """Merge concurrent single-row requests into batched forward passes.
+
+    Callers submit one feature row and get a Future back. A background thread
+    drains the queue and flushes a batch when either max_batch_size rows are
+    waiting or max_wait_ms has passed since the first row of the batch.
+    """
+
+    def __init__(
+        self,
+        predict_fn,
+        max_batch_size=MICROBATCH_MAX_SIZE,
+        max_wait_ms=MICROBATCH_MAX_WAIT_MS,
+        max_queue_depth=MICROBATCH_QUEUE_DEPTH,
+    ):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue(maxsize=max_queue_depth)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        # Makes submit's closed check and enqueue atomic with close(), so no
+        # row can land behind _STOP and wait for a worker that has exited
+        self._submit_lock = threading.Lock()
+        self._closed = False
+
+        # Observability: batch_size_counts[n] = number of batches of size n.
+        # Written by the worker and submitting threads, read by stats()
+        self._stats_lock = threading.Lock()
+        self.batch_size_counts = [0] * (max_batch_size + 1)
+        self.total_requests = 0
+        self.total_batches = 0
+        self.rejected_requests = 0
+
+    def start(self):
+        """Start the worker thread (idempotent, also safe after a fork)."""
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="aegisnet-microbatcher", daemon=True
+                )
+                self._thread.start()
+
+    def submit(self, row):
+        """Queue a single feature row.
+
+        Args:
+            row: 1-D array-like of feature values
+
+        Returns:
+            Future resolving to the row's probability (float)
+        """
+        future = Future()
+        row = np.asarray(row, dtype=np.float32)
+        with self._submit_lock:
+            if not self._closed:
+                if self._thread is None or not self._thread.is_alive():
+                    self.start()
+                try:
+                    self._queue.put_nowait((row, future))
+                except queue.Full:
+                    with self._stats_lock:
+                        self.rejected_requests += 1
+                    raise QueueFullError("Micro-batch queue is full")
+                return future
+        # Late caller after close(): score directly rather than restart the thread
+        future.set_result(float(np.asarray(self.predict_fn(row[None, :])).reshape(-1)[0]))
+        return future
+
+    def predict(self, row, timeout=None):
+        """Submit a row and block until its probability is available."""
+        return self.submit(row).result(timeout=timeout)
+
+    def _collect_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+            if batch[-1] is _STOP:
+                break
+        return batch
+
+    def close(self):
+        """Score the rows already queued, then stop the worker thread."""
+        with self._submit_lock:
+            self._closed = True
+            if self._thread is not None and self._thread.is_alive():
+                # Blocks only while the queue is full; the worker keeps draining it
+                self._queue.put(_STOP)
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            stopping = batch[-1] is _STOP
+            if stopping:
+                # close() holds the submit lock, so _STOP is the last item ever queued
+                batch.pop()
+                if not batch:
+                    return
+            rows = np.vstack([row for row, _ in batch])
+            try:
+                probabilities = np.asarray(self.predict_fn(rows)).reshape(-1)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for (_, future), probability in zip(batch, probabilities.tolist()):
+                    future.set_result(probability)
+
+            with self._stats_lock:
+                self.batch_size_counts[len(batch)] += 1
+                self.total_batches += 1
+                self.total_requests += len(batch)
+            if stopping:
+                return
+
+    def stats(self):
+        """Consistent snapshot of queue depth and the batch-size distribution."""
+        with self._stats_lock:
+            requests = self.total_requests
+            batches = self.total_batches
+            rejected = self.rejected_requests
+            histogram = {size: count for size, count in enumerate(self.batch_size_counts) if count}
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "queue_depth": self._queue.qsize(),
+            "max_queue_depth": self._queue.maxsize,
+            "total_requests": requests,
+            "total_batches": batches,
+            "rejected_requests": rejected,
+            "mean_batch_size": (requests / batches) if batches else 0.0,
+            "batch_size_histogram": histogram,
+        }
@@ -1,7 +1,157 @@
 # AegisNet FINAL Model Evaluation Module
 
+import json
+import sys
+
+import numpy as np
 from sklearn.metrics import classification_report, confusion_matrix
-from src.config import CLASSIFICATION_THRESHOLD
+from src.config import (
+    CLASSIFICATION_THRESHOLD,
+    TARGET_FPRS,
+    THRESHOLD_SWEEP_PATH,
+    THRESHOLD_REPORT_PATH,
+)
+
+
+def sweep_thresholds(y_true, y_prob):
+    """Confusion counts at every distinct probability threshold in one pass.
+
+    Scores are sorted once (descending); cumulative true/false positive
+    counts at the end of each tie group give the confusion matrix for the
+    rule `prob > threshold` at every distinct threshold, in O(n log n).
+
+    Args:
+        y_true: Binary labels (1 = ATTACK)
+        y_prob: Predicted attack probabilities
+
+    Returns:
+        Dict of equal-length arrays: threshold (descending), tp, fp, fn, tn,
+        precision, recall, fpr
+
+    Raises:
+        ValueError: If there are no rows or the inputs differ in length
+    """
+    y_true = np.asarray(y_true).ravel().astype(bool)
+    # Keep the model's dtype so comparisons match `y_prob > threshold` exactly
+    y_prob = np.asarray(y_prob).ravel()
+    if len(y_true) != len(y_prob):
+        raise ValueError(f"Got {len(y_true)} labels but {len(y_prob)} probabilities")
+    if len(y_true) == 0:
+        raise ValueError("Cannot sweep thresholds over zero rows")
+    order = np.argsort(-y_prob, kind="mergesort")
+    p_sorted = y_prob[order]
+    tp_cum = np.cumsum(y_true[order])
+    fp_cum = np.cumsum(~y_true[order])
+    positives = int(tp_cum[-1])
+    negatives = len(y_true) - positives
+
+    # Last index of each group of equal scores
+    group_ends = np.r_[np.flatnonzero(np.diff(p_sorted)), len(p_sorted) - 1]
+    thresholds = p_sorted[group_ends]
+    # At threshold = value of group k, only groups 0..k-1 score strictly higher
+    tp = np.r_[0, tp_cum[group_ends[:-1]]]
+    fp = np.r_[0, fp_cum[group_ends[:-1]]]
+    # Final point just below the lowest score flags every row
+    thresholds = np.r_[thresholds, np.nextafter(thresholds[-1], -np.inf)]
+    tp = np.r_[tp, positives]
+    fp = np.r_[fp, negatives]
+
+    predicted = tp + fp
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(predicted > 0, tp / predicted, 1.0)
+        recall = tp / positives if positives else np.zeros(len(tp))
+        fpr = fp / negatives if negatives else np.zeros(len(fp))
+    return {
+        "threshold": thresholds,
+        "tp": tp,
+        "fp": fp,
+        "fn": positives - tp,
+        "tn": negatives - fp,
+        "precision": precision,
+        "recall": recall,
+        "fpr": fpr,
+    }
+
+
+def confusion_at(sweep, threshold):
+    """Confusion counts for `prob > threshold`, looked up from a sweep.
+
+    Returns:
+        Dict with tp, fp, fn, tn, precision, recall, fpr
+    """
+    # First swept threshold <= requested one has the same flagged set
+    descending = sweep["threshold"]
+    idx = np.searchsorted(-descending, -descending.dtype.type(threshold), side="left")
+    idx = min(idx, len(descending) - 1)
+    return {
+        key: float(sweep[key][idx]) if key in ("precision", "recall", "fpr") else int(sweep[key][idx])
+        for key in ("tp", "fp", "fn", "tn", "precision", "recall", "fpr")
+    }
+
+
+def roc_auc(sweep):
+    """Area under the ROC curve from the sweep's (fpr, recall) points.
+
+    Returns:
+        The AUC, or None when the labels hold a single class (AUC is undefined)
+    """
+    tp, fp = sweep["tp"][-1], sweep["fp"][-1]
+    if tp == 0 or fp == 0:
+        return None
+    fpr = np.r_[0.0, sweep["fpr"]]
+    tpr = np.r_[0.0, sweep["recall"]]
+    return float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2.0))
+
+
+def format_auc(auc):
+    """Printable ROC-AUC, spelling out the undefined single-class case."""
+    return "undefined (single-class labels)" if auc is None else f"{auc:.5f}"
+
+
+def recommend_thresholds(sweep, target_fprs=TARGET_FPRS):
+    """Lowest threshold (highest recall) whose false-positive rate stays within each target.
+
+    Returns:
+        List of dicts with target_fpr, threshold and the resulting metrics
+    """
+    recommendations = []
+    for target in target_fprs:
+        # fpr is non-decreasing as the threshold drops
+        idx = np.searchsorted(sweep["fpr"], target, side="right") - 1
+        if idx < 0:
+            continue
+        recommendations.append(
+            {
+                "target_fpr": float(target),
+                "threshold": float(sweep["threshold"][idx]),
+                "fpr": float(sweep["fpr"][idx]),
+                "recall": float(sweep["recall"][idx]),
+                "precision": float(sweep["precision"][idx]),
+                "tp": int(sweep["tp"][idx]),
+                "fp": int(sweep["fp"][idx]),
+            }
+        )
+    return recommendations
+
+
+def save_threshold_sweep(sweep, recommendations, sweep_path=THRESHOLD_SWEEP_PATH, report_path=THRESHOLD_REPORT_PATH):
+    """Persist the full sweep (for instant re-thresholding) and a JSON summary."""
+    np.savez_compressed(sweep_path, **sweep)
+    summary = {
+        "production_threshold": CLASSIFICATION_THRESHOLD,
+        "at_production_threshold": confusion_at(sweep, CLASSIFICATION_THRESHOLD),
+        "roc_auc": roc_auc(sweep),
+        "recommendations": recommendations,
+    }
+    with open(report_path, "w") as f:
+        json.dump(summary, f, indent=2)
+    print(f"-- Threshold sweep saved to {sweep_path} and {report_path}")
+    return summary
+
+
+def load_threshold_sweep(sweep_path=THRESHOLD_SWEEP_PATH):
+    with np.load(sweep_path) as data:
+        return {key: data[key] for key in data.files}
 
 
 def evaluate_model(model, X_test, y_test):
@@ -38,3 +188,26 @@ def evaluate_model(model, X_test, y_test):
     print(f"-- Total FALSE ALARMS (False Positives): {cm[0][1]}")
     print(f"-- Total ATTACKS DETECTED (True Positives): {cm[1][1]}")
     print(f"-- Total BENIGN CORRECT (True Negatives): {cm[0][0]}")
+
+    # Step 5: Sweep every threshold from the same probabilities
+    print("\n:: [Sentinel_Report] - Sweeping decision thresholds... ::")
+    sweep = sweep_thresholds(y_test, y_pred_probs)
+    recommendations = recommend_thresholds(sweep)
+    print(f"-- ROC-AUC: {format_auc(roc_auc(sweep))}")
+    for rec in recommendations:
+        print(
+            f"-- Target FPR <= {rec['target_fpr']:.4%}: threshold={rec['threshold']:.6f} "
+            f"recall={rec['recall']:.4%} precision={rec['precision']:.4%}"
+        )
+    save_threshold_sweep(sweep, recommendations)
+    return sweep
+
+
+if __name__ == "__main__":
+    # Usage: python -m src.model_evaluator <threshold>
+    # Re-thresholds the persisted sweep without re-scoring the test set.
+    if len(sys.argv) != 2:
+        print("Usage: python -m src.model_evaluator <threshold>")
+        sys.exit(1)
+    result = confusion_at(load_threshold_sweep(), float(sys.argv[1]))
+    print(json.dumps(result, indent=2))
@@ -0,0 +1,220 @@
+# AegisNet Model Registry Module
+
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from src.config import (
+    MODEL_PATH,
+    SCALER_SAVE_PATH,
+    FUSED_MODEL_PATH,
+    TFLITE_MODEL_PATH,
+    CASCADE_MODEL_PATH,
+    MODEL_REGISTRY_DIR,
+    MODEL_REGISTRY_KEEP,
+)
+from src.result_cache import model_fingerprint
+
+# Artifact file names inside each version directory
+ARTIFACT_NAMES = {
+    "model_path": "aegisnet.keras",
+    "scaler_path": "aegisnet_scaler.joblib",
+    "fused_path": "aegisnet_fused.npz",
+    "tflite_path": "aegisnet_quant.tflite",
+    "cascade_path": "aegisnet_cascade.npz",
+}
+# Artifacts a version may lack (copied only when present)
+OPTIONAL_ARTIFACTS = ("fused_path", "tflite_path", "cascade_path")
+MANIFEST_NAME = "manifest.json"
+# Text file naming the version the API should serve (replaced atomically)
+CURRENT_NAME = "CURRENT"
+
+
+def version_paths(version, registry_dir=MODEL_REGISTRY_DIR):
+    """Artifact paths of a registry version, keyed like load_scorer's arguments."""
+    return {key: os.path.join(registry_dir, version, name) for key, name in ARTIFACT_NAMES.items()}
+
+
+def list_versions(registry_dir=MODEL_REGISTRY_DIR):
+    """Manifests of all published versions, oldest first."""
+    if not os.path.isdir(registry_dir):
+        return []
+    manifests = []
+    for entry in os.scandir(registry_dir):
+        if not entry.is_dir() or entry.name.startswith(".tmp-"):
+            continue
+        try:
+            with open(os.path.join(entry.path, MANIFEST_NAME)) as f:
+                manifests.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return sorted(manifests, key=lambda manifest: manifest["created"])
+
+
+def read_version_manifest(version, registry_dir=MODEL_REGISTRY_DIR):
+    """Manifest of a published version.
+
+    Raises:
+        ValueError: If the version does not exist
+    """
+    try:
+        with open(os.path.join(registry_dir, version, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        raise ValueError(f"Unknown model version: {version}")
+
+
+def current_version(registry_dir=MODEL_REGISTRY_DIR):
+    """Version named by the CURRENT pointer, or None if nothing is published."""
+    try:
+        with open(os.path.join(registry_dir, CURRENT_NAME)) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def activate_version(version, registry_dir=MODEL_REGISTRY_DIR):
+    """Point CURRENT at a published version (running APIs pick it up on reload).
+
+    Raises:
+        ValueError: If the version does not exist
+    """
+    if not os.path.isfile(os.path.join(registry_dir, version, MANIFEST_NAME)):
+        raise ValueError(f"Unknown model version: {version}")
+    tmp_path = os.path.join(registry_dir, CURRENT_NAME + ".tmp")
+    with open(tmp_path, "w") as f:
+        f.write(version + "\n")
+    os.replace(tmp_path, os.path.join(registry_dir, CURRENT_NAME))
+
+
+def publish_version(
+    model_path=MODEL_PATH,
+    scaler_path=SCALER_SAVE_PATH,
+    fused_path=FUSED_MODEL_PATH,
+    tflite_path=TFLITE_MODEL_PATH,
+    cascade_path=CASCADE_MODEL_PATH,
+    registry_dir=MODEL_REGISTRY_DIR,
+    metadata=None,
+    activate=True,
+    keep=MODEL_REGISTRY_KEEP,
+):
+    """Copy trained artifacts (model, scaler, plus any optional exports present) into a new version.
+
+    Versions are immutable: files are written to a private directory and
+    published with one rename, so a server never sees a half-copied version.
+
+    Args:
+        model_path: Saved Keras model
+        scaler_path: Saved scaler
+        fused_path: Fused NumPy engine (skipped if missing)
+        tflite_path: Quantized TFLite export (skipped if None or missing; pass
+            None when its parity check failed)
+        cascade_path: Cascade pre-filter (skipped if missing)
+        registry_dir: Registry root
+        metadata: Optional JSON-serializable dict stored in the manifest
+        activate: Point CURRENT at the new version
+        keep: Number of versions to retain (the active one is never removed)
+
+    Returns:
+        The new version id
+    """
+    print(":: [ModelRegistry] - Publishing model version... ::")
+    os.makedirs(registry_dir, exist_ok=True)
+    fingerprint = model_fingerprint("keras", model_path=model_path, scaler_path=scaler_path, cascade=False)
+    version = f"{time.strftime('%Y%m%d-%H%M%S')}-{fingerprint[:8]}"
+
+    tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=registry_dir)
+    try:
+        sources = {
+            "model_path": model_path,
+            "scaler_path": scaler_path,
+            "fused_path": fused_path,
+            "tflite_path": tflite_path,
+            "cascade_path": cascade_path,
+        }
+        artifacts = []
+        for key, source in sources.items():
+            if key in OPTIONAL_ARTIFACTS and (source is None or not os.path.exists(source)):
+                continue
+            shutil.copy2(source, os.path.join(tmp_dir, ARTIFACT_NAMES[key]))
+            artifacts.append(ARTIFACT_NAMES[key])
+        manifest = {
+            "version": version,
+            "created": time.time(),
+            "fingerprint": fingerprint,
+            "artifacts": artifacts,
+            "metadata": metadata or {},
+        }
+        with open(os.path.join(tmp_dir, MANIFEST_NAME), "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.rename(tmp_dir, os.path.join(registry_dir, version))
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    print(f"-- Published version {version} to {registry_dir}")
+    if activate:
+        activate_version(version, registry_dir)
+        print(f"-- Version {version} is now CURRENT")
+    if keep:
+        prune_versions(keep, registry_dir)
+    return version
+
+
+def prune_versions(keep=MODEL_REGISTRY_KEEP, registry_dir=MODEL_REGISTRY_DIR):
+    """Delete the oldest versions beyond keep, never the CURRENT one."""
+    active = current_version(registry_dir)
+    versions = [manifest["version"] for manifest in list_versions(registry_dir)]
+    for version in versions[:-keep] if len(versions) > keep else []:
+        if version != active:
+            shutil.rmtree(os.path.join(registry_dir, version), ignore_errors=True)
+
+
+def resolve_version(version=None, backend="keras", registry_dir=MODEL_REGISTRY_DIR):
+    """Find the artifacts to serve.
+
+    Args:
+        version: Registry version, or None for CURRENT. When nothing has been
+            published yet, the artifacts at the configured model paths are
+            used under an "unversioned-<hash>" id.
+        backend: "keras", "numpy" or "tflite" (decides which files are fingerprinted)
+        registry_dir: Registry root
+
+    Returns:
+        Tuple of (version, fingerprint, paths) where paths are keyword
+        arguments for load_scorer
+
+    Raises:
+        ValueError: If the requested version does not exist, or the tflite
+            backend is requested for a version without a TFLite export that
+            passed its parity check
+    """
+    version = version or current_version(registry_dir)
+    if version is None:
+        paths = {
+            "model_path": MODEL_PATH,
+            "scaler_path": SCALER_SAVE_PATH,
+            "fused_path": FUSED_MODEL_PATH,
+            "tflite_path": TFLITE_MODEL_PATH,
+            "cascade_path": CASCADE_MODEL_PATH,
+        }
+        fingerprint = model_fingerprint(backend, **paths)
+        return f"unversioned-{fingerprint[:8]}", fingerprint, paths
+
+    manifest = read_version_manifest(version, registry_dir)
+    if backend == "tflite":
+        parity = manifest["metadata"].get("tflite", {})
+        if ARTIFACT_NAMES["tflite_path"] not in manifest["artifacts"] or parity.get("passed") is False:
+            raise ValueError(
+                f"Model version {version} has no TFLite export that passed its parity check; "
+                "serve it with the keras or numpy backend"
+            )
+    paths = version_paths(version, registry_dir)
+    return version, model_fingerprint(backend, **paths), paths
+
+
+if __name__ == "__main__":
+    # Publish the artifacts at the configured paths (e.g. after a manual retrain)
+    publish_version()
@@ -2,8 +2,10 @@
 
 import numpy as np
 from sklearn.utils import class_weight
+from src.config import MODEL_PATH
 
-MODEL_SAVE_PATH = "models/.keras"
+# The path publish_version and the scorers load the champion from
+MODEL_SAVE_PATH = MODEL_PATH
 
 
 def train_model(model, X_train, y_train, X_test, y_test):
@@ -0,0 +1,244 @@
+# AegisNet Quantization Module
+
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from sklearn.metrics import confusion_matrix
+
+from src.config import (
+    CLASSIFICATION_THRESHOLD,
+    TFLITE_MODEL_PATH,
+    TFLITE_QUANTIZATION,
+    TFLITE_CALIBRATION_ROWS,
+    TFLITE_PARITY_ROWS,
+    TFLITE_REPORT_PATH,
+    TFLITE_MAX_FLIP_RATE,
+    TFLITE_MAX_RECALL_DROP,
+)
+from src.feature_transform import scaling_params, transform
+from src.inference_engine import KerasScorer, TFLiteScorer, load_interpreter
+
+QUANTIZATION_MODES = ("float16", "dynamic", "int8")
+# Rows per representative-dataset batch during int8 calibration
+CALIBRATION_BATCH_ROWS = 100
+
+
+def draw_rows(indices, n_rows, seed=42):
+    """Sorted random sample of up to n_rows indices (sorted reads are faster on the memmap)."""
+    rng = np.random.default_rng(seed)
+    if len(indices) > n_rows:
+        indices = rng.choice(indices, n_rows, replace=False)
+    return np.sort(indices)
+
+
+def convert_model(model, mode=TFLITE_QUANTIZATION, calibration=None):
+    """Convert a Keras model to a post-training-quantized TFLite flatbuffer.
+
+    Args:
+        model: Trained Keras model (expects scaled features)
+        mode: "float16" (float16 weights), "dynamic" (int8 weights, float
+            activations) or "int8" (int8 weights and activations, float I/O)
+        calibration: Scaled feature rows for int8 activation ranges
+
+    Returns:
+        Serialized .tflite model bytes
+    """
+    import tensorflow as tf
+
+    if mode not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization mode: {mode} (expected one of {QUANTIZATION_MODES})")
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if mode == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    elif mode == "int8":
+        if calibration is None or len(calibration) == 0:
+            raise ValueError("int8 quantization needs calibration rows")
+        calibration = np.asarray(calibration, dtype=np.float32)
+        n_batches = max(1, len(calibration) // CALIBRATION_BATCH_ROWS)
+        converter.representative_dataset = lambda: ([batch] for batch in np.array_split(calibration, n_batches))
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    return converter.convert()
+
+
+def _decision_summary(y_true, probabilities, threshold):
+    cm = confusion_matrix(y_true, (probabilities > threshold).astype(int), labels=[0, 1])
+    tn, fp, fn, tp = (int(count) for count in cm.ravel())
+    return {
+        "confusion_matrix": cm.tolist(),
+        "recall": tp / (tp + fn) if tp + fn else 0.0,
+        "precision": tp / (tp + fp) if tp + fp else 1.0,
+    }
+
+
+def _rows_per_second(scorer, X, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        scorer.predict(X)
+        best = min(best, time.perf_counter() - start)
+    return len(X) / best
+
+
+def parity_report(reference, quantized, X, y, threshold=CLASSIFICATION_THRESHOLD):
+    """Compare a quantized scorer against the float reference on labelled rows.
+
+    Args:
+        reference: Float scorer (KerasScorer)
+        quantized: TFLiteScorer
+        X: Unscaled feature rows
+        y: Labels (1 = ATTACK)
+        threshold: Production threshold
+
+    Returns:
+        Dict with probability deltas, decision flips, confusion matrices at
+        the threshold, rows/s for both, and whether parity passed
+    """
+    y = np.asarray(y).ravel()
+    # Untimed warm-up so neither path pays for graph tracing / tensor allocation
+    reference.predict(X[:1024])
+    quantized.predict(X[:1024])
+    expected = reference.predict(X).ravel()
+    actual = quantized.predict(X).ravel()
+    delta = np.abs(actual - expected)
+    flipped = (actual > threshold) != (expected > threshold)
+
+    float_decisions = _decision_summary(y, expected, threshold)
+    quantized_decisions = _decision_summary(y, actual, threshold)
+    recall_delta = quantized_decisions["recall"] - float_decisions["recall"]
+    flip_rate = float(np.mean(flipped))
+    return {
+        "rows": len(y),
+        "threshold": threshold,
+        "probability_delta": {
+            "max": float(delta.max()),
+            "mean": float(delta.mean()),
+            "p99": float(np.percentile(delta, 99)),
+            "p999": float(np.percentile(delta, 99.9)),
+        },
+        "decision_flips": {
+            "total": int(np.count_nonzero(flipped)),
+            "rate": flip_rate,
+            "benign_to_attack": int(np.count_nonzero(flipped & (actual > threshold))),
+            "attack_to_benign": int(np.count_nonzero(flipped & (expected > threshold))),
+        },
+        "float": float_decisions,
+        "quantized": quantized_decisions,
+        "recall_delta": recall_delta,
+        "rows_per_s": {
+            "float": _rows_per_second(reference, X),
+            "quantized": _rows_per_second(quantized, X),
+        },
+        "passed": flip_rate <= TFLITE_MAX_FLIP_RATE and recall_delta >= -TFLITE_MAX_RECALL_DROP,
+    }
+
+
+def export_quantized_model(
+    model,
+    scaler,
+    X,
+    y,
+    train_idx,
+    test_idx,
+    mode=TFLITE_QUANTIZATION,
+    output_path=TFLITE_MODEL_PATH,
+    report_path=TFLITE_REPORT_PATH,
+):
+    """Export a quantized TFLite model and write its parity report.
+
+    Calibration rows come from the training split and parity rows from the
+    test split, so the report measures rows neither step has seen. The model
+    is written to output_path only if parity passes; a failed export is
+    discarded and output_path is left untouched.
+
+    Args:
+        model: Trained Keras model
+        scaler: Fitted StandardScaler
+        X: Sanitized, unscaled feature DataFrame (e.g. the feature cache)
+        y: Labels
+        train_idx, test_idx: Split indices (see src.data_pipeline.split_indices)
+        mode: Quantization mode (see convert_model)
+        output_path: Destination .tflite path
+        report_path: Destination JSON path
+
+    Returns:
+        Parity report dict ("passed" tells whether output_path was written)
+    """
+    print(f":: [Quantizer] - Exporting {mode} TFLite model... ::")
+    calibration = None
+    if mode == "int8":
+        calibration_idx = draw_rows(train_idx, TFLITE_CALIBRATION_ROWS)
+        print(f"-- Calibrating activation ranges on {len(calibration_idx)} training rows...")
+        calibration = transform(X.iloc[calibration_idx], scaling_params(scaler), sanitize=False)
+    flatbuffer = convert_model(model, mode, calibration)
+    candidate_path = output_path + ".candidate"
+    with open(candidate_path, "wb") as f:
+        f.write(flatbuffer)
+    print(f"-- TFLite model converted ({len(flatbuffer) / 1024:.1f} KB)")
+
+    print(":: [Quantizer] - Checking parity against the float model... ::")
+    parity_idx = draw_rows(test_idx, TFLITE_PARITY_ROWS)
+    try:
+        quantized = TFLiteScorer(load_interpreter(candidate_path), scaler)
+        report = parity_report(
+            KerasScorer(model, scaler), quantized, X.iloc[parity_idx], np.asarray(y)[parity_idx]
+        )
+        if report["passed"]:
+            os.replace(candidate_path, output_path)
+    finally:
+        if os.path.exists(candidate_path):
+            os.remove(candidate_path)
+    report["mode"] = mode
+    report["size_bytes"] = len(flatbuffer)
+
+    delta, flips = report["probability_delta"], report["decision_flips"]
+    print(f"-- |delta p|: max {delta['max']:.2e}, mean {delta['mean']:.2e}, p99 {delta['p99']:.2e}")
+    print(
+        f"-- Decisions changed at {CLASSIFICATION_THRESHOLD}: {flips['total']} of {report['rows']} "
+        f"({flips['attack_to_benign']} ATTACK->BENIGN, {flips['benign_to_attack']} BENIGN->ATTACK)"
+    )
+    print(":: QUANTIZED CONFUSION MATRIX ::")
+    print(np.array(report["quantized"]["confusion_matrix"]))
+    print(f"-- Recall: float {report['float']['recall']:.4%} | {mode} {report['quantized']['recall']:.4%}")
+    print(
+        f"-- Throughput: float {report['rows_per_s']['float']:,.0f} rows/s | "
+        f"{mode} {report['rows_per_s']['quantized']:,.0f} rows/s"
+    )
+    if report["passed"]:
+        print(f"-- TFLite model saved to {output_path}")
+        print('-- Parity PASSED: safe to serve with INFERENCE_BACKEND = "tflite"')
+    else:
+        print(
+            f"-- Parity FAILED (limits: flip rate {TFLITE_MAX_FLIP_RATE}, recall drop {TFLITE_MAX_RECALL_DROP}); "
+            "the export was discarded. Keep the float backend or try another TFLITE_QUANTIZATION mode"
+        )
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"-- Parity report saved to {report_path}")
+    return report
+
+
+if __name__ == "__main__":
+    # Usage: python -m src.quantizer [float16|dynamic|int8]
+    # Re-exports from the saved champion, using the cached feature matrix.
+    import joblib
+
+    from src.config import MODEL_PATH, SCALER_SAVE_PATH
+    from src.data_pipeline import split_indices
+    from src.feature_cache import open_cache, read_manifest
+    from src.inference_engine import _import_load_model
+
+    mode = sys.argv[1] if len(sys.argv) > 1 else TFLITE_QUANTIZATION
+    manifest = read_manifest()
+    if manifest is None:
+        print("ERROR: No feature cache found. Run main.py once to build it.")
+        sys.exit(1)
+    X, y = open_cache(manifest)
+    train_idx, test_idx = split_indices(y)
+    load_model = _import_load_model()
+    export_quantized_model(
+        load_model(MODEL_PATH), joblib.load(SCALER_SAVE_PATH), X, y, train_idx, test_idx, mode
+    )
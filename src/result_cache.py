@@ -0,0 +1,205 @@
+# AegisNet Result Cache Module
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from src.config import (
+    MODEL_PATH,
+    SCALER_SAVE_PATH,
+    FUSED_MODEL_PATH,
+    TFLITE_MODEL_PATH,
+    CASCADE_ENABLED,
+    CASCADE_MODEL_PATH,
+    TOP_FEATURES,
+    RESULT_CACHE_DIR,
+    RESULT_CACHE_MAX_BYTES,
+    RESULT_CACHE_MEMORY_ENTRIES,
+)
+
+SUMMARY_NAME = "summary.json"
+ROWS_NAME = "rows.npy"
+SCORES_NAME = "scores.npy"
+HASH_BLOCK_SIZE = 1 << 20
+
+# Bump when the cached entry layout changes
+CACHE_FORMAT_VERSION = 1
+
+
+def _hash_file(digest, path):
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+
+
+def model_fingerprint(
+    backend,
+    model_path=MODEL_PATH,
+    scaler_path=SCALER_SAVE_PATH,
+    fused_path=FUSED_MODEL_PATH,
+    tflite_path=TFLITE_MODEL_PATH,
+    cascade_path=CASCADE_MODEL_PATH,
+    cascade=CASCADE_ENABLED,
+):
+    """Hash of the artifact files a backend loads (model or TFLite export + scaler, or fused engine).
+
+    Args:
+        backend: "keras", "numpy" or "tflite"
+        model_path, scaler_path, fused_path, tflite_path, cascade_path: Artifact locations
+        cascade: Whether the cascade pre-filter is part of the scorer
+
+    Returns:
+        Hex digest identifying the model version
+    """
+    if backend == "numpy":
+        paths = [fused_path]
+    elif backend == "tflite":
+        paths = [tflite_path, scaler_path]
+    else:
+        paths = [model_path, scaler_path]
+    if cascade:
+        paths.append(cascade_path)
+    digest = hashlib.sha256((backend + ("+cascade" if cascade else "")).encode("utf-8"))
+    for path in paths:
+        _hash_file(digest, path)
+    return digest.hexdigest()
+
+
+def hash_upload(file):
+    """Streaming sha256 of an upload's bytes.
+
+    Args:
+        file: Path or seekable binary file object (rewound afterwards)
+
+    Returns:
+        Hex digest of the content
+    """
+    digest = hashlib.sha256()
+    if isinstance(file, (str, os.PathLike)):
+        _hash_file(digest, file)
+        return digest.hexdigest()
+    stream = getattr(file, "stream", file)
+    start = stream.tell()
+    for block in iter(lambda: stream.read(HASH_BLOCK_SIZE), b""):
+        digest.update(block)
+    stream.seek(start)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Scored results keyed by upload content and model version.
+
+    Summaries of recent entries stay in an in-memory LRU; flagged rows and
+    scores live on disk as .npy files (opened as memmaps on a hit). The disk
+    cache is trimmed to max_bytes, least recently used first.
+    """
+
+    def __init__(
+        self,
+        model_version,
+        threshold,
+        cache_dir=RESULT_CACHE_DIR,
+        max_bytes=RESULT_CACHE_MAX_BYTES,
+        memory_entries=RESULT_CACHE_MEMORY_ENTRIES,
+    ):
+        self.model_version = model_version
+        self.threshold = threshold
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, upload_digest):
+        """Cache key for an upload under the current model, threshold and features."""
+        material = json.dumps(
+            [
+                CACHE_FORMAT_VERSION,
+                upload_digest,
+                self.model_version,
+                float(self.threshold),
+                list(TOP_FEATURES),
+            ]
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _path(self, key, name=""):
+        return os.path.join(self.cache_dir, key, name)
+
+    def _remember(self, key, summary):
+        with self._lock:
+            self._memory[key] = summary
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, key):
+        """Look up a cached result.
+
+        Returns:
+            Tuple of (summary, threat_rows, threat_scores) or None on a miss
+        """
+        with self._lock:
+            summary = self._memory.get(key)
+            if summary is not None:
+                self._memory.move_to_end(key)
+        try:
+            if summary is None:
+                with open(self._path(key, SUMMARY_NAME)) as f:
+                    summary = json.load(f)
+                self._remember(key, summary)
+            rows = np.load(self._path(key, ROWS_NAME), mmap_mode="r")
+            scores = np.load(self._path(key, SCORES_NAME), mmap_mode="r")
+            # Mark as recently used for size-based eviction
+            os.utime(self._path(key, SUMMARY_NAME))
+        except (OSError, ValueError):
+            # Evicted from disk (possibly by another process)
+            with self._lock:
+                self._memory.pop(key, None)
+            return None
+        return summary, rows, scores
+
+    def put(self, key, threat_rows, threat_scores, summary):
+        """Store a result, then evict old entries beyond max_bytes."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Write into a private directory and publish it with one rename
+        tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=self.cache_dir)
+        try:
+            np.save(os.path.join(tmp_dir, ROWS_NAME), np.asarray(threat_rows, dtype=np.int64))
+            np.save(os.path.join(tmp_dir, SCORES_NAME), np.asarray(threat_scores, dtype=np.float32))
+            with open(os.path.join(tmp_dir, SUMMARY_NAME), "w") as f:
+                json.dump(summary, f)
+            os.rename(tmp_dir, self._path(key))
+        except OSError:
+            # Another request stored the same key first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        self._remember(key, summary)
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.startswith(".tmp-") or not entry.is_dir():
+                continue
+            try:
+                last_used = os.stat(os.path.join(entry.path, SUMMARY_NAME)).st_mtime
+                size = sum(f.stat().st_size for f in os.scandir(entry.path))
+            except OSError:
+                continue
+            entries.append((last_used, size, entry.name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(self._path(key), ignore_errors=True)
+            with self._lock:
+                self._memory.pop(key, None)
+            total -= size
@@ -0,0 +1,173 @@
+# AegisNet Result Store Module
+
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+
+from src.config import RESULT_STORE_DIR, RESULT_STORE_MAX_RESULTS, RESULT_TTL_S
+
+PAGE_ORDERS = ("row", "confidence")
+
+META_NAME = "result.json"
+ROWS_NAME = "rows.npy"
+SCORES_NAME = "scores.npy"
+# Result ids are uuid4 hex strings; anything else never reaches the filesystem
+RESULT_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+
+class StoredResult:
+    """Flagged rows of one scored upload, kept as parallel NumPy arrays."""
+
+    def __init__(self, rows, scores, summary, created=None):
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.scores = np.asarray(scores, dtype=np.float32)
+        self.summary = summary
+        self.created = time.time() if created is None else created
+        self._confidence_order = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def confidence_order(self):
+        """Indices sorting threats by descending confidence (ties by row), computed once."""
+        if self._confidence_order is None:
+            self._confidence_order = np.argsort(-self.scores, kind="stable")
+        return self._confidence_order
+
+    def page(self, offset, limit, order="row"):
+        """Slice one page of threats.
+
+        Args:
+            offset: Index of the first threat in the requested order
+            limit: Maximum number of threats to return
+            order: "row" (file order) or "confidence" (highest first, i.e. top-N)
+
+        Returns:
+            Tuple of (row_numbers, confidence_scores) arrays
+        """
+        if order not in PAGE_ORDERS:
+            raise ValueError(f"order must be one of {PAGE_ORDERS}")
+        if order == "row":
+            return self.rows[offset:offset + limit], self.scores[offset:offset + limit]
+        selected = self.confidence_order()[offset:offset + limit]
+        return self.rows[selected], self.scores[selected]
+
+
+class ResultStore:
+    """Recent results on disk so clients can page through them from any worker.
+
+    Flagged rows and scores are saved as .npy files under result_dir (opened
+    as memmaps when another process asks for them); each process also keeps
+    its own recent results in an in-memory LRU. Results expire after ttl_s
+    seconds; beyond max_results the least recently used result is deleted.
+    """
+
+    def __init__(self, max_results=RESULT_STORE_MAX_RESULTS, ttl_s=RESULT_TTL_S, result_dir=RESULT_STORE_DIR):
+        self.max_results = max_results
+        self.ttl_s = ttl_s
+        self.result_dir = result_dir
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, result_id, name=""):
+        return os.path.join(self.result_dir, result_id, name)
+
+    def _remember(self, result_id, result):
+        with self._lock:
+            self._results[result_id] = result
+            self._results.move_to_end(result_id)
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+
+    def _forget(self, result_id):
+        with self._lock:
+            self._results.pop(result_id, None)
+
+    def put(self, rows, scores, summary):
+        """Store a result and return its id."""
+        result_id = uuid.uuid4().hex
+        result = StoredResult(rows, scores, summary)
+        os.makedirs(self.result_dir, exist_ok=True)
+        # Write into a private directory and publish it with one rename
+        tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=self.result_dir)
+        try:
+            np.save(os.path.join(tmp_dir, ROWS_NAME), result.rows)
+            np.save(os.path.join(tmp_dir, SCORES_NAME), result.scores)
+            with open(os.path.join(tmp_dir, META_NAME), "w") as f:
+                json.dump({"created": result.created, "summary": summary}, f)
+            os.rename(tmp_dir, self._path(result_id))
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        self._remember(result_id, result)
+        self.expire(result.created)
+        return result_id
+
+    def get(self, result_id):
+        """Return the StoredResult, or None if unknown or expired."""
+        if not (isinstance(result_id, str) and RESULT_ID_PATTERN.fullmatch(result_id)):
+            return None
+        with self._lock:
+            result = self._results.get(result_id)
+            if result is not None:
+                self._results.move_to_end(result_id)
+        try:
+            if result is None:
+                # Stored by another worker (or evicted from this one's memory)
+                with open(self._path(result_id, META_NAME)) as f:
+                    meta = json.load(f)
+                result = StoredResult(
+                    np.load(self._path(result_id, ROWS_NAME), mmap_mode="r"),
+                    np.load(self._path(result_id, SCORES_NAME), mmap_mode="r"),
+                    meta["summary"],
+                    created=meta["created"],
+                )
+                self._remember(result_id, result)
+            # Mark as recently used for eviction by any process
+            os.utime(self._path(result_id, META_NAME))
+        except (OSError, ValueError, KeyError):
+            # Expired or evicted from disk (possibly by another process)
+            self._forget(result_id)
+            return None
+        if time.time() - result.created > self.ttl_s:
+            self._forget(result_id)
+            shutil.rmtree(self._path(result_id), ignore_errors=True)
+            return None
+        return result
+
+    def expire(self, now=None):
+        """Delete results older than ttl_s, then the least recently used beyond max_results."""
+        now = time.time() if now is None else now
+        entries = []
+        for entry in os.scandir(self.result_dir):
+            if not entry.is_dir():
+                continue
+            if not RESULT_ID_PATTERN.fullmatch(entry.name):
+                # A write interrupted before its rename
+                if entry.name.startswith(".tmp-") and now - entry.stat().st_mtime > self.ttl_s:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                continue
+            meta_path = os.path.join(entry.path, META_NAME)
+            try:
+                # The file's mtime is the last use (see get)
+                last_used = os.stat(meta_path).st_mtime
+                with open(meta_path) as f:
+                    created = json.load(f)["created"]
+            except (OSError, ValueError, KeyError):
+                continue
+            if now - created > self.ttl_s:
+                self._forget(entry.name)
+                shutil.rmtree(entry.path, ignore_errors=True)
+            else:
+                entries.append((last_used, entry.name))
+        for _, result_id in sorted(entries)[:max(0, len(entries) - self.max_results)]:
+            self._forget(result_id)
+            shutil.rmtree(self._path(result_id), ignore_errors=True)
@@ -0,0 +1,144 @@
+# AegisNet Pipeline Stage Cache Module
+
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import time
+
+from src.config import PIPELINE_CACHE_DIR, PIPELINE_KEEP
+
+# Written last in each stage directory; its presence marks the run complete
+MANIFEST_NAME = "stage.json"
+# Bytes read at a time when hashing output files
+HASH_BLOCK_BYTES = 1 << 20
+
+
+def stage_key(stage, inputs):
+    """Content hash of everything a stage's outputs depend on.
+
+    Args:
+        stage: Stage name
+        inputs: JSON-serializable dict (upstream output digests, settings,
+            source hashes)
+
+    Returns:
+        sha256 hex digest
+    """
+    encoded = json.dumps({"stage": stage, "inputs": inputs}, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def source_hash(*functions):
+    """sha256 of the source code of the functions a stage's outputs depend on."""
+    source = "".join(inspect.getsource(function) for function in functions)
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def stage_dir(stage, key, cache_dir=PIPELINE_CACHE_DIR):
+    return os.path.join(cache_dir, stage, key[:16])
+
+
+def read_stage(stage, key, cache_dir=PIPELINE_CACHE_DIR):
+    """Return the manifest of a completed run of the stage for key, or None."""
+    try:
+        with open(os.path.join(stage_dir(stage, key, cache_dir), MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("key") == key else None
+
+
+def output_digest(directory, files, outputs):
+    """sha256 over the output files (names and bytes) and the JSON outputs.
+
+    Downstream stages hash this digest into their own keys, so a stage that
+    reruns but produces identical outputs leaves them up to date.
+    """
+    digest = hashlib.sha256()
+    for name in files:
+        digest.update(name.encode("utf-8") + b"\0")
+        with open(os.path.join(directory, name), "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b""):
+                digest.update(block)
+    digest.update(json.dumps(outputs, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def complete_stage(stage, key, inputs, outputs, files, cache_dir=PIPELINE_CACHE_DIR):
+    """Record a finished stage run.
+
+    The manifest is written via an atomic rename after every output file, so
+    an interrupted run never looks complete.
+
+    Returns:
+        Manifest dict
+    """
+    directory = stage_dir(stage, key, cache_dir)
+    manifest = {
+        "stage": stage,
+        "key": key,
+        "inputs": inputs,
+        "outputs": outputs,
+        "files": list(files),
+        "digest": output_digest(directory, files, outputs),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    manifest_path = os.path.join(directory, MANIFEST_NAME)
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+    return manifest
+
+
+def prune_stage(stage, keep_key, keep=PIPELINE_KEEP, cache_dir=PIPELINE_CACHE_DIR):
+    """Delete the least recently used runs of a stage beyond keep, never keep_key's."""
+    root = os.path.join(cache_dir, stage)
+    entries = sorted(
+        (entry for entry in os.scandir(root) if entry.is_dir()),
+        key=lambda entry: entry.stat().st_mtime,
+    )
+    for entry in entries[:-keep] if len(entries) > keep else []:
+        if entry.name != keep_key[:16]:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def run_stage(stage, inputs, compute, force=False, cache_dir=PIPELINE_CACHE_DIR, keep=PIPELINE_KEEP):
+    """Run a stage unless a completed run for the same inputs exists.
+
+    A directory left behind by an interrupted run is handed back to compute
+    as is, so the stage can resume from whatever it checkpointed there.
+
+    Args:
+        stage: Stage name
+        inputs: JSON-serializable dict hashed into the stage key
+        compute: Callable(out_dir) -> (outputs dict, list of output file
+            names inside out_dir)
+        force: Discard any previous run for these inputs and recompute
+        cache_dir: Pipeline cache root
+        keep: Runs kept per stage
+
+    Returns:
+        Tuple of (manifest dict, stage directory)
+    """
+    key = stage_key(stage, inputs)
+    directory = stage_dir(stage, key, cache_dir)
+    manifest = None if force else read_stage(stage, key, cache_dir)
+    if manifest is not None:
+        print(f"-- Stage '{stage}' is up to date ({directory}, {manifest['created']})")
+        # Mark it recently used so pruning removes other runs first
+        os.utime(directory)
+        return manifest, directory
+
+    if force:
+        shutil.rmtree(directory, ignore_errors=True)
+    elif os.path.isdir(directory):
+        print(f"-- Resuming interrupted stage '{stage}' in {directory}")
+    os.makedirs(directory, exist_ok=True)
+    outputs, files = compute(directory)
+    manifest = complete_stage(stage, key, inputs, outputs, files, cache_dir)
+    if keep:
+        prune_stage(stage, key, keep, cache_dir)
+    return manifest, directory
@@ -0,0 +1,169 @@
+# AegisNet Live Streaming Scorer
+#
+# Usage:
+#   cicflowmeter ... | python streamer.py --stdin
+#   python streamer.py --tail /var/log/flows/current.csv --alerts alerts.ndjson
+#   python streamer.py --listen tcp://127.0.0.1:9900 --listen unix:///tmp/aegisnet.sock
+#
+# Reads CICFlowMeter-style flow records (CSV with a header line, or NDJSON),
+# scores them in micro-batches and writes flows at or above
+# CLASSIFICATION_THRESHOLD to the alert sink as NDJSON. Throughput and lag
+# are reported on stderr (and on --metrics-port in Prometheus format).
+
+import argparse
+import functools
+import signal
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.config import (
+    INFERENCE_BACKEND,
+    CLASSIFICATION_THRESHOLD,
+    STREAMER_BATCH_SIZE,
+    STREAMER_MAX_WAIT_MS,
+    STREAMER_STATS_INTERVAL_S,
+)
+from src.flow_stream import (
+    STREAM_REGISTRY,
+    FLOWS_READ,
+    BAD_RECORDS,
+    AlertSink,
+    StreamScorer,
+    listen_socket,
+    read_fd,
+    tail_file,
+)
+from src.inference_engine import load_scorer
+from src.model_registry import resolve_version
+
+
+def log(message):
+    # stdout may be the alert sink, so progress goes to stderr
+    print(message, file=sys.stderr, flush=True)
+
+
+class StatsReporter:
+    """Accumulate per-batch counts and print a throughput/lag line periodically."""
+
+    def __init__(self, interval_s=STREAMER_STATS_INTERVAL_S):
+        self.interval_s = interval_s
+        self.started = time.monotonic()
+        self.flows = 0
+        self.alerts = 0
+        self._window_start = self.started
+        self._window_flows = 0
+        self._window_max_lag = 0.0
+
+    def on_batch(self, n_flows, n_alerts, lag):
+        self.flows += n_flows
+        self.alerts += n_alerts
+        self._window_flows += n_flows
+        self._window_max_lag = max(self._window_max_lag, lag)
+        now = time.monotonic()
+        if now - self._window_start >= self.interval_s:
+            self.report(now)
+
+    def report(self, now=None):
+        now = time.monotonic() if now is None else now
+        elapsed = max(now - self._window_start, 1e-9)
+        log(
+            f"-- {self.flows:,} flows scored ({self._window_flows / elapsed:,.0f} flows/s), "
+            f"{self.alerts:,} alerts, max lag {self._window_max_lag:.3f}s, "
+            f"{FLOWS_READ.value():,} read, {BAD_RECORDS.value():,} bad records"
+        )
+        self._window_start = now
+        self._window_flows = 0
+        self._window_max_lag = 0.0
+
+
+def serve_metrics(port):
+    """Expose the streamer's metrics for Prometheus on a background thread."""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = STREAM_REGISTRY.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_streamer(sources, alerts_path="-", backend=INFERENCE_BACKEND, batch_size=STREAMER_BATCH_SIZE,
+                 max_wait_ms=STREAMER_MAX_WAIT_MS, metrics_port=None):
+    """Score live flow records until every source ends (or SIGINT/SIGTERM).
+
+    Args:
+        sources: Callables taking (emit, stop_event), see src.flow_stream
+        alerts_path: NDJSON alert file, or "-" for stdout
+        backend: Inference backend, "keras", "numpy" (fused engine) or "tflite"
+        batch_size: Flows per micro-batch
+        max_wait_ms: Maximum time the oldest flow waits for its batch
+        metrics_port: Optional port serving Prometheus metrics
+    """
+    log(":: [AegisNet STREAMER] - Initiating... ::")
+    version, _, paths = resolve_version(backend=backend)
+    log(f"-- Loading inference backend ({backend}, model version {version})...")
+    scorer = load_scorer(backend, **paths)
+    sink = AlertSink(alerts_path)
+    streamer = StreamScorer(scorer, sink, batch_size=batch_size, max_wait_ms=max_wait_ms)
+    stats = StatsReporter()
+
+    def stop(signum, frame):
+        log("-- Stopping: scoring buffered flows...")
+        streamer.stop_event.set()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    if metrics_port:
+        serve_metrics(metrics_port)
+        log(f"-- Metrics on http://0.0.0.0:{metrics_port}/metrics")
+
+    log(
+        f"-- Scoring {len(sources)} source(s) in batches of up to {batch_size} flows / "
+        f"{max_wait_ms}ms (Threshold: {CLASSIFICATION_THRESHOLD * 100}%)"
+    )
+    try:
+        streamer.run(sources, on_batch=stats.on_batch)
+    finally:
+        sink.close()
+    stats.report()
+    log(":: [AegisNet STREAMER] - STOPPED ::")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score live flow records as they arrive")
+    parser.add_argument("--stdin", action="store_true", help="Read records from standard input")
+    parser.add_argument("--tail", action="append", default=[], metavar="PATH", help="Follow a growing CSV/NDJSON file")
+    parser.add_argument("--from-start", action="store_true", help="With --tail, also score rows already in the file")
+    parser.add_argument(
+        "--listen", action="append", default=[], metavar="ADDRESS",
+        help="Accept connections on tcp://host:port or unix:///path",
+    )
+    parser.add_argument("--alerts", default="-", help="NDJSON alert sink (default: stdout)")
+    parser.add_argument("--backend", choices=["keras", "numpy", "tflite"], default=INFERENCE_BACKEND)
+    parser.add_argument("--batch-size", type=int, default=STREAMER_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=STREAMER_MAX_WAIT_MS)
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this port")
+    args = parser.parse_args()
+
+    sources = []
+    if args.stdin:
+        sources.append(functools.partial(read_fd, sys.stdin.fileno(), "stdin"))
+    for path in args.tail:
+        sources.append(lambda emit, stop_event, path=path: tail_file(path, emit, stop_event, args.from_start))
+    for address in args.listen:
+        sources.append(functools.partial(listen_socket, address))
+    if not sources:
+        parser.error("Give at least one source: --stdin, --tail PATH or --listen ADDRESS")
+
+    run_streamer(sources, args.alerts, args.backend, args.batch_size, args.max_wait_ms, args.metrics_port)
@@ -0,0 +1,45 @@
+# AegisNet Incremental Model Updater
+#
+# Usage:
+#   python updater.py labeled/new-campaign.csv
+#   python updater.py labeled/*.csv.gz --epochs 5 --from-version 20250101-120000-ab12cd34
+#   python updater.py labeled/new-campaign.csv --dry-run
+#
+# Fine-tunes the served model (the registry's CURRENT version) on newly
+# labeled flows mixed with replayed rows from the feature cache, validates it
+# against held-out rows and publishes it as a new version only if the
+# historical confusion matrix does not regress. Takes minutes instead of the
+# hours of a full main.py run; fold the new files into data/ for the next one.
+
+import argparse
+import sys
+
+from src.config import INCREMENTAL_EPOCHS, INCREMENTAL_REPORT_PATH
+from src.incremental_updater import incremental_update
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fine-tune the served model on newly labeled flows")
+    parser.add_argument("inputs", nargs="+", help="Labeled CSV files (plain, .gz or .zst) with a Label column")
+    parser.add_argument("--from-version", help="Registry version to start from (default: CURRENT)")
+    parser.add_argument("--epochs", type=int, default=INCREMENTAL_EPOCHS)
+    parser.add_argument("--report", default=INCREMENTAL_REPORT_PATH, help="Update report JSON path")
+    parser.add_argument("--dry-run", action="store_true", help="Validate the update without publishing it")
+    args = parser.parse_args()
+
+    print(":: [AegisNet UPDATER] - Initiating... ::")
+    try:
+        report = incremental_update(
+            args.inputs,
+            version=args.from_version,
+            epochs=args.epochs,
+            report_path=args.report,
+            publish=not args.dry_run,
+        )
+    except (FileNotFoundError, KeyError, ValueError) as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    if report["version"]:
+        print(f":: [AegisNet UPDATER] - COMPLETE: version {report['version']} is now CURRENT ::")
+    elif not report["validation"]["passed"]:
+        sys.exit(1)